@@ -1,6 +1,9 @@
 import ast
 from typing import Any, Iterable
 
+from .passes import SKIP, AnalysisPass
+from .scope import ScopeTransformer
+
 
 IGNORED_MODULE_SET = {
     "typing",
@@ -196,26 +199,26 @@ class AttributeCallTransformer(ast.NodeTransformer):
         return self.generic_visit(node)
 
 
-class ImportTransformer(ast.NodeTransformer):
+class ImportTransformer(AnalysisPass):
     """Attach imported symbols to scope.imports."""
 
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> ast.AST:
+    requires = (ScopeTransformer,)
+
+    def enter_ImportFrom(self, node: ast.ImportFrom) -> object:
         scopes = getattr(node, "scopes", None)
         if not scopes:
-            return node
+            return SKIP
 
         current_scope = scopes[-1]
         imports = getattr(current_scope, "imports", None)
         if imports is None:
-            return node
+            return SKIP
 
         for name in node.names:
             name.imported_from = node
             imports.append(name)
 
-        return node
+        return SKIP
 
-    def visit_Module(self, node: ast.Module) -> ast.AST:
+    def enter_Module(self, node: ast.Module) -> None:
         node.imports = []
-        self.generic_visit(node)
-        return node
\ No newline at end of file
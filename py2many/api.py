@@ -0,0 +1,185 @@
+"""
+In-process API for embedding py2many, e.g. in a build service.
+
+`transpile` takes the sources of a project by module path and returns
+the transpiled code and the diagnostics of its modules, for each
+language. Nothing is written to disk or printed, and the outputs are not
+formatted.
+
+Backends keep state on their transpiler classes, so calls are serialised
+by a lock: threads can share the API, but don't transpile in parallel.
+Settings are built on the first call with a set of languages and options
+(in the environment of that call) and reused by later ones, which start
+from the class and rewriter state the settings were built with. So
+results don't depend on earlier calls and match what
+``py2many --lang=...`` produces for the same modules.
+"""
+
+import ast
+import contextlib
+import copy
+import io
+import threading
+import traceback
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from py2many import pipeline
+from py2many.cli import parse_args
+from py2many.exceptions import AstErrorBase
+from py2many.language import LanguageSettings
+from py2many.registry import get_all_settings
+from py2many.utilities.toposort_modules import toposort
+
+_lock = threading.RLock()
+# Attributes of the transpiler classes when each was first seen
+_classes: Dict[type, Dict[str, Any]] = {}
+
+
+@dataclass
+class _Prepared:
+    """Settings of a set of languages and options, and the state they start from."""
+
+    settings_list: List[LanguageSettings]
+    classes: Dict[type, Dict[str, Any]]
+    rewriters: List[Dict[str, Any]]
+    warnings: Tuple[str, ...]
+
+
+_prepared: Dict[Tuple[Tuple[str, ...], Tuple[Tuple[str, Any], ...]], _Prepared] = {}
+
+
+@dataclass(frozen=True)
+class Diagnostic:
+    """A module that could not be parsed or transpiled to `lang`."""
+
+    lang: str
+    filename: str
+    message: str
+    lineno: Optional[int] = None
+    col_offset: Optional[int] = None
+
+    def __str__(self) -> str:
+        if self.lineno is None:
+            return f"{self.filename}: {self.message}"
+        return f"{self.filename}:{self.lineno}:{self.col_offset}: {self.message}"
+
+
+@dataclass(frozen=True)
+class Results:
+    """What `transpile` returns."""
+
+    outputs: Mapping[str, Mapping[str, str]]
+    """Code by language, then by module, for modules transpiled successfully."""
+
+    diagnostics: Tuple[Diagnostic, ...]
+
+    warnings: Tuple[str, ...] = ()
+    """What the settings of the languages printed, e.g. about a missing compiler."""
+
+    @property
+    def ok(self) -> bool:
+        return not self.diagnostics
+
+
+def _diagnostic(lang: str, filename: str, e: BaseException) -> Diagnostic:
+    message = traceback.format_exception_only(type(e), e)[-1].strip()
+    if isinstance(e, AstErrorBase):
+        return Diagnostic(lang, filename, message, e.lineno, e.col_offset)
+    return Diagnostic(lang, filename, message)
+
+
+def _parse(
+        sources: Mapping[str, str],
+        languages: Sequence[str],
+        diagnostics: List[Diagnostic],
+) -> List[ast.AST]:
+    trees: List[ast.AST] = []
+    for filename, source in sources.items():
+        try:
+            tree = ast.parse(source, filename=filename)
+        except SyntaxError as e:
+            message = f"SyntaxError: {e.msg}"
+            diagnostics.extend(
+                Diagnostic(lang, filename, message, e.lineno, e.offset) for lang in languages
+            )
+            continue
+        setattr(tree, "__file__", Path(filename))
+        trees.append(tree)
+    return trees
+
+
+def _restore_classes() -> None:
+    """Reset the transpiler classes, snapshotting those imported since the last call."""
+    for cls, attrs in pipeline._snapshot_classes().items():
+        _classes.setdefault(cls, attrs)
+    pipeline._restore_classes(_classes)
+
+
+def _rewriters(settings_list: Sequence[LanguageSettings]) -> List[Any]:
+    return [r for s in settings_list for r in (*s.rewriters, *s.post_rewriters)]
+
+
+def _prepare(languages: Sequence[str], args: Any, options: Mapping[str, Any]) -> _Prepared:
+    """Build the settings of `languages` on first use, keeping what they print."""
+    key = (tuple(languages), tuple(sorted(options.items())))
+    prepared = _prepared.get(key)
+    if prepared is None:
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+            settings_list = [pipeline._settings_from_args(lang, args) for lang in languages]
+        prepared = _prepared[key] = _Prepared(
+            settings_list,
+            # The command line transpiles each language in a forked process,
+            # which starts from the classes as all the settings left them
+            pipeline._snapshot_classes(),
+            [pipeline._transpiler_state(r) for r in _rewriters(settings_list)],
+            tuple(output.getvalue().splitlines()),
+        )
+    return prepared
+
+
+def transpile(sources: Mapping[str, str], langs: Sequence[str], **options: Any) -> Results:
+    """
+    Transpile the modules in `sources` (code by path relative to the
+    project root, like ``pkg/mod.py``) to every language in `langs`.
+
+    `options` are command line options, e.g. ``comment_unsupported=True``
+    or ``extension=True``. Raises ValueError for unsupported languages and
+    TypeError for unknown options; problems with the modules themselves
+    are reported in the diagnostics of the results.
+    """
+    languages = pipeline.parse_languages(",".join(langs))
+    args = parse_args(["--lang", ",".join(languages)])
+    unknown = options.keys() - vars(args).keys()
+    if unknown:
+        raise TypeError(f"Unknown options: {', '.join(sorted(unknown))}")
+    vars(args).update(options)
+
+    diagnostics: List[Diagnostic] = []
+    trees = toposort(tuple(_parse(sources, languages, diagnostics)))
+    names = {Path(filename): filename for filename in sources}
+    outputs: Dict[str, Dict[str, str]] = {}
+
+    with _lock:
+        for language in languages:
+            # Imports the backend, whose classes are snapshotted as they are
+            get_all_settings()[language]
+        _restore_classes()
+
+        prepared = _prepare(languages, args, options)
+        for rewriter, state in zip(_rewriters(prepared.settings_list), prepared.rewriters):
+            pipeline._restore_transpiler_state(rewriter, state)
+        for language, settings in zip(languages, prepared.settings_list):
+            pipeline._restore_classes(prepared.classes)
+            errors: Dict[Path, Exception] = {}
+            lang_outputs, successful = pipeline._transpile_trees(
+                copy.deepcopy(trees), settings, args, errors=errors
+            )
+            outputs[language] = {names[f]: lang_outputs[f] for f in successful}
+            diagnostics.extend(
+                _diagnostic(language, names[f], e) for f, e in errors.items()
+            )
+
+    return Results(outputs, tuple(diagnostics), prepared.warnings)
@@ -0,0 +1,262 @@
+"""
+Persistent, content-addressed cache of transpiled modules.
+
+Entries are keyed by everything the output of a module depends on:
+
+* the source of the module and of the project modules it imports
+  (transitively, as their keys are chained),
+* the identity of the `LanguageSettings` used,
+* the py2many version and its own source files.
+
+A hit skips parsing, all rewriters and code generation for that module.
+Entries are plain files under the cache directory; the least recently
+used ones are evicted once the cache outgrows its size cap. Checking
+that lists the whole cache, so it is done at most every EVICT_INTERVAL
+seconds, and only by runs that stored something.
+"""
+
+import ast
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from functools import cache
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, Optional, Sequence, Set
+
+from .__init__ import __version__
+from .language import LanguageSettings
+
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+EVICT_INTERVAL = 60 * 60
+EVICT_STAMP = "last-evict"
+
+PY2MANY_DIR = Path(__file__).parent
+ROOT_DIR = PY2MANY_DIR.parent
+
+
+def default_cache_dir() -> Path:
+    """``$PY2MANY_CACHE_DIR``, else ``$XDG_CACHE_HOME/py2many`` or ``~/.cache/py2many``."""
+    if "PY2MANY_CACHE_DIR" in os.environ:
+        return Path(os.environ["PY2MANY_CACHE_DIR"])
+    xdg_cache = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache) if xdg_cache else Path.home() / ".cache"
+    return base / "py2many"
+
+
+@cache
+def code_fingerprint() -> str:
+    """
+    Identify the py2many code producing the output.
+
+    Besides the version, the size and mtime of every source file of
+    py2many and its targets are included, so that editing a backend
+    doesn't serve stale output from the cache.
+    """
+    digest = hashlib.sha256(__version__.encode())
+    for package in (PY2MANY_DIR, ROOT_DIR / "targets"):
+        for path in sorted(package.rglob("*.py")):
+            stat = path.stat()
+            digest.update(f"{path.relative_to(ROOT_DIR)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def imported_modules(tree: ast.AST) -> List[str]:
+    """Modules named in ``from <module> import ...`` statements of a tree.
+
+    These are the only imports whose definitions are resolved across
+    project modules (see `VariableTransformer.visit_ImportFrom`).
+    """
+    return sorted({
+        node.module
+        for node in ast.walk(tree)
+        if isinstance(node, ast.ImportFrom) and node.module
+    })
+
+
+@dataclass
+class CacheStats:
+    """Counters for a single run."""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.hits} hits, {self.misses} misses, "
+            f"{self.stores} stored, {self.evictions} evicted"
+        )
+
+
+class TranspileCache:
+    """
+    On-disk cache of transpiled modules.
+
+    Layout of the cache directory:
+        out/<key[:2]>/<key>      transpiled (unformatted) output
+        imports/<sha[:2]>/<sha>  JSON list of modules imported by a source
+    """
+
+    def __init__(self, directory: Optional[Path] = None, max_size: int = DEFAULT_MAX_SIZE):
+        self.directory = Path(directory) if directory is not None else default_cache_dir()
+        self.max_size = max_size
+        self.stats = CacheStats()
+
+    # MARK: Keys
+
+    @staticmethod
+    def source_digest(source: str) -> str:
+        return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+    def imports_for(self, source: str, parse: Callable[[str], ast.AST] = ast.parse) -> List[str]:
+        """Modules imported by a source, parsing it only when not yet known."""
+        path = self._path("imports", self.source_digest(source))
+        try:
+            return json.loads(path.read_text())
+        except (OSError, ValueError):
+            pass
+        modules = imported_modules(parse(source))
+        self._write(path, json.dumps(modules))
+        return modules
+
+    def module_keys(
+            self,
+            filenames: Sequence[Path],
+            sources: Sequence[str],
+            settings: LanguageSettings,
+    ) -> Dict[Path, str]:
+        """Compute the cache key of every module of a project."""
+        by_stem: Dict[str, Path] = {}
+        for filename in filenames:
+            by_stem[Path(filename).stem] = filename
+
+        source_for = dict(zip(filenames, sources))
+        imports = {
+            filename: [by_stem[m] for m in self.imports_for(source) if m in by_stem]
+            for filename, source in source_for.items()
+        }
+
+        base = hashlib.sha256(
+            "\0".join((
+                code_fingerprint(),
+                settings.fingerprint(),
+                # VariableTransformer only resolves imports in multi-file projects
+                str(len(filenames) == 1),
+            )).encode()
+        ).hexdigest()
+
+        keys: Dict[Path, str] = {}
+        in_progress: Set[Path] = set()
+
+        def key_for(filename: Path) -> str:
+            if filename in keys:
+                return keys[filename]
+            in_progress.add(filename)
+            digest = hashlib.sha256(base.encode())
+            digest.update(str(filename).encode())
+            digest.update(self.source_digest(source_for[filename]).encode())
+            for dependency in imports[filename]:
+                # A cycle can't be toposorted anyway; just stop chaining there
+                if dependency not in in_progress:
+                    digest.update(key_for(dependency).encode())
+            in_progress.discard(filename)
+            keys[filename] = digest.hexdigest()
+            return keys[filename]
+
+        for filename in filenames:
+            key_for(filename)
+        return keys
+
+    def import_closure(
+            self,
+            filenames: Sequence[Path],
+            project: Mapping[Path, str],
+    ) -> Set[Path]:
+        """The given modules plus the project modules they import, transitively."""
+        by_stem = {Path(filename).stem: filename for filename in project}
+        closure: Set[Path] = set()
+        pending = list(filenames)
+        while pending:
+            filename = pending.pop()
+            if filename in closure:
+                continue
+            closure.add(filename)
+            pending.extend(
+                by_stem[m] for m in self.imports_for(project[filename]) if m in by_stem
+            )
+        return closure
+
+    # MARK: Entries
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path("out", key)
+        try:
+            output = path.read_text(encoding="utf-8")
+        except OSError:
+            self.stats.misses += 1
+            return None
+        # Reading doesn't reliably update atime, so mtime tracks recency
+        os.utime(path)
+        self.stats.hits += 1
+        return output
+
+    def put(self, key: str, output: str) -> None:
+        self._write(self._path("out", key), output)
+        self.stats.stores += 1
+
+    def evict(self, force: bool = False) -> None:
+        """
+        Remove least recently used entries until the cache fits its size cap.
+
+        Unless `force` is set, nothing happens if no entry was stored, or if
+        the cache was checked less than EVICT_INTERVAL seconds ago.
+        """
+        if not force:
+            if not self.stats.stores:
+                return
+            stamp = self.directory / EVICT_STAMP
+            try:
+                if time.time() - stamp.stat().st_mtime < EVICT_INTERVAL:
+                    return
+            except OSError:
+                pass
+            stamp.touch()
+
+        entries = []
+        total = 0
+        for path in self.directory.glob("*/*/*"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+            total += stat.st_size
+
+        for _, size, path in sorted(entries):
+            if total <= self.max_size:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats.evictions += 1
+
+    def _path(self, kind: str, digest: str) -> Path:
+        return self.directory / kind / digest[:2] / digest
+
+    @staticmethod
+    def _write(path: Path, data: str) -> None:
+        """Write atomically, so concurrent runs never see partial entries."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
@@ -2,9 +2,15 @@
 import argparse
 import os.path
 import sys
+from pathlib import Path
 from typing import Optional, Sequence
 
-from py2many.pipeline import LANGS, transpile_from_args
+from py2many.pipeline import (
+    ALL_LANGUAGES,
+    describe_languages,
+    parse_languages,
+    transpile_from_args,
+)
 
 try:
     project_root = os.path.dirname(__file__)
@@ -14,16 +20,25 @@ except Exception as exc:
     project_root = None
 
 
+def _languages(value: str) -> str:
+    try:
+        parse_languages(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+    return value
+
+
 def parse_args(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
     parser = argparse.ArgumentParser()
 
     parser.add_argument(
         "-l", "--lang",
-        type=str,
-        choices=LANGS.keys(),
+        type=_languages,
         required=True,
         metavar="LANG",
-        help="Target language to transpile to.",
+        help=f"Target language to transpile to: {describe_languages()}. Several can "
+             f"be given as a comma separated list (e.g. rust,go,cpp), or "
+             f"'{ALL_LANGUAGES}' for every backend.",
     )
 
     parser.add_argument(
@@ -69,6 +84,13 @@ def parse_args(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
         help="Build a python extension",
     )
 
+    parser.add_argument(
+        "--buffered-output",
+        action="store_true",
+        default=False,
+        help="Don't flush stdout on every print() in generated code (C++ and Rust)",
+    )
+
     parser.add_argument(
         "--suffix",
         type=str,
@@ -104,6 +126,58 @@ def parse_args(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
         help="Enable project mode"
     )
 
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Transpile directories using N worker processes (0 = one per CPU)",
+    )
+
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=False,
+        help="Reuse and store transpiled modules in the on-disk cache",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Don't use the on-disk cache (the default)",
+    )
+
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Directory of the transpile cache. Defaults to ~/.cache/py2many",
+    )
+
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="Only retranspile changed modules and their importers when transpiling a directory",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        default=False,
+        help="Keep transpiling a directory incrementally whenever its sources change",
+    )
+
+    parser.add_argument(
+        "--profile-passes",
+        type=str,
+        default=None,
+        metavar="FILE",
+        help="Record time, node count and allocations of every pass and write them "
+             "as JSON / Chrome trace to FILE. Disables the cache and --jobs",
+    )
+
     parser.add_argument(
         "-v", "--verbose",
         action="count",
@@ -124,6 +198,38 @@ def parse_args(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
     return parsed_args
 
 
+def parse_serve_args(arguments: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="py2many serve",
+        description="Keep backends loaded and transpile for py2many-client over a Unix socket",
+    )
+
+    parser.add_argument(
+        "-l", "--lang",
+        type=_languages,
+        default=ALL_LANGUAGES,
+        metavar="LANG",
+        help="Backends to keep ready, as for py2many --lang. Defaults to all",
+    )
+
+    parser.add_argument(
+        "--socket",
+        type=Path,
+        default=None,
+        help="Socket to listen on, in a directory only the user can write to. "
+             "Defaults to $PY2MANY_SOCKET, else py2many.sock in $XDG_RUNTIME_DIR "
+             "or /tmp/py2many-<uid>",
+    )
+
+    return parser.parse_args(arguments)
+
+
 def main():
+    if sys.argv[1:2] == ["serve"]:
+        from py2many.server import serve
+
+        serve_args = parse_serve_args(sys.argv[2:])
+        sys.exit(serve(serve_args.socket, parse_languages(serve_args.lang)))
+
     args = parse_args()
     sys.exit(transpile_from_args(args))
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Client of the ``py2many serve`` daemon.
+
+``py2many-client`` takes the same arguments as ``py2many``. It passes
+them to the daemon listening on ``$PY2MANY_SOCKET`` together with its
+working directory, environment and standard streams, and exits with the
+status of the request. Without a daemon it runs py2many itself.
+
+The request carries the environment and the streams of the client, so
+it is only sent to a daemon run by the same user. Where the platform
+can't tell who is at the other end of the socket, the socket has to be
+owned by the user.
+
+Only the standard library is imported here, so the client starts fast.
+"""
+
+import array
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+from pathlib import Path
+from typing import Optional, Sequence
+
+# Descriptors of stdin, stdout and stderr, sent along with a request
+STREAMS = (0, 1, 2)
+
+
+def default_socket_path() -> Path:
+    """
+    ``$PY2MANY_SOCKET``, else ``py2many.sock`` in ``$XDG_RUNTIME_DIR``,
+    else in a ``py2many-<uid>`` directory of the temp dir.
+    """
+    if "PY2MANY_SOCKET" in os.environ:
+        return Path(os.environ["PY2MANY_SOCKET"])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return Path(runtime_dir) / "py2many.sock"
+    return Path("/tmp") / f"py2many-{os.getuid()}" / "py2many.sock"
+
+
+def is_private_dir(path: Path) -> bool:
+    """Check if `path` is a directory of the user that no one else can write to."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        stat.S_ISDIR(st.st_mode)
+        and st.st_uid == os.getuid()
+        and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def peer_uid(conn: socket.socket) -> Optional[int]:
+    """The user at the other end of a Unix socket, None if the platform can't tell."""
+    if not hasattr(socket, "SO_PEERCRED"):
+        return None
+    creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    _, uid, _ = struct.unpack("3i", creds)
+    return uid
+
+
+def recv_line(conn: socket.socket, fds: Optional[list] = None) -> bytes:
+    """Read up to a newline, collecting descriptors passed on the way."""
+    data = b""
+    while not data.endswith(b"\n"):
+        chunk, ancdata, _, _ = conn.recvmsg(4096, socket.CMSG_SPACE(64 * 4))
+        if not chunk:
+            raise ConnectionError("connection closed")
+        data += chunk
+        for level, kind, cmsg in ancdata:
+            if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+                received = array.array("i")
+                received.frombytes(cmsg[: len(cmsg) - len(cmsg) % received.itemsize])
+                if fds is not None:
+                    fds.extend(received)
+                else:
+                    for fd in received:
+                        os.close(fd)
+    return data
+
+
+def connect(path: Optional[Path] = None) -> socket.socket:
+    """
+    Connect to the daemon; raises OSError if none is listening, and
+    PermissionError if it isn't run by the user.
+    """
+    path = path or default_socket_path()
+    conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        conn.connect(str(path))
+        uid = peer_uid(conn)
+        if uid is None:
+            uid = os.stat(path).st_uid
+        if uid != os.getuid():
+            raise PermissionError(f"{path} is served by another user")
+    except OSError:
+        conn.close()
+        raise
+    return conn
+
+
+def request(conn: socket.socket, argv: Sequence[str]) -> int:
+    """Run py2many with `argv` in the daemon and return its exit status."""
+    message = {"argv": list(argv), "cwd": os.getcwd(), "env": dict(os.environ)}
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    socket.send_fds(conn, [json.dumps(message).encode() + b"\n"], list(STREAMS))
+    return json.loads(recv_line(conn))["status"]
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    try:
+        conn = connect()
+    except OSError as e:
+        if isinstance(e, PermissionError):
+            print(f"py2many-client: {e}, running py2many instead", file=sys.stderr)
+        # No daemon of the user running
+        os.execv(sys.executable, [sys.executable, "-m", "py2many", *argv])
+    with conn:
+        sys.exit(request(conn, argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import ast
+import functools
 import importlib
 import io  # noqa: F401
 import logging
@@ -29,6 +30,7 @@ from typing import (  # noqa: F401
     Tuple,
     Union,
     Mapping,
+    NamedTuple,
     Type,
 )
 
@@ -169,6 +171,33 @@ def class_for_typename(
 # if we will use typing.get_type_hints in the future, it already handles string annotations and forward references, so we might not need a custom solution at all. We can just rely on get_type_hints to resolve type annotations correctly, including those that are strings or forward references. This would simplify our code and make it more robust without needing to implement our own resolution logic.
 
 
+TYPENAME_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=TYPENAME_CACHE_SIZE)
+def _locate(typename: str) -> Any:
+    """
+    pydoc.locate, which imports modules and walks their attributes,
+    cached for the whole process. Names which can't be located are
+    cached as None too.
+
+    Only names missing from the namespaces given to class_for_typename
+    get here, so the result depends on the typename alone.
+    """
+    import pydoc
+
+    try:
+        return pydoc.locate(typename)
+    except Exception as exc:
+        logger.debug("Could not locate typename '%s': %s", typename, exc)
+        return None
+
+
+def typename_cache_info() -> functools._CacheInfo:
+    """Hits and misses of the typename resolution cache."""
+    return _locate.cache_info()
+
+
 def class_for_typename(
         typename: str | None,
         default_type: Any = None,
@@ -187,8 +216,7 @@ def class_for_typename(
             resolved = globals()[typename]
         else:
             # Спроба завантажити як повний шлях до класу
-            import pydoc
-            resolved = pydoc.locate(typename)
+            resolved = _locate(typename)
 
         if resolved is None:
             return default_type
@@ -212,6 +240,147 @@ def class_for_typename(
 
 
 
+def _hashable(func: Any) -> Optional[Any]:
+    """`func` if it can key the dispatch tables, else None."""
+    if func is None:
+        return None
+
+    try:
+        hash(func)
+    except TypeError:
+        logger.debug("%s is not hashable", func)
+        return None
+
+    return func
+
+
+class DispatchEntry(NamedTuple):
+    """What `CLikeTranspiler._dispatch` does for a function name."""
+
+    handler: Callable[..., Any]
+    with_self: bool
+    usings: Tuple[str, ...] = ()
+    sets_result_type: bool = False
+    result_type: Any = None
+    stem: Optional[str] = None
+    """Prefix of the result, for names dispatched by their leaf"""
+
+
+class DispatchIndex:
+    """
+    The dispatch maps of a backend compiled into one index from function
+    names to their `DispatchEntry`.
+
+    The names of the maps, the qualified names and leaf names of the
+    objects in FUNC_DISPATCH_TABLE are indexed up front, any other name
+    when it is first dispatched. Names which the module being transpiled
+    imports resolve differently per module and aren't indexed.
+    """
+
+    def __init__(self, transpiler: "CLikeTranspiler"):
+        self._maps = self._maps_of(transpiler)
+        (
+            self._dispatch_map,
+            self._small_dispatch_map,
+            self._small_usings_map,
+            self._func_dispatch_table,
+            self._func_usings_map,
+        ) = self._maps
+        self._func_name_split = transpiler._func_name_split
+        self._static_func_for_lookup = transpiler._static_func_for_lookup
+        self._entries: Dict[str, Optional[DispatchEntry]] = {}
+
+        names = [
+            *self._dispatch_map,
+            *self._small_dispatch_map,
+        ]
+        for func in self._func_dispatch_table:
+            if isinstance(func, str):
+                names.append(func)
+                continue
+            name = getattr(func, "__name__", None)
+            module = getattr(func, "__module__", None)
+            qualname = getattr(func, "__qualname__", name)
+            if name:
+                names.append(name)
+            if module and qualname:
+                names.append(f"{module}.{qualname}")
+        for name in names:
+            self.lookup(name)
+
+    @staticmethod
+    def _maps_of(transpiler: "CLikeTranspiler") -> Tuple[Mapping, ...]:
+        return (
+            transpiler._dispatch_map,
+            transpiler._small_dispatch_map,
+            transpiler._small_usings_map,
+            transpiler._func_dispatch_table,
+            transpiler._func_usings_map,
+        )
+
+    def compiled_from(self, transpiler: "CLikeTranspiler") -> bool:
+        """True if the maps of `transpiler` are the ones indexed."""
+        return all(a is b for a, b in zip(self._maps, self._maps_of(transpiler)))
+
+    def lookup(self, fname: str) -> Optional[DispatchEntry]:
+        """The entry of a name not imported by the module, memoized."""
+        try:
+            return self._entries[fname]
+        except KeyError:
+            entry = self._entries[fname] = self.resolve(fname, self._static_func_for_lookup)
+            return entry
+
+    def resolve(
+            self,
+            fname: str,
+            func_for_lookup: Callable[[str], Optional[Any]],
+    ) -> Optional[DispatchEntry]:
+        """Find the entry of `fname` in the maps, in dispatch order."""
+        # 1. direct dispatch
+        handler = self._dispatch_map.get(fname)
+        if handler:
+            return DispatchEntry(handler, with_self=True)
+
+        # 2. small dispatch
+        handler = self._small_dispatch_map.get(fname)
+        if handler:
+            using = self._small_usings_map.get(fname)
+            return DispatchEntry(handler, with_self=False, usings=(using,) if using else ())
+
+        # 3. object dispatch
+        func = func_for_lookup(fname)
+        if func is not None:
+            entry = self._func_dispatch_table.get(func)
+            if entry:
+                handler, result_type = entry
+                usings = ()
+                if func in self._func_usings_map:
+                    usings = (self._func_usings_map[func],)
+                return DispatchEntry(
+                    handler,
+                    with_self=True,
+                    usings=usings,
+                    sets_result_type=True,
+                    result_type=result_type,
+                )
+
+        # 4. leaf fallback
+        stem, leaf = self._func_name_split(fname)
+
+        entry = self._func_dispatch_table.get(leaf)
+        if entry:
+            handler, result_type = entry
+            return DispatchEntry(
+                handler,
+                with_self=True,
+                sets_result_type=True,
+                result_type=result_type,
+                stem=stem,
+            )
+
+        return None
+
+
 def c_symbol(node: ast.AST) -> str:
     """
     Map a Python AST operator node to its C-like symbol representation.
@@ -241,6 +410,7 @@ class CLikeTranspiler(ast.NodeVisitor):
 
     builtin_constants = frozenset(["True", "False"])
     _default_type = _AUTO
+    # Overridden by each backend's subclass, read by the classmethods below
     _type_map: Dict[Any, str] = {}
     _container_type_map: Dict[str, str] = {}
 
@@ -632,8 +802,22 @@ class CLikeTranspiler(ast.NodeVisitor):
         if type(node) in symbols:
             return c_symbol(node)
 
+        return self._in_context(super().visit, node)
+
+
+    def emit_module(self, node: ast.Module) -> List[str]:
+        """
+        `module_chunks` of a module, with unexpected errors raised as
+        AstNotImplementedError like those of `visit`.
+        """
+        return self._in_context(self.module_chunks, node)
+
+
+    @staticmethod
+    def _in_context(emit: Callable[[ast.AST], Any], node: ast.AST) -> Any:
+        """Call `emit`, re-raising unexpected errors as AstNotImplementedError at `node`."""
         try:
-            return super().visit(node)
+            return emit(node)
         except AstNotImplementedError:
             raise
         except Exception as exc:
@@ -649,14 +833,21 @@ class CLikeTranspiler(ast.NodeVisitor):
 
 
     def visit_Module(self, node) -> str:
-        """Visit a module node and emit the top-level translation unit.
+        """Visit a module node and emit the top-level translation unit."""
+        return "\n".join(self.module_chunks(node))
+
+
+    def module_chunks(self, node: ast.Module) -> List[str]:
+        """Emit the top-level statements of a module, one chunk each.
 
         The module is emitted in two conceptual stages:
         1. Top-level declarations (imports, classes, constants, etc.)
         2. Callable definitions (functions, async functions)
 
         This ordering ensures that declarations appear before functions
-        in generated C-like targets.
+        in generated C-like targets. The pipeline joins the chunks with
+        the headers of the module, so the code of a large module is not
+        copied into an intermediate string first.
         """
 
         buf = []
@@ -675,7 +866,7 @@ class CLikeTranspiler(ast.NodeVisitor):
                 if result:
                     buf.append(result)
 
-        return "\n".join(buf)
+        return buf
 
 
     def visit_alias(self, node: ast.alias) -> Tuple[str, Optional[str]]:
@@ -1413,6 +1604,30 @@ class CLikeTranspiler(ast.NodeVisitor):
 
     # MARK: - Generators, comprehensions
 
+    def _list_capacity(self, node: ast.List) -> Optional[str]:
+        """
+        The number of elements an empty list literal is filled with, as
+        bounded by ListCapacityTransformer, or None if it isn't known.
+        A count that isn't a literal may be negative.
+        """
+        counted = getattr(node, "capacity_of", None)
+        if counted is None:
+            return None
+        factor = node.capacity_factor
+        if isinstance(counted, (ast.List, ast.Tuple)):
+            return str(len(counted.elts) * factor)
+
+        args = counted.args
+        bounds = [a.value if isinstance(a, ast.Constant) else None for a in args]
+        if all(type(b) is int for b in bounds):
+            start, stop = ([0] + bounds)[-2:]
+            return str(max(stop - start, 0) * factor)
+        count = self.visit(args[-1])
+        if len(args) == 2:
+            count = f"{count} - {self.visit(args[0])}"
+        return count if factor == 1 else f"({count}) * {factor}"
+
+
     def visit_GeneratorExp(self, node) -> str:
         """Generator expressions like ``(x for x in iterable)``."""
         body = [node.elt] + node.generators
@@ -1508,17 +1723,24 @@ class CLikeTranspiler(ast.NodeVisitor):
             Resolved callable object if hashable.
             None if resolution fails.
         """
-        func = class_for_typename(fname, None, self._imported_names)
-        if func is None:
-            return None
+        return _hashable(
+            class_for_typename(self._func_lookup_name(fname), None, self._imported_names)
+        )
 
-        try:
-            hash(func)
-        except TypeError:
-            logger.debug("%s is not hashable", func)
-            return None
+    def _func_lookup_name(self, fname: str) -> str:
+        """The Python name a function name of the target language resolves as."""
+        return fname
+
+    def _static_func_for_lookup(self, fname: str) -> Optional[Any]:
+        """`_func_for_lookup` for a name which isn't imported by the module."""
+        return _hashable(class_for_typename(self._func_lookup_name(fname)))
 
-        return func
+    def compile_dispatch(self) -> DispatchIndex:
+        """The dispatch maps compiled into an index, built when they change."""
+        index = self.__dict__.get("_dispatch_index")
+        if index is None or not index.compiled_from(self):
+            index = self._dispatch_index = DispatchIndex(self)
+        return index
 
     @staticmethod
     def _func_name_split(fname: str) -> Tuple[str, str]:
@@ -1560,51 +1782,30 @@ class CLikeTranspiler(ast.NodeVisitor):
                 matched; otherwise, None.
         """
 
-        def safe_call(handler, use_self=True):
-            try:
-                if use_self:
-                    return handler(self, node, vargs)
-                return handler(node, vargs)
-            except IndexError:
-                return None
-
-        # 1. direct dispatch
-        handler = self._dispatch_map.get(fname)
-        if handler:
-            return safe_call(handler)
-
-        # 2. small dispatch
-        handler = self._small_dispatch_map.get(fname)
-        if handler:
-            using = self._small_usings_map.get(fname)
-            if using:
-                self._usings.add(using)
-            return safe_call(handler, use_self=False)
-
-        # 3. object dispatch
-        func = self._func_for_lookup(fname)
-        if func is not None:
-            entry = self._func_dispatch_table.get(func)
-            if entry:
-                handler, result_type = entry
-
-                if func in self._func_usings_map:
-                    self._usings.add(self._func_usings_map[func])
-
-                node.result_type = result_type
-                return safe_call(handler)
-
-        # 4. leaf fallback
-        stem, leaf = self._func_name_split(fname)
+        index = self.compile_dispatch()
+        if self._func_lookup_name(fname) in self._imported_names:
+            # Resolved by the imports of this module, can't be shared
+            entry = index.resolve(fname, self._func_for_lookup)
+        else:
+            entry = index.lookup(fname)
+        if entry is None:
+            return None
 
-        entry = self._func_dispatch_table.get(leaf)
-        if entry:
-            handler, result_type = entry
-            node.result_type = result_type
+        for using in entry.usings:
+            self._usings.add(using)
+        if entry.sets_result_type:
+            node.result_type = entry.result_type
 
-            result = safe_call(handler)
-            return f"{stem}{result}" if result is not None else None
+        try:
+            if entry.with_self:
+                result = entry.handler(self, node, vargs)
+            else:
+                result = entry.handler(node, vargs)
+        except IndexError:
+            return None
 
-        return None
+        if entry.stem is not None:
+            return f"{entry.stem}{result}" if result is not None else None
+        return result
 
 
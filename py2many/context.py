@@ -1,6 +1,9 @@
 import ast
+from typing import Iterator
 
-from .scope import ScopeMixin
+from .ast_helpers import get_id
+from .passes import SKIP, AnalysisPass
+from .scope import ScopeTransformer
 
 
 def add_list_calls(node: ast.AST) -> ast.AST:
@@ -8,6 +11,11 @@ def add_list_calls(node: ast.AST) -> ast.AST:
     return ListCallTransformer().visit(node)
 
 
+def add_list_capacity(node: ast.AST) -> ast.AST:
+    """Bound the length of lists filled by a loop"""
+    return ListCapacityTransformer().visit(node)
+
+
 def add_variable_context(node: ast.AST, trees: list[ast.AST]) -> ast.AST:
     """Provide context to Module and Function Def"""
     return VariableTransformer(trees).visit(node)
@@ -18,47 +26,7 @@ def add_assignment_context(node: ast.AST) -> ast.AST:
     return LHSAnnotationTransformer().visit(node)
 
 
-class ListCallTransformer(ast.NodeTransformer):
-    """
-    Adds all calls to list to scope block.
-    You need to apply VariableTransformer before you use it.
-    """
-
-    def visit_Call(self, node: ast.Call) -> ast.AST:
-        """Annotate calls to list with context of the list variable"""
-        if self.is_list_addition(node):
-            var = node.scopes.find(node.func.value.id)
-            if var is not None and self.is_list_assignment(var.assigned_from):
-                if not hasattr(var, "calls"):
-                    var.calls = []
-                var.calls.append(node)
-        return node
-
-    @staticmethod
-    def is_list_assignment(node):
-        """Check if variable is assigned to a list"""
-        return (
-            hasattr(node, "value")
-            and isinstance(node.value, ast.List)
-            and hasattr(node, "targets")
-            and isinstance(node.targets[0].ctx, ast.Store)
-        )
-
-    @staticmethod
-    def is_list_addition(node):
-        """Check if operation is adding something to a list"""
-        list_operations = ["append", "extend", "insert"]
-        return (
-            hasattr(node.func, "ctx")
-            and isinstance(node.func.ctx, ast.Load)
-            and hasattr(node.func, "value")
-            and isinstance(node.func.value, ast.Name)
-            and hasattr(node.func, "attr")
-            and node.func.attr in list_operations
-        )
-
-
-class VariableTransformer(ast.NodeTransformer, ScopeMixin):
+class VariableTransformer(AnalysisPass):
     """Adds all defined variables to scope block"""
 
     def __init__(self, trees):
@@ -68,7 +36,7 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         else:
             self._trees = {t.__file__.stem: t for t in trees}
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+    def enter_FunctionDef(self, node: ast.FunctionDef) -> None:
         node.vars = []
         # So function signatures are accessible even after they're
         # popped from the scope
@@ -76,47 +44,39 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
         for arg in node.args.args:
             arg.assigned_from = node
             node.vars.append(arg)
-        self.generic_visit(node)
-        return node
 
-    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+    def enter_ClassDef(self, node: ast.ClassDef) -> None:
         node.vars = []
         # So classes are accessible even after they're
         # popped from the scope
         self.scopes[-2].vars.append(node)
-        self.generic_visit(node)
-        return node
 
-    def visit_Import(self, node: ast.Import) -> ast.AST:
+    def enter_Import(self, node: ast.Import) -> object:
         for name in node.names:
             name.imported_from = node
-        return node
+        return SKIP
 
-    def visit_ImportFrom(self, node: ast.ImportFrom) -> ast.AST:
+    def enter_ImportFrom(self, node: ast.ImportFrom) -> object:
         module_path = node.module
         names = [n.name for n in node.names]
         if module_path in self._trees:
             m = self._trees[module_path]
             resolved_names = [m.scopes.find(n) for n in names]
             node.scopes[-1].vars += resolved_names
-        return node
+        return SKIP
 
-    def visit_If(self, node: ast.If) -> ast.AST:
+    def enter_If(self, node: ast.If) -> None:
         node.vars = []
-        self.visit(node.test)
-        for e in node.body:
-            self.visit(e)
-        node.body_vars = node.vars
 
+    def leave_If_body(self, node: ast.If) -> None:
+        node.body_vars = node.vars
         node.vars = []
-        for e in node.orelse:
-            self.visit(e)
-        node.orelse_vars = node.vars
 
+    def leave_If_orelse(self, node: ast.If) -> None:
+        node.orelse_vars = node.vars
         node.vars = []
-        return node
 
-    def visit_For(self, node):
+    def enter_For(self, node):
         node.target.assigned_from = node
         if isinstance(node.target, ast.Name):
             node.vars = [node.target]
@@ -124,80 +84,211 @@ class VariableTransformer(ast.NodeTransformer, ScopeMixin):
             node.vars = [*node.target.elts]
         else:
             node.vars = []
-        self.generic_visit(node)
-        return node
 
-    def visit_Module(self, node):
+    def enter_Module(self, node):
         node.vars = []
-        self.generic_visit(node)
-        return node
 
-    def visit_With(self, node):
+    def enter_With(self, node):
         node.vars = []
-        self.generic_visit(node)
-        return node
-
-    def visit(self, node):
-        with self.enter_scope(node):
-            return super().visit(node)
 
-    def visit_Assign(self, node):
+    def enter_Assign(self, node):
         for target in node.targets:
             if isinstance(target, ast.Name):
                 target.assigned_from = node
                 self.scope.vars.append(target)
-        self.generic_visit(node)
-        return node
 
-    def visit_AnnAssign(self, node):
+    def enter_AnnAssign(self, node):
         target = node.target
         if isinstance(target, ast.Name):
             target.assigned_from = node
             self.scope.vars.append(target)
-        self.generic_visit(node)
-        return node
 
-    def visit_AugAssign(self, node):
+    def enter_AugAssign(self, node):
         target = node.target
         if isinstance(target, ast.Name):
             target.assigned_from = node
             self.scope.vars.append(target)
-        self.generic_visit(node)
-        return node
 
 
-class LHSAnnotationTransformer(ast.NodeTransformer):
+class ListCallTransformer(AnalysisPass):
+    """
+    Adds all calls to list to scope block.
+    You need to apply VariableTransformer before you use it.
+    """
+
+    requires = (VariableTransformer, ScopeTransformer)
+
+    def enter_Call(self, node: ast.Call) -> object:
+        """Annotate calls to list with context of the list variable"""
+        if self.is_list_addition(node):
+            var = node.scopes.find(node.func.value.id)
+            if var is not None and self.is_list_assignment(var.assigned_from):
+                if not hasattr(var, "calls"):
+                    var.calls = []
+                var.calls.append(node)
+        return SKIP
+
+    @staticmethod
+    def is_list_assignment(node):
+        """Check if variable is assigned to a list"""
+        return (
+            hasattr(node, "value")
+            and isinstance(node.value, ast.List)
+            and (
+                (hasattr(node, "targets") and isinstance(node.targets[0].ctx, ast.Store))
+                or isinstance(node, ast.AnnAssign)
+            )
+        )
+
+    @staticmethod
+    def is_list_addition(node):
+        """Check if operation is adding something to a list"""
+        list_operations = ["append", "extend", "insert"]
+        return (
+            hasattr(node.func, "ctx")
+            and isinstance(node.func.ctx, ast.Load)
+            and hasattr(node.func, "value")
+            and isinstance(node.func.value, ast.Name)
+            and hasattr(node.func, "attr")
+            and node.func.attr in list_operations
+        )
+
+
+class LHSAnnotationTransformer(AnalysisPass):
     """Annotate nodes on the LHS of an assigment"""
-    def __init__(self):
-        super().__init__()
-        self._lhs = False
 
-    def visit(self, node):
-        if self._lhs:
-            node.lhs = self._lhs
-        return super().visit(node)
+    @staticmethod
+    def _annotate(target: ast.AST) -> None:
+        for node in ast.walk(target):
+            node.lhs = True
 
-    def visit_Assign(self, node):
+    def enter_Assign_targets(self, node):
         for target in node.targets:
-            self._lhs = True
-            self.visit(target)
-            self._lhs = False
-        self.visit(node.value)
-        return node
-
-    def visit_AnnAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.annotation)
-        if node.value is not None:
-            self.visit(node.value)
-        return node
-
-    def visit_AugAssign(self, node):
-        self._lhs = True
-        self.visit(node.target)
-        self._lhs = False
-        self.visit(node.op)
-        self.visit(node.value)
-        return node
+            self._annotate(target)
+
+    def enter_AnnAssign_target(self, node):
+        self._annotate(node.target)
+
+    def enter_AugAssign_target(self, node):
+        self._annotate(node.target)
+
+
+class ListCapacityTransformer(AnalysisPass):
+    """
+    Bounds the length of empty lists filled by the loop right after them:
+
+        out = []
+        for i in range(n):
+            out.append(f(i))
+
+    The list literal gets `capacity_of`, the range() call or literal the
+    loop iterates over, and `capacity_factor`, the appends per iteration,
+    so backends can allocate it once. Only the arguments of range() which
+    can be evaluated again without side effects are accepted, and loops
+    that may stop early or skip an append are left alone.
+    You need to apply ListCallTransformer before you use it.
+    """
+
+    requires = (ListCallTransformer,)
+
+    def _enter_block(self, node: ast.AST) -> None:
+        for field in ("body", "orelse", "finalbody"):
+            stmts = getattr(node, field, None)
+            if isinstance(stmts, list):
+                for stmt, loop in zip(stmts, stmts[1:]):
+                    self._bound(stmt, loop)
+
+    enter_Module = enter_FunctionDef = enter_AsyncFunctionDef = _enter_block
+    enter_For = enter_While = enter_If = enter_With = _enter_block
+    enter_Try = enter_ExceptHandler = _enter_block
+
+    def _bound(self, stmt: ast.stmt, loop: ast.stmt) -> None:
+        if not isinstance(loop, ast.For) or loop.orelse:
+            return
+        if isinstance(stmt, ast.Assign) and len(stmt.targets) == 1:
+            target = stmt.targets[0]
+        elif isinstance(stmt, ast.AnnAssign):
+            target = stmt.target
+        else:
+            return
+        value = stmt.value
+        if not isinstance(target, ast.Name) or not isinstance(value, ast.List):
+            return
+        if value.elts or not self.is_counted(loop.iter):
+            return
+
+        calls = getattr(target, "calls", [])
+        appends = [
+            s.value
+            for s in loop.body
+            if isinstance(s, ast.Expr) and any(s.value is call for call in calls)
+        ]
+        if not calls or len(appends) != len(calls):
+            return
+        if any(call.func.attr != "append" for call in calls):
+            return
+        last_append = max(
+            i
+            for i, s in enumerate(loop.body)
+            if isinstance(s, ast.Expr) and any(s.value is call for call in calls)
+        )
+        for i, s in enumerate(loop.body):
+            for jump in self.jumps(s):
+                if not isinstance(jump, ast.Continue) or i < last_append:
+                    return
+        value.capacity_of = loop.iter
+        value.capacity_factor = len(calls)
+
+    @classmethod
+    def jumps(cls, node: ast.AST, inner_loop: bool = False) -> Iterator[ast.AST]:
+        """
+        Yield the nodes in a loop body statement which leave the loop or
+        go to its next iteration. Nested functions are skipped, and so are
+        break and continue belonging to nested loops.
+        """
+        if isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            return
+        if isinstance(node, (ast.Return, ast.Raise, ast.Yield, ast.YieldFrom)) or (
+            isinstance(node, (ast.Break, ast.Continue)) and not inner_loop
+        ):
+            yield node
+        is_loop = isinstance(node, (ast.For, ast.AsyncFor, ast.While))
+        for field, value in ast.iter_fields(node):
+            for child in value if isinstance(value, list) else [value]:
+                if isinstance(child, ast.AST):
+                    inner = inner_loop or (is_loop and field == "body")
+                    yield from cls.jumps(child, inner)
+
+    @classmethod
+    def is_counted(cls, node: ast.expr) -> bool:
+        """Check if the length of an iterable is known before iterating it"""
+        if isinstance(node, (ast.List, ast.Tuple)):
+            return not any(isinstance(e, ast.Starred) for e in node.elts)
+        return (
+            isinstance(node, ast.Call)
+            and get_id(node.func) == "range"
+            and 1 <= len(node.args) <= 2
+            and not node.keywords
+            and all(cls.is_pure(arg) for arg in node.args)
+        )
+
+    @classmethod
+    def is_pure(cls, node: ast.expr) -> bool:
+        """Check if an int expression has no side effects"""
+        if isinstance(node, (ast.Constant, ast.Name)):
+            return True
+        if isinstance(node, ast.Attribute):
+            return cls.is_pure(node.value)
+        if isinstance(node, ast.UnaryOp):
+            return cls.is_pure(node.operand)
+        if isinstance(node, ast.BinOp):
+            return cls.is_pure(node.left) and cls.is_pure(node.right)
+        return (
+            isinstance(node, ast.Call)
+            and get_id(node.func) == "len"
+            and len(node.args) == 1
+            and not node.keywords
+            and cls.is_pure(node.args[0])
+        )
@@ -4,12 +4,19 @@ DEFAULTS = {
     "indent": 4,
     "no_prologue": False,
     "extension": False,
+    "buffered_output": False,
     "suffix": "",
     "comment_unsupported": False,
     "ignore_formatter_errors": False,
     "typpete": False,
     "version": False,
     "project": None,
+    "jobs": 1,
+    "cache": False,
+    "cache_dir": None,
+    "incremental": False,
+    "watch": False,
+    "profile_passes": None,
 }
 
 
@@ -23,4 +30,7 @@ class Defaults:
     ignore_formatter_errors: bool = False
     typpete: bool = False
     version: bool = False
-    project: bool = False
\ No newline at end of file
+    project: bool = False
+    jobs: int = 1
+    cache: bool = False
+    cache_dir: str | None = None
\ No newline at end of file
@@ -0,0 +1,66 @@
+"""
+Dirty tracking between the two core analysis passes of the pipeline.
+
+The language transformers and the post rewriters run on an already
+analysed tree. The analysis only has to be repeated if they changed it:
+
+* subtrees they replaced or restructured are found by comparing a
+  structural digest of every top level statement;
+* changes invisible to the structure, like attributes read by the
+  analysis passes (`annotation`, `use_integer_div`, ...), have to be
+  reported by the rewriter with `mark_dirty`.
+"""
+
+import ast
+import hashlib
+from collections import Counter
+from typing import List
+
+# Bumped by mark_dirty, so trackers only search for marks if there are any
+_generation = 0
+
+
+def mark_dirty(node: ast.AST) -> None:
+    """Report an in-place change of `node` the core analysis depends on."""
+    global _generation
+    node.dirty = True
+    _generation += 1
+
+
+def generation() -> int:
+    """Changes whenever `mark_dirty` is called."""
+    return _generation
+
+
+def _digest(node: ast.AST) -> str:
+    return hashlib.sha1(ast.dump(node).encode()).hexdigest()
+
+
+class DirtyTracker:
+    """Find the top level statements of a module changed since a snapshot."""
+
+    def __init__(self, tree: ast.Module):
+        self._digests = Counter(_digest(stmt) for stmt in tree.body)
+        self._count = len(tree.body)
+        self._generation = _generation
+
+    def dirty_statements(self, tree: ast.Module) -> List[ast.stmt]:
+        marked = self._generation != _generation
+        unchanged = self._digests.copy()
+        dirty = []
+        for stmt in tree.body:
+            digest = _digest(stmt)
+            if unchanged[digest] > 0 and not (marked and self._has_mark(stmt)):
+                unchanged[digest] -= 1
+            else:
+                dirty.append(stmt)
+        return dirty
+
+    def is_dirty(self, tree: ast.Module) -> bool:
+        """True if the tree needs to be analysed again."""
+        # Removed statements can change what the others resolve to
+        return len(tree.body) != self._count or bool(self.dirty_statements(tree))
+
+    @staticmethod
+    def _has_mark(stmt: ast.stmt) -> bool:
+        return any(getattr(node, "dirty", False) for node in ast.walk(stmt))
@@ -23,13 +23,27 @@ class AstErrorBase:
     Base class for AST-related errors, capturing line number and column
     offset from the AST node.
     May be used for more informative error messages that include the
-    location of the error in the source code.
+    location of the error in the source code. Nodes without a position,
+    like ast.Module, are located at the start of the file.
     """
     def __init__(self, msg: str, node: ast.AST):
-        self.lineno = node.lineno
-        self.col_offset = node.col_offset
+        self.lineno = getattr(node, "lineno", 1)
+        self.col_offset = getattr(node, "col_offset", 0)
         super().__init__(msg)  # noqa: other mechanisms of subclassing Exception
 
+    def __reduce__(self):
+        """Subclasses take varying constructor arguments, so rebuild
+        from the message and location instead (needed by worker pools)."""
+        return _rebuild_ast_error, (type(self), str(self), self.lineno, self.col_offset)
+
+
+def _rebuild_ast_error(cls, msg: str, lineno: int, col_offset: int):
+    error = cls.__new__(cls)
+    Exception.__init__(error, msg)
+    error.lineno = lineno
+    error.col_offset = col_offset
+    return error
+
 
 class AstNotImplementedError(AstErrorBase, NotImplementedError):
     """Node is not supported by the transpiler"""
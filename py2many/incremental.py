@@ -0,0 +1,210 @@
+"""
+Dependency-aware incremental rebuilds of transpiled directories.
+
+A build state file in the output directory remembers, per module, the
+hash of its source, the project modules it imports and fingerprints of
+the output written for it. On the next run only modules whose source
+changed, and the modules importing them (directly or transitively), are
+transpiled again. Outputs whose content didn't change are not rewritten,
+so build tools watching the output keep their caches warm.
+"""
+
+import ast
+import hashlib
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+from .cache import code_fingerprint, imported_modules
+from .language import LanguageSettings
+from .utilities.toposort_modules import get_dependencies, module_for_path
+
+STATE_FILENAME = ".py2many-state.json"
+
+AnalysedTrees = Dict[Path, ast.AST]
+"""
+Trees of modules as left by their last transpile, kept in memory between
+the builds of --watch. A module that is not outdated can stand in with
+its tree for the modules importing it, instead of being transpiled again.
+"""
+
+
+def content_digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ModuleState:
+    """What is known about a module after it was transpiled successfully."""
+    source: str
+    """Digest of the Python source."""
+
+    imports: List[str] = field(default_factory=list)
+    """Project modules (as paths relative to the source dir) it depends on."""
+
+    generated: Optional[str] = None
+    """Digest of the transpiled output, before formatting."""
+
+    written: Optional[str] = None
+    """Digest of the output file as left on disk, after formatting."""
+
+
+class BuildState:
+    """Per output directory record of the previous build."""
+
+    def __init__(self, path: Path, fingerprint: str, modules: Dict[str, ModuleState]):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.modules = modules
+        # Import graph of modules being rebuilt, and what was recorded before
+        self._pending_imports: Dict[str, List[str]] = {}
+        self._previous: Dict[str, ModuleState] = {}
+        self.unparsable: Dict[Path, SyntaxError] = {}
+        """Outdated modules that failed to parse, by the last `outdated`."""
+
+    @classmethod
+    def load(cls, out_dir: Path, settings: LanguageSettings) -> "BuildState":
+        """Load the state of `out_dir`; it is empty if py2many or settings changed."""
+        path = out_dir / STATE_FILENAME
+        fingerprint = content_digest(code_fingerprint() + settings.fingerprint())
+        modules: Dict[str, ModuleState] = {}
+        try:
+            data = json.loads(path.read_text())
+            if data.get("fingerprint") == fingerprint:
+                modules = {
+                    name: ModuleState(**module) for name, module in data["modules"].items()
+                }
+        except (OSError, ValueError, TypeError, KeyError):
+            pass
+        return cls(path, fingerprint, modules)
+
+    def save(self) -> None:
+        data = {
+            "fingerprint": self.fingerprint,
+            "modules": {name: asdict(module) for name, module in sorted(self.modules.items())},
+        }
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(data, indent=1))
+
+    def outdated(
+            self,
+            filenames: Sequence[Path],
+            sources: Sequence[str],
+            output_paths: Sequence[Path],
+    ) -> Set[Path]:
+        """
+        Modules that need to be transpiled again: new or changed ones,
+        ones whose output is gone, and everything importing those.
+
+        Also refreshes the recorded import graph of changed modules.
+        Changed modules that don't parse are still outdated, and kept in
+        `unparsable`; until they do, their imports are the recorded ones.
+        """
+        changed: Set[Path] = set()
+        parsed: List[ast.AST] = []
+        self.unparsable = {}
+        for filename, source, output_path in zip(filenames, sources, output_paths):
+            module = self.modules.get(str(filename))
+            if (
+                    module is None
+                    or module.source != content_digest(source)
+                    or not output_path.exists()
+            ):
+                changed.add(filename)
+                try:
+                    tree = ast.parse(source, filename=str(filename))
+                except SyntaxError as e:
+                    self.unparsable[filename] = e
+                    continue
+                setattr(tree, "__file__", filename)
+                parsed.append(tree)
+
+        current = {str(f) for f in filenames}
+        removed = set(self.modules) - current
+
+        imports = {
+            name: set(module.imports) for name, module in self.modules.items() if name in current
+        }
+        imports.update(_project_imports(parsed, filenames))
+
+        importers: Dict[str, Set[str]] = {}
+        for name, deps in imports.items():
+            for dep in deps:
+                importers.setdefault(dep, set()).add(name)
+
+        outdated = {str(f) for f in changed}
+        pending = [*outdated, *removed]
+        while pending:
+            for importer in importers.get(pending.pop(), ()):
+                if importer not in outdated:
+                    outdated.add(importer)
+                    pending.append(importer)
+
+        for name in removed:
+            del self.modules[name]
+        for name in outdated:
+            # Forget outdated modules until they are transpiled successfully
+            module = self.modules.pop(name, None)
+            self._pending_imports[name] = sorted(imports.get(name, ()))
+            if module is not None:
+                self._previous[name] = module
+
+        return {f for f in filenames if str(f) in outdated}
+
+    def import_closure(self, filenames: Iterable[Path], project: Sequence[Path]) -> Set[Path]:
+        """The given modules plus the project modules they import, transitively."""
+        by_name = {str(f): f for f in project}
+        closure: Set[Path] = set()
+        pending = list(filenames)
+        while pending:
+            filename = pending.pop()
+            if filename in closure:
+                continue
+            closure.add(filename)
+            name = str(filename)
+            deps = (
+                self._pending_imports[name] if name in self._pending_imports
+                else self.modules[name].imports if name in self.modules
+                else ()
+            )
+            pending.extend(by_name[d] for d in deps if d in by_name)
+        return closure
+
+    def unchanged_output(self, filename: Path, output: str, output_path: Path) -> bool:
+        """True if `output` is what was generated before and its file is untouched."""
+        previous = self._previous.get(str(filename))
+        if previous is None or previous.generated != content_digest(output):
+            return False
+        try:
+            return content_digest(output_path.read_text()) == previous.written
+        except OSError:
+            return False
+
+    def record(self, filename: Path, source: str, output: str, output_path: Path) -> None:
+        """Remember a successfully transpiled (and formatted) module."""
+        name = str(filename)
+        self.modules[name] = ModuleState(
+            source=content_digest(source),
+            imports=self._pending_imports.get(name, []),
+            generated=content_digest(output),
+            written=content_digest(output_path.read_text()),
+        )
+
+
+def _project_imports(trees: Sequence[ast.AST], filenames: Sequence[Path]) -> Dict[str, Set[str]]:
+    """
+    Project modules each tree depends on: the import graph used for
+    toposorting, plus the modules VariableTransformer resolves by stem.
+    """
+    by_module = {module_for_path(f): str(f) for f in filenames}
+    by_stem = {f.stem: str(f) for f in filenames}
+    graph = get_dependencies(tuple(trees), frozenset(by_module))
+
+    result: Dict[str, Set[str]] = {}
+    for tree in trees:
+        filename = Path(getattr(tree, "__file__"))
+        deps = {by_module[m] for m in graph.get(module_for_path(filename), ())}
+        deps.update(by_stem[m] for m in imported_modules(tree) if m in by_stem)
+        result[str(filename)] = deps
+    return result
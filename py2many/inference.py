@@ -11,8 +11,9 @@ from ctypes import (
     c_uint64,
 )
 from dataclasses import dataclass
-from typing import Optional, Set, cast
+from typing import Dict, Optional, Set, cast
 
+from py2many import dirty
 from py2many.ast_helpers import create_ast_node, get_id
 from py2many.astx import LifeTime
 from py2many.clike import CLikeTranspiler, class_for_typename
@@ -49,12 +50,66 @@ def infer_types_typpete(node) -> InferMeta:
     return infer_types(node)
 
 
+@dataclass
+class InferenceStats:
+    """Definition lookups of get_inferred_type and get_inferred_language_type"""
+    lookups: int = 0
+    hits: int = 0
+
+    def __str__(self) -> str:
+        return f"{self.hits} of {self.lookups} definition lookups served from cache"
+
+
+INFERENCE_STATS = InferenceStats()
+
+
+class InferenceCache:
+    """
+    Definitions of the names of one module, as found by `scopes.find`.
+
+    The cache is dropped by `invalidate_inference`, which the pipeline
+    calls whenever the tree may have been restructured, and when a
+    rewriter reports a change with `mark_dirty`.
+    """
+
+    __slots__ = ("definitions", "generation")
+
+    def __init__(self) -> None:
+        self.definitions: Dict[ast.Name, Optional[ast.AST]] = {}
+        self.generation = dirty.generation()
+
+
+def invalidate_inference(tree: ast.AST) -> None:
+    """Forget the definitions cached for the names of `tree`."""
+    tree.inference_cache = InferenceCache()
+
+
+def find_definition(node: ast.Name) -> Optional[ast.AST]:
+    """``node.scopes.find(get_id(node))``, cached per module."""
+    scopes = node.scopes
+    if not scopes:
+        return scopes.find(get_id(node))
+
+    module = scopes[0]
+    cache = getattr(module, "inference_cache", None)
+    if cache is None or cache.generation != dirty.generation():
+        cache = module.inference_cache = InferenceCache()
+
+    INFERENCE_STATS.lookups += 1
+    definitions = cache.definitions
+    if node in definitions:
+        INFERENCE_STATS.hits += 1
+        return definitions[node]
+    definition = definitions[node] = scopes.find(get_id(node))
+    return definition
+
+
 def get_inferred_type(node):
     """Recursively infer the type of AST node based on annotations and context."""
     if isinstance(node, ast.Name):
         if not hasattr(node, "scopes"):
             return None
-        definition = node.scopes.find(get_id(node))
+        definition = find_definition(node)
         # Prevent infinite recursion
         if definition != node and definition is not None:
             return get_inferred_type(definition)
@@ -129,7 +184,7 @@ class LanguageInferenceBase:
         if isinstance(node, ast.Name):
             if not hasattr(node, "scopes"):
                 return None
-            definition = node.scopes.find(get_id(node))
+            definition = find_definition(node)
             # Prevent infinite recursion
             if definition != node:
                 return cls.get_inferred_language_type(definition, annotation_attr)
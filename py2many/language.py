@@ -1,4 +1,6 @@
 import ast
+import functools
+import hashlib
 from dataclasses import dataclass
 from typing import List, Optional, Protocol, Tuple
 
@@ -51,6 +53,15 @@ class LanguageSettings:
     """Command-line formatter to invoke after emitting code
     (e.g., 'black', 'clang-format')."""
 
+    batch_formatter: bool = False
+    """If True, the formatter accepts many files in one invocation, so
+    directories are formatted in chunks rather than file by file."""
+
+    stdin_formatter: Optional[Tuple[str, ...]] = None
+    """The formatter as a filter from stdin to stdout, so output can be
+    formatted in memory and written once. ``{filename}`` is replaced
+    with the path the output goes to. Only used along with `formatter`."""
+
     indent: Optional[str] = None
     """Default indentation unit for this language,
     e.g., '    ' (4 spaces) or '\\t' (tab).
@@ -85,6 +96,12 @@ class LanguageSettings:
     """If True, formatter failures won't break the transpilation pipeline."""
 
 
+    def __post_init__(self) -> None:
+        # Compile the call dispatch maps once per backend, not per call
+        compile_dispatch = getattr(self.transpiler, "compile_dispatch", None)
+        if compile_dispatch is not None:
+            compile_dispatch()
+
     def get_indent(self) -> str:
         """Return the indent unit for this language,
         falling back to 4 spaces if unset."""
@@ -94,6 +111,34 @@ class LanguageSettings:
         """Return the language's canonical internal ID."""
         return self.lang_id or self.display_name.lower()
 
+    def fingerprint(self) -> str:
+        """Identity of this configuration that is stable across processes.
+
+        Unlike `__hash__`, this doesn't depend on object identity, so it can
+        key persistent caches. It covers the backend classes, the passes and
+        the scalar options the transpiler was constructed with.
+        """
+        transpiler = self.transpiler
+        options = sorted(
+            (key, repr(value))
+            for key, value in vars(transpiler).items()
+            if isinstance(value, (bool, int, float, str, type(None)))
+        )
+        parts = (
+            _qualified_name(transpiler),
+            repr(getattr(transpiler, "_default_type", None)),
+            repr(options),
+            self.ext,
+            self.display_name,
+            repr(self.indent),
+            *(_qualified_name(p) for p in self.rewriters),
+            "|",
+            *(_qualified_name(p) for p in self.transformers),
+            "|",
+            *(_qualified_name(p) for p in self.post_rewriters),
+        )
+        return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
     def __repr__(self) -> str:
         return (
             f"<LanguageSettings for {self.display_name} "
@@ -106,3 +151,13 @@ class LanguageSettings:
         fmt = tuple(self.formatter or ())
         lint = tuple(self.linter or ())
         return hash((self.transpiler, fmt, lint))
+
+
+def _qualified_name(obj) -> str:
+    """Name a pass or transpiler independently of the process it lives in."""
+    if isinstance(obj, functools.partial):
+        keywords = sorted(obj.keywords.items())
+        return f"{_qualified_name(obj.func)}{obj.args!r}{keywords!r}"
+    if not hasattr(obj, "__qualname__"):
+        obj = type(obj)
+    return f"{obj.__module__}.{obj.__qualname__}"
@@ -0,0 +1,178 @@
+"""
+Analysis passes that share a walk over the tree.
+
+Each core analysis used to be a NodeTransformer with a full traversal of
+its own. An `AnalysisPass` instead declares hooks, which `run_passes`
+calls while walking the tree; passes that don't depend on each other's
+complete results are fused into a single walk:
+
+    enter_<Node>(node), leave_<Node>(node)
+        around the children of every node of that type
+    enter_<Node>_<field>(node), leave_<Node>_<field>(node)
+        around the children in one field of such a node
+    enter_node(node), leave_node(node)
+        around the children of every node
+
+An enter hook returning `SKIP` hides the children (or the field) from
+that pass only.
+
+A pass listing another pass type in `requires` needs the complete result
+of it, e.g. every variable of a scope, so it runs in a later walk.
+Within a walk, hooks of a node run in the order the passes were given.
+"""
+
+import ast
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple, Type
+
+SKIP = object()
+"""Returned by an enter hook to not walk into the children for that pass."""
+
+Hook = Tuple[int, Callable[[ast.AST], object]]
+
+
+class AnalysisPass:
+    """Base class of passes run by `run_passes`."""
+
+    requires: Tuple[Type["AnalysisPass"], ...] = ()
+    """Passes which must have walked the whole tree before this one."""
+
+    scopes: List[ast.AST]
+    """Enclosing scopes (module, functions, ...) of the node being visited."""
+
+    @property
+    def scope(self) -> Optional[ast.AST]:
+        return self.scopes[-1] if self.scopes else None
+
+    def visit(self, node: ast.AST) -> ast.AST:
+        """Run this pass alone."""
+        run_passes(node, (self,))
+        return node
+
+
+def schedule(passes: Sequence[AnalysisPass]) -> List[List[AnalysisPass]]:
+    """Group passes into as few walks as their requirements allow."""
+    levels: List[int] = []
+    for i, current in enumerate(passes):
+        level = 0
+        for j, other in enumerate(passes[:i]):
+            if isinstance(other, current.requires):
+                level = max(level, levels[j] + 1)
+        levels.append(level)
+
+    walks: List[List[AnalysisPass]] = [[] for _ in range(max(levels, default=-1) + 1)]
+    for level, current in zip(levels, passes):
+        walks[level].append(current)
+    return walks
+
+
+def run_passes(tree: ast.AST, passes: Sequence[AnalysisPass]) -> None:
+    for walk in schedule(passes):
+        run_walk(tree, walk)
+
+
+def run_walk(tree: ast.AST, walk: Sequence[AnalysisPass]) -> None:
+    """Walk the tree once, running the hooks of a group from `schedule`."""
+    _FusedWalk(walk).visit(tree)
+
+
+class _NodeHooks:
+    """Hooks of all passes of a walk for one node type."""
+
+    __slots__ = ("enter", "leave", "fields", "is_scope")
+
+    def __init__(self, cls: type, passes: Sequence[AnalysisPass]):
+        # scope.py defines its passes on top of this module
+        from .scope import _SCOPE_TYPES
+
+        name = cls.__name__
+        self.enter: List[Hook] = []
+        self.leave: List[Hook] = []
+        self.fields: Dict[str, Tuple[List[Hook], List[Hook]]] = {}
+        self.is_scope = issubclass(cls, _SCOPE_TYPES)
+
+        for i, current in enumerate(passes):
+            for hooks, prefix in ((self.enter, "enter_"), (self.leave, "leave_")):
+                for hook_name in (f"{prefix}node", f"{prefix}{name}"):
+                    hook = getattr(current, hook_name, None)
+                    if hook is not None:
+                        hooks.append((i, hook))
+
+            for field in cls._fields:
+                enter = getattr(current, f"enter_{name}_{field}", None)
+                leave = getattr(current, f"leave_{name}_{field}", None)
+                if enter is None and leave is None:
+                    continue
+                field_enter, field_leave = self.fields.setdefault(field, ([], []))
+                if enter is not None:
+                    field_enter.append((i, enter))
+                if leave is not None:
+                    field_leave.append((i, leave))
+
+
+class _FusedWalk:
+    def __init__(self, passes: Sequence[AnalysisPass]):
+        self._passes = passes
+        self._hooks: Dict[type, _NodeHooks] = {}
+        # Passes which skip the subtree being walked
+        self._disabled: Set[int] = set()
+        self.scopes: List[ast.AST] = []
+        for current in passes:
+            current.scopes = self.scopes
+
+    def _enter(self, hooks: List[Hook], node: ast.AST) -> List[int]:
+        disabled = self._disabled
+        skipped = []
+        for i, hook in hooks:
+            if disabled and i in disabled:
+                continue
+            if hook(node) is SKIP:
+                skipped.append(i)
+        return skipped
+
+    def _leave(self, hooks: List[Hook], node: ast.AST) -> None:
+        disabled = self._disabled
+        for i, hook in hooks:
+            if disabled and i in disabled:
+                continue
+            hook(node)
+
+    def visit(self, node: ast.AST) -> None:
+        cls = node.__class__
+        hooks = self._hooks.get(cls)
+        if hooks is None:
+            hooks = self._hooks[cls] = _NodeHooks(cls, self._passes)
+
+        if hooks.is_scope:
+            self.scopes.append(node)
+
+        skipped = self._enter(hooks.enter, node) if hooks.enter else None
+        if skipped:
+            self._disabled.update(skipped)
+
+        for field in node._fields:
+            value = getattr(node, field, None)
+            field_hooks = hooks.fields.get(field)
+            field_skipped = None
+            if field_hooks is not None:
+                field_skipped = self._enter(field_hooks[0], node)
+                self._disabled.update(field_skipped)
+
+            if isinstance(value, list):
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        self.visit(item)
+            elif isinstance(value, ast.AST):
+                self.visit(value)
+
+            if field_hooks is not None:
+                self._disabled.difference_update(field_skipped)
+                self._leave(field_hooks[1], node)
+
+        if skipped:
+            self._disabled.difference_update(skipped)
+
+        if hooks.leave:
+            self._leave(hooks.leave, node)
+
+        if hooks.is_scope:
+            self.scopes.pop()
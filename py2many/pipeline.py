@@ -26,14 +26,18 @@ code generation are intentionally preserved.
 
 import argparse
 import ast
+import copy
 import hashlib
 import inspect
+import multiprocessing
 import os
 import sys
 import tempfile
+import time
 import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from dataclasses import replace
-from functools import lru_cache
+from functools import lru_cache, partial
 from pathlib import Path
 from subprocess import run
 from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
@@ -52,40 +56,61 @@ from py2many.rewriters import (
     WithToBlockTransformer,
 )
 from py2many.transformers import (
-    add_annotation_flags,
-    detect_mutable_vars,
-    detect_nesting_levels,
-    detect_raises
+    AnnotationTransformer,
+    MutabilityTransformer,
+    NestingTransformer,
+    RaisesTransformer,
 )
 from py2many.utilities.logger import setup_logger, LogLevel, LoggerConfig
-from py2many.utilities.toposort_modules import toposort
+from py2many.utilities.toposort_modules import symbol_dependency_groups, toposort
 from .__init__ import __version__
-from .analysis import add_imports
-from .context import add_assignment_context, add_list_calls, add_variable_context
+from .cache import TranspileCache
+from .incremental import AnalysedTrees, BuildState
+from .analysis import ImportTransformer
+from .dirty import DirtyTracker
+from .clike import CLikeTranspiler, typename_cache_info
+from .context import (
+    LHSAnnotationTransformer,
+    ListCallTransformer,
+    ListCapacityTransformer,
+    VariableTransformer,
+)
 from .exceptions import AstErrorBase
-from .inference import infer_types
+from .inference import INFERENCE_STATS, infer_types, invalidate_inference
 from .language import LanguageSettings, Transformer
-from .registry import get_all_settings, call_factory
-from .scope import add_scope_context
+from .registry import LazySettings, get_all_settings, call_factory
+from .passes import run_walk, schedule
+from .profiler import PassProfiler
+from .scope import ScopeTransformer, add_scope_context
+from .watch import changes
 
 _log = setup_logger()
 
+# Hash the tree before and after every transformer (-vv)
+_trace_ast = False
+
+# Set by --profile-passes
+_profiler: Optional[PassProfiler] = None
+
 FileSet = Set[Path] # A set of file paths, used to track successful and failed transpilation targets.
 
 PY2MANY_DIR = Path(__file__).parent
 ROOT_DIR = PY2MANY_DIR.parent
 STDIN = "-"
 STDOUT = "-"
+ALL_LANGUAGES = "all"
+# Files handed to a single process of a batch formatter
+FORMAT_BATCH_SIZE = 64
+WRITE_CHUNK_SIZE = 64 * 1024
 CWD = Path.cwd()
 
 
 # Create default arguments namespace for module-level initialization
 _DEFAULT_ARGS_NS = argparse.Namespace(**DEFAULTS)
 
-# Get language settings factories and instantiate with defaults
+# Language settings with defaults, instantiated when first looked up
 _LANGS_FACTORIES = get_all_settings()
-LANGS = {lang: call_factory(factory, _DEFAULT_ARGS_NS) 
-         for lang, factory in _LANGS_FACTORIES.items()}
+LANGS = LazySettings(_LANGS_FACTORIES, _DEFAULT_ARGS_NS)
 
 
 # ------------------------------------------------------------------------------
@@ -138,14 +163,28 @@ def _ast_hash(tree: ast.AST) -> str:
     return hashlib.sha256(dump.encode()).hexdigest()
 
 
+def _pass_name(step: Any) -> str:
+    if isinstance(step, partial):
+        step = step.func
+    return getattr(step, "__name__", type(step).__name__)
+
+
+def _profiled(stage: str, name: str, step: Callable[[ast.AST], Any], tree: ast.AST) -> Any:
+    """Run ``step(tree)``, recording it with --profile-passes."""
+    if _profiler is None:
+        return step(tree)
+    return _profiler.run(stage, name, step, tree)
+
+
 def _run_transform(tx: Callable[[ast.AST], Any], tree: ast.AST) -> ast.AST:
     """
     Execute a transformer safely.
 
     Supports both mutation-style and functional transformers.
     """
-    name = getattr(tx, "__name__", type(tx).__name__)
-    hash_before = _ast_hash(tree)
+    name = _pass_name(tx)
+    # A full dump of the module, only worth it when tracing
+    hash_before = _ast_hash(tree) if _trace_ast else None
     result = tx(tree)
 
     if result is None:
@@ -161,10 +200,10 @@ def _run_transform(tx: Callable[[ast.AST], Any], tree: ast.AST) -> ast.AST:
         # validate(tree_after)
         ASTValidator().visit(tree_after)
 
-    hash_after = _ast_hash(tree_after)
-
     _log.debug(f"transform {name}")
-    _log.trace(f"ast hash {hash_before[:8]} -> {hash_after[:8]}")
+    if hash_before is not None:
+        hash_after = _ast_hash(tree_after)
+        _log.trace(f"ast hash {hash_before[:8]} -> {hash_after[:8]}")
 
     return tree_after
 
@@ -181,26 +220,35 @@ def core_transformers(
 ) -> Tuple[ast.AST, Any]:
     """
     Perform core analysis passes shared across languages.
-    """
-
-    add_variable_context(tree, trees)
-    add_scope_context(tree)
-    add_assignment_context(tree)
-    add_list_calls(tree)
 
-    detect_mutable_vars(tree)
-    detect_nesting_levels(tree)
-    detect_raises(tree)
+    The passes share walks over the tree where their requirements allow,
+    see py2many.passes. Type inference walks the tree on its own.
+    """
 
-    add_annotation_flags(tree)
+    # Definitions are found again from scratch
+    invalidate_inference(tree)
+
+    passes = (
+        VariableTransformer(trees),
+        ScopeTransformer(),
+        LHSAnnotationTransformer(),
+        ListCallTransformer(),
+        ListCapacityTransformer(),
+        MutabilityTransformer(),
+        NestingTransformer(),
+        RaisesTransformer(),
+        AnnotationTransformer(),
+        ImportTransformer(),
+    )
+    for walk in schedule(passes):
+        name = "+".join(type(p).__name__ for p in walk)
+        _profiled("core", name, lambda t: run_walk(t, walk), tree)
 
     infer_meta = (
     #    infer_types_typpete(tree) if args and args.typpete else infer_types(tree)
-        infer_types(tree)
+        _profiled("core", "infer_types", infer_types, tree)
     )
 
-    add_imports(tree)
-
     return tree, infer_meta
 
 
@@ -209,31 +257,229 @@ def core_transformers(
 # ------------------------------------------------------------------------------
 
 
+def _parse_sources(
+        filenames: Sequence[Path],
+        sources: Sequence[str],
+) -> List[ast.AST]:
+    """Parse sources and tag each tree with the file it came from."""
+    tree_list: List[ast.AST] = []
+    for filename, source in zip(filenames, sources):
+        tree = ast.parse(source)
+        setattr(tree, "__file__", filename)
+        tree_list.append(tree)
+    return tree_list
+
+
 def _transpile(
         filenames: List[Path],
         sources: List[str],
         settings: LanguageSettings,
         args: Optional[argparse.Namespace] = None,
         _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        analysed: Optional[AnalysedTrees] = None,
 ) -> Tuple[List[str], List[Path]]:
     """
     Transpile multiple Python files to the target language.
+
+    With ``jobs > 1`` independent groups of modules are transpiled in
+    worker processes; the output is identical to the serial path.
+    With a `cache`, unchanged modules are not transpiled again.
+    Modules in `analysed` are not transpiled either (see `_transpile_trees`).
+    """
+
+    if cache is not None:
+        return _transpile_cached(
+            filenames, sources, [settings], args, _suppress_exceptions, jobs, cache,
+            None if analysed is None else [analysed],
+        )[0]
+
+    trees = toposort(_parse_sources(filenames, sources))
+
+    # Trees analysed in workers don't come back to be kept
+    if jobs > 1 and len(trees) > 1 and analysed is None:
+        outputs, successful = _transpile_parallel(
+            trees,
+            dict(zip(filenames, sources)),
+            settings,
+            args,
+            _suppress_exceptions,
+            jobs,
+        )
+    else:
+        outputs, successful = _transpile_trees(
+            trees, settings, args, _suppress_exceptions, analysed
+        )
+
+    output_list = [outputs[f] for f in filenames]
+
+    return output_list, successful
+
+
+def _transpile_langs(
+        filenames: List[Path],
+        sources: List[str],
+        settings_list: Sequence[LanguageSettings],
+        args: Optional[argparse.Namespace] = None,
+        _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        analysed_list: Optional[Sequence[AnalysedTrees]] = None,
+) -> List[Tuple[List[str], List[Path]]]:
+    """
+    Transpile the same Python files to several target languages.
+
+    The sources are parsed and toposorted once. Every backend then works
+    on its own copy of the trees, concurrently in a forked worker process
+    when possible. Results are in the order of `settings_list`.
+    `analysed_list` holds the analysed trees kept for each backend.
+    """
+
+    if cache is not None:
+        return _transpile_cached(
+            filenames, sources, settings_list, args, _suppress_exceptions, jobs, cache,
+            analysed_list,
+        )
+
+    if len(settings_list) == 1:
+        return [
+            _transpile(
+                filenames, sources, settings_list[0], args, _suppress_exceptions, jobs,
+                analysed=None if analysed_list is None else analysed_list[0],
+            )
+        ]
+
+    trees = toposort(_parse_sources(filenames, sources))
+    context = _pool_context()
+
+    if context is None or _profiler is not None or analysed_list is not None:
+        if context is None:
+            _log.warning("fork() is not available; transpiling serially")
+        results = [
+            _transpile_trees(
+                copy.deepcopy(trees), settings, args, _suppress_exceptions,
+                None if analysed_list is None else analysed_list[i],
+            )
+            for i, settings in enumerate(settings_list)
+        ]
+    else:
+        # Forked workers get copy-on-write copies of the trees for free;
+        # one task per worker, as backends mutate the trees they process
+        with context.Pool(
+                processes=len(settings_list),
+                initializer=_init_lang_worker,
+                initargs=(trees, settings_list, args),
+                maxtasksperchild=1,
+        ) as pool:
+            pending = [
+                pool.apply_async(_transpile_lang, (i, _suppress_exceptions))
+                for i in range(len(settings_list))
+            ]
+            results = [result.get() for result in pending]
+
+    return [
+        ([outputs[f] for f in filenames], successful)
+        for outputs, successful in results
+    ]
+
+
+def _transpile_cached(
+        filenames: List[Path],
+        sources: List[str],
+        settings_list: Sequence[LanguageSettings],
+        args: Optional[argparse.Namespace],
+        _suppress_exceptions: type[BaseException],
+        jobs: int,
+        cache: TranspileCache,
+        analysed_list: Optional[Sequence[AnalysedTrees]] = None,
+) -> List[Tuple[List[str], List[Path]]]:
+    """
+    Serve unchanged modules from the cache and transpile the rest.
+
+    Modules that missed are transpiled together with the project modules
+    they import, since resolving their symbols needs the analysed trees.
+    """
+    keys_list = [cache.module_keys(filenames, sources, s) for s in settings_list]
+    outputs_list: List[Dict[Path, str]] = []
+    missed: Set[Path] = set()
+
+    for keys in keys_list:
+        outputs: Dict[Path, str] = {}
+        for filename in filenames:
+            output = cache.get(keys[filename])
+            if output is not None:
+                outputs[filename] = output
+            else:
+                missed.add(filename)
+        outputs_list.append(outputs)
+
+    successful_list: List[List[Path]] = [list(outputs) for outputs in outputs_list]
+
+    stale = [
+        i for i, outputs in enumerate(outputs_list) if len(outputs) < len(filenames)
+    ]
+    if stale:
+        project = dict(zip(filenames, sources))
+        needed = cache.import_closure(sorted(missed), project)
+        needed_filenames = [f for f in filenames if f in needed]
+
+        results = _transpile_langs(
+            needed_filenames,
+            [project[f] for f in needed_filenames],
+            [settings_list[i] for i in stale],
+            args,
+            _suppress_exceptions,
+            jobs,
+            analysed_list=None if analysed_list is None else [analysed_list[i] for i in stale],
+        )
+
+        for i, (needed_outputs, needed_successful) in zip(stale, results):
+            keys, outputs, successful = keys_list[i], outputs_list[i], successful_list[i]
+            transpiled = set(needed_successful)
+            for filename, output in zip(needed_filenames, needed_outputs):
+                if filename in transpiled:
+                    cache.put(keys[filename], output)
+                if filename not in outputs:
+                    outputs[filename] = output
+                    if filename in transpiled:
+                        successful.append(filename)
+
+    return [
+        ([outputs[f] for f in filenames], successful)
+        for outputs, successful in zip(outputs_list, successful_list)
+    ]
+
+
+def _transpile_trees(
+        trees: Sequence[ast.AST],
+        settings: LanguageSettings,
+        args: Optional[argparse.Namespace] = None,
+        _suppress_exceptions: type[BaseException] = Exception,
+        analysed: Optional[AnalysedTrees] = None,
+        errors: Optional[Dict[Path, Exception]] = None,
+) -> Tuple[Dict[Path, str], List[Path]]:
+    """
+    Transpile already parsed and toposorted trees, in order.
+
+    Modules found in `analysed` were transpiled before and are only
+    there to resolve the symbols other modules import from them: their
+    analysed trees stand in for the parsed ones and they get no output.
+    The trees of the modules transpiled successfully are added to it.
+    Failures are recorded in `errors` when given, instead of printed.
     """
 
     transpiler = settings.transpiler
 
+    reused: Set[Path] = set()
+    if analysed is not None:
+        reused = {getattr(t, "__file__") for t in trees} & analysed.keys()
+        trees = [analysed.get(getattr(t, "__file__"), t) for t in trees]
+
     rewriters: Tuple[ast.NodeVisitor, ...] = tuple(settings.rewriters)
     transformers: List[Callable[[ast.AST], None]] = list(settings.transformers)
     post_rewriters: List[ast.NodeVisitor] = list(settings.post_rewriters)
 
-    tree_list: List[ast.AST] = []
-    for filename, source in zip(filenames, sources):
-        tree = ast.parse(source)
-        setattr(tree, "__file__", filename)
-        tree_list.append(tree)
-
-    trees = toposort(tree_list)
-
     topo_filenames: List[Path] = [
         getattr(t, "__file__") for t in trees
     ]
@@ -264,7 +510,16 @@ def _transpile(
     outputs: Dict[Path, str] = {}
     successful: List[Path] = []
 
+    # Every module starts from the same transpiler state, so headers and
+    # usings of one file don't leak into the next one.
+    initial_state = _transpiler_state(transpiler)
+
     for filename, tree in zip(topo_filenames, trees):
+        if filename in reused:
+            outputs[filename] = ""
+            continue
+
+        _restore_transpiler_state(transpiler, initial_state)
         try:
             output = _transpile_one(
                 trees,
@@ -278,18 +533,23 @@ def _transpile(
 
             outputs[filename] = output
             successful.append(filename)
+            if analysed is not None:
+                # Later modules in this build saw the same tree object
+                analysed[filename] = tree
 
         except Exception as e:
             formatted = traceback.format_exc().splitlines()
             verbose = getattr(args, "verbose", 0) if args else 0
 
-            if isinstance(e, AstErrorBase):
+            if errors is not None:
+                errors[filename] = e
+            elif isinstance(e, AstErrorBase):
                 print(f"{filename}:{e.lineno}:{e.col_offset}: {formatted[-1]}")
             else:
                 print(f"{filename}: {formatted[-1]}")
 
             # In verbose mode, also print full traceback for debugging
-            if verbose >= 1:
+            if verbose >= 1 and errors is None:
                 print("\nFull traceback for debugging:")
                 print(traceback.format_exc())
 
@@ -298,9 +558,145 @@ def _transpile(
 
             outputs[filename] = "FAILED"
 
-    output_list = [outputs[f] for f in filenames]
+    _restore_transpiler_state(transpiler, initial_state)
+
+    return outputs, successful
+
+
+def _copy_state(state: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        key: copy.copy(value) if isinstance(value, (list, dict, set)) else value
+        for key, value in state.items()
+    }
+
+
+def _transpiler_state(transpiler: Any) -> Dict[str, Any]:
+    """Snapshot of the per-module state (headers, usings, ...) of a transpiler."""
+    return _copy_state(vars(transpiler))
+
+
+def _restore_transpiler_state(transpiler: Any, state: Mapping[str, Any]) -> None:
+    """Reset a transpiler to a snapshot taken by `_transpiler_state`."""
+    vars(transpiler).clear()
+    vars(transpiler).update(_copy_state(state))
+
+
+# ------------------------------------------------------------------------------
+# MARK: Parallel transpilation
+# ------------------------------------------------------------------------------
+
+# Per-process settings of pool workers, inherited from the parent by fork()
+_worker_settings: Optional[LanguageSettings] = None
+_worker_args: Optional[argparse.Namespace] = None
+
+
+def _init_worker(
+        settings: LanguageSettings,
+        args: Optional[argparse.Namespace],
+) -> None:
+    global _worker_settings, _worker_args
+    _worker_settings = settings
+    _worker_args = args
+
+
+def _transpile_group(
+        filenames: Sequence[Path],
+        sources: Sequence[str],
+        _suppress_exceptions: type[BaseException],
+) -> Tuple[Dict[Path, str], List[Path]]:
+    """Worker entry point: transpile one group of toposorted modules."""
+    assert _worker_settings is not None
+    trees = _parse_sources(filenames, sources)
+    return _transpile_trees(trees, _worker_settings, _worker_args, _suppress_exceptions)
 
-    return output_list, successful
+
+# Trees and settings of multi-language workers, inherited through fork()
+_worker_trees: Sequence[ast.AST] = ()
+_worker_settings_list: Sequence[LanguageSettings] = ()
+
+
+def _init_lang_worker(
+        trees: Sequence[ast.AST],
+        settings_list: Sequence[LanguageSettings],
+        args: Optional[argparse.Namespace],
+) -> None:
+    global _worker_trees, _worker_settings_list, _worker_args
+    _worker_trees = trees
+    _worker_settings_list = settings_list
+    _worker_args = args
+
+
+def _transpile_lang(
+        index: int,
+        _suppress_exceptions: type[BaseException],
+) -> Tuple[Dict[Path, str], List[Path]]:
+    """Worker entry point: transpile the shared trees for one backend."""
+    return _transpile_trees(
+        _worker_trees, _worker_settings_list[index], _worker_args, _suppress_exceptions
+    )
+
+
+def _pool_context() -> Optional[multiprocessing.context.BaseContext]:
+    """
+    Settings hold lambdas and transpiler instances which can't be pickled,
+    so workers must inherit them through fork().
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return None
+
+
+def _transpile_parallel(
+        trees: Sequence[ast.AST],
+        sources: Mapping[Path, str],
+        settings: LanguageSettings,
+        args: Optional[argparse.Namespace],
+        _suppress_exceptions: type[BaseException],
+        jobs: int,
+) -> Tuple[Dict[Path, str], List[Path]]:
+    """
+    Transpile toposorted trees in a process pool.
+
+    Modules which resolve symbols of each other (see
+    `symbol_dependency_groups`) are kept together and processed in
+    toposort order by a single worker; independent groups run concurrently.
+    """
+    context = _pool_context()
+    groups = symbol_dependency_groups(tuple(trees))
+
+    if context is None or len(groups) == 1:
+        if context is None:
+            _log.warning("fork() is not available; transpiling serially")
+        return _transpile_trees(trees, settings, args, _suppress_exceptions)
+
+    topo_filenames: List[Path] = [getattr(t, "__file__") for t in trees]
+    outputs: Dict[Path, str] = {}
+    successful: Set[Path] = set()
+
+    with ProcessPoolExecutor(
+            max_workers=min(jobs, len(groups)),
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(settings, args),
+    ) as pool:
+        futures = []
+        for group in groups:
+            group_filenames = [topo_filenames[i] for i in group]
+            futures.append(
+                pool.submit(
+                    _transpile_group,
+                    group_filenames,
+                    [sources[f] for f in group_filenames],
+                    _suppress_exceptions,
+                )
+            )
+
+        for future in futures:
+            group_outputs, group_successful = future.result()
+            outputs.update(group_outputs)
+            successful.update(group_successful)
+
+    return outputs, [f for f in topo_filenames if f in successful]
 
 
 def _transpile_one(
@@ -319,19 +715,25 @@ def _transpile_one(
     add_scope_context(tree)
 
     for rewriter in rewriters:
-        tree = rewriter.visit(tree)
+        tree = _profiled("rewriter", _pass_name(rewriter), rewriter.visit, tree)
 
     tree, infer_meta = core_transformers(tree, trees, args)
 
+    tracker = DirtyTracker(tree)
+
     for tx in transformers:
-        tree = _run_transform(tx, tree)
+        tree = _profiled("transformer", _pass_name(tx), lambda t: _run_transform(tx, t), tree)
+        invalidate_inference(tree)
 
     for rewriter in post_rewriters:
-        tree = rewriter.visit(tree)
+        tree = _profiled("post_rewriter", _pass_name(rewriter), rewriter.visit, tree)
+        invalidate_inference(tree)
 
-    tree, infer_meta = core_transformers(tree, trees, args)
+    # Only analyse again if the steps above changed the tree
+    if tracker.is_dirty(tree):
+        tree, infer_meta = core_transformers(tree, trees, args)
 
-    code = trans.visit(tree) + "\n"
+    chunks = _profiled("emit", _pass_name(trans), trans.emit_module, tree)
 
     out: List[str] = []
 
@@ -359,7 +761,9 @@ def _transpile_one(
     if aliases:
         out.append(str(aliases))
 
-    out.append(code)
+    # Everything is joined once; the empty part ends the code with a newline
+    out.extend(chunks or [""])
+    out.append("")
 
     # Handle extension_module carefully - signature varies by backend
     if trans.extension():
@@ -404,10 +808,14 @@ def _read_sources(basedir: Path, filenames: Sequence[Path]) -> List[str]:
 
 
 def _write_outputs(outputs: Sequence[str], paths: Sequence[Path]) -> None:
-    """Write generated outputs to files."""
+    """
+    Write generated outputs to files, WRITE_CHUNK_SIZE characters at a
+    time: a single write would encode a copy of the whole output first.
+    """
     for output, path in zip(outputs, paths):
         with open(path, "w") as f:
-            f.write(output)
+            for start in range(0, len(output), WRITE_CHUNK_SIZE):
+                f.write(output[start:start + WRITE_CHUNK_SIZE])
 
 
 # ------------------------------------------------------------------------------
@@ -455,6 +863,116 @@ def _format_one(
     return True
 
 
+def _format_source(
+        settings: LanguageSettings,
+        output: str,
+        output_path: Path,
+        env: Optional[Mapping[str, str]] = None,
+) -> Tuple[str, bool]:
+    """
+    Pipe `output`, which goes to `output_path`, through the
+    `stdin_formatter`. Returns the code to write (unformatted if the
+    formatter failed) and whether formatting succeeded.
+    """
+    cmd = [arg.format(filename=output_path) for arg in settings.stdin_formatter]
+    try:
+        proc = run(cmd, input=output.encode("utf-8"), env=env, capture_output=True)
+    except Exception as e:
+        if settings.ignore_formatter_errors:
+            return output, True
+
+        print(f"Error: Could not format: {output_path}")
+        print(f"Due to: {e.__class__.__name__} {e}")
+        return output, False
+
+    if proc.returncode:
+        print(f"Error: {cmd} (code: {proc.returncode}):\n{proc.stderr}{proc.stdout}")
+        return output, False
+    return proc.stdout.decode("utf-8"), True
+
+
+def _write_formatted(
+        settings: LanguageSettings,
+        outputs: Sequence[str],
+        output_paths: Sequence[Path],
+        env: Optional[Mapping[str, str]] = None,
+) -> Set[Path]:
+    """
+    Write outputs and format them; returns the paths formatting failed on.
+
+    With a `stdin_formatter` the outputs are formatted in memory and
+    each file is written once. Batches of files still go through
+    `_format_many` when the formatter takes many files: one formatter
+    process per chunk beats one per file, which is what piping costs.
+    """
+    piped = settings.stdin_formatter is not None and (
+        not settings.batch_formatter or len(output_paths) == 1
+    )
+    if not settings.formatter or not piped:
+        _write_outputs(outputs, output_paths)
+        return _format_many(settings, output_paths, env)
+
+    def format_source(item: Tuple[str, Path]) -> Tuple[str, bool]:
+        return _format_source(settings, item[0], item[1], env)
+
+    items = list(zip(outputs, output_paths))
+    with ThreadPoolExecutor(max_workers=max(min(len(items), os.cpu_count() or 1), 1)) as pool:
+        formatted = list(pool.map(format_source, items))
+
+    _write_outputs([code for code, _ in formatted], output_paths)
+    return {path for path, (_, ok) in zip(output_paths, formatted) if not ok}
+
+
+def _format_chunk(
+        settings: LanguageSettings,
+        output_paths: Sequence[Path],
+        env: Optional[Mapping[str, str]] = None,
+) -> Set[Path]:
+    """Format files with one formatter process; returns those that failed."""
+    if len(output_paths) > 1:
+        try:
+            cmd = [*settings.formatter, *map(str, output_paths)]
+            if run(cmd, env=env, capture_output=True).returncode == 0:
+                return set()
+        except Exception:
+            pass
+    # A failed chunk is formatted again file by file, to find out (and
+    # report as _format_one does) which files the formatter failed on
+    return {path for path in output_paths if not _format_one(settings, path, env)}
+
+
+def _format_many(
+        settings: LanguageSettings,
+        output_paths: Sequence[Path],
+        env: Optional[Mapping[str, str]] = None,
+) -> Set[Path]:
+    """
+    Run the formatter on several files; returns those it failed on.
+
+    A `batch_formatter` gets the files in chunks of FORMAT_BATCH_SIZE,
+    which are formatted concurrently. Other formatters run file by file.
+    """
+    paths = list(output_paths)
+    if not paths or not settings.formatter:
+        return set()
+
+    # Formatters with {filename} in their arguments take a single file
+    if not settings.batch_formatter or any("{" in part for part in settings.formatter):
+        return {path for path in paths if not _format_one(settings, path, env)}
+
+    chunks = [
+        paths[i:i + FORMAT_BATCH_SIZE] for i in range(0, len(paths), FORMAT_BATCH_SIZE)
+    ]
+    if len(chunks) == 1:
+        return _format_chunk(settings, chunks[0], env)
+
+    failed: Set[Path] = set()
+    with ThreadPoolExecutor(max_workers=min(len(chunks), os.cpu_count() or 1)) as pool:
+        for chunk_failed in pool.map(lambda chunk: _format_chunk(settings, chunk, env), chunks):
+            failed |= chunk_failed
+    return failed
+
+
 # ------------------------------------------------------------------------------
 # MARK: High-level API
 # ------------------------------------------------------------------------------
@@ -463,7 +981,7 @@ def transpile_from_args(
         args: argparse.Namespace,
 ) -> int:
     """Entry point used by CLI."""
-    global _log
+    global _log, _trace_ast, _profiler
     
     # Set up logging based on CLI arguments
     verbose = getattr(args, "verbose", 0)
@@ -479,74 +997,243 @@ def transpile_from_args(
         log_level = LogLevel.INFO
     
     _log = setup_logger(LoggerConfig(level=log_level, name="py2many"))
+    _trace_ast = verbose >= 2
 
     if getattr(args, "version", False):
         print(__version__)
         return 0
 
-    language = args.lang
+    languages = parse_languages(args.lang)
+    settings_list = [_settings_from_args(language, args) for language in languages]
 
-    if language not in get_all_settings():
-        raise ValueError(f"Unsupported language: {language}")
+    rest = getattr(args, "_rest", [])
 
-    # Get the factory for the requested language and instantiate it with runtime args
-    settings_factory = get_all_settings()[language]
-    settings = call_factory(settings_factory, args)
+    cache = _cache_from_args(args)
+    jobs = _jobs_from_args(args)
 
-    if getattr(args, "comment_unsupported", False) or not getattr(args, "strict", True):
-        settings.transpiler.set_continue_on_unimplemented()
+    profile = getattr(args, "profile_passes", None)
+    if profile is not None:
+        # Every pass has to run, in this process
+        _profiler = PassProfiler()
+        cache = None
+        jobs = 1
 
-    # Update settings immutably using dataclasses.replace()
-    settings = replace(
-        settings,
-        ignore_formatter_errors=getattr(args, "ignore_formatter_errors", False)
-    )
+    try:
+        for filename in rest:
+            source = Path(filename)
+            out_dir = source.parent if args.out_dir is None else Path(args.out_dir)
 
-    rest = getattr(args, "_rest", [])
+            if source.name == STDIN and len(settings_list) > 1:
+                print("Only a single language can be written to stdout", file=sys.stderr)
+                return 1
 
-    for filename in rest:
-        source = Path(filename)
-        out_dir = source.parent if args.out_dir is None else Path(args.out_dir)
+            if getattr(args, "watch", False) and not source.is_dir():
+                print("--watch needs a directory to watch", file=sys.stderr)
+                return 1
 
-        if source.is_file() or source.name == STDIN:
-            print(f"Writing to: {out_dir}", file=sys.stderr)
+            if source.is_file() or source.name == STDIN:
+                print(f"Writing to: {out_dir}", file=sys.stderr)
 
-            try:
-                rv = _process_one(settings, source, out_dir, args) #, env)
-            except Exception as e:
+                try:
+                    if len(settings_list) == 1:
+                        rv = _process_one(settings_list[0], source, out_dir, args, cache=cache) #, env)
+                    else:
+                        rv = all(_process_one_langs(settings_list, source, out_dir, args, cache))
+                except Exception as e:
 
-                formatted_lines = traceback.format_exc().splitlines()
-                verbose = getattr(args, "verbose", 0)
+                    formatted_lines = traceback.format_exc().splitlines()
+                    verbose = getattr(args, "verbose", 0)
 
-                if isinstance(e, AstErrorBase):
-                    print(
-                        f"{source}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}",
-                        file=sys.stderr,
-                    )
-                else:
-                    if verbose >= 1:
-                        # In verbose mode, print full traceback for debugging
-                        print(file=sys.stderr)
-                        print(traceback.format_exc(), file=sys.stderr)
+                    if isinstance(e, AstErrorBase):
+                        print(
+                            f"{source}:{e.lineno}:{e.col_offset}: {formatted_lines[-1]}",
+                            file=sys.stderr,
+                        )
                     else:
-                        print(f"{source}: {formatted_lines[-1]}", file=sys.stderr)
-                rv = False
+                        if verbose >= 1:
+                            # In verbose mode, print full traceback for debugging
+                            print(file=sys.stderr)
+                            print(traceback.format_exc(), file=sys.stderr)
+                        else:
+                            print(f"{source}: {formatted_lines[-1]}", file=sys.stderr)
+                    rv = False
 
-        else:
-            successful, format_errors, failures = _process_dir(
-                settings,
-                source,
-                out_dir,
-                getattr(args, "project", True),
-                # env=env,
+            else:
+                # Each language gets a directory of its own, as projects would clash
+                out_dirs = (
+                    [out_dir] if len(languages) == 1
+                    else [out_dir / language for language in languages]
+                )
+                if getattr(args, "watch", False):
+                    return _watch_dir_langs(
+                        settings_list,
+                        source,
+                        out_dirs,
+                        getattr(args, "project", True),
+                        cache=cache,
+                        force=args.force,
+                    )
+
+                results = _process_dir_langs(
+                    settings_list,
+                    source,
+                    out_dirs,
+                    getattr(args, "project", True),
+                    # env=env,
+                    jobs=jobs,
+                    cache=cache,
+                    incremental=getattr(args, "incremental", False),
+                    force=args.force,
+                )
+
+                rv = not any(failures or format_errors for _, format_errors, failures in results)
+
+            if cache is not None:
+                cache.evict()
+                _log.debug(f"transpile cache: {cache.stats}")
+            _log.debug(f"type inference: {INFERENCE_STATS}")
+            _log.debug(f"typename resolution: {typename_cache_info()}")
+
+            return 0 if rv is True else 1
+
+        return 1
+    finally:
+        if _profiler is not None:
+            _profiler.counters["definition_lookups"] = INFERENCE_STATS.lookups
+            _profiler.counters["definition_lookup_hits"] = INFERENCE_STATS.hits
+            typenames = typename_cache_info()
+            _profiler.counters["typename_lookups"] = typenames.hits + typenames.misses
+            _profiler.counters["typename_lookup_hits"] = typenames.hits
+            _profiler.write(Path(profile))
+            _profiler = None
+            print(f"Pass profile written to: {profile}", file=sys.stderr)
+
+
+def parse_languages(value: str) -> List[str]:
+    """
+    Languages selected by ``--lang``: a single one, a comma separated
+    list such as ``rust,go,cpp``, or ``all``.
+    """
+    available = get_all_settings()
+    if value == ALL_LANGUAGES:
+        return list(available)
+
+    languages: List[str] = []
+    for language in value.split(","):
+        language = language.strip()
+        if language not in available:
+            raise ValueError(
+                f"Unsupported language: {language}. Available: {describe_languages()}"
             )
+        if language not in languages:
+            languages.append(language)
+    return languages
+
+
+def describe_languages() -> str:
+    """The languages of ``--lang`` with their names and extensions, from the manifest."""
+    return ", ".join(backend.describe() for backend in get_all_settings().manifest.values())
+
+
+# Arguments read by the settings factories of the backends
+_SETTINGS_ARGS = ("indent", "extension", "no_prologue", "buffered_output")
+
+# Settings built ahead of requests by `py2many serve`
+_prepared_settings: Dict[Tuple[str, Tuple[Any, ...]], LanguageSettings] = {}
+# Attributes of the transpiler classes before the prepared settings were
+# built. Transpilers set class wide defaults (type maps, default type)
+# in __init__, which leak into the backends created after them.
+_prepared_classes: Dict[type, Dict[str, Any]] = {}
+
+
+def _settings_key(language: str, args: argparse.Namespace) -> Tuple[str, Tuple[Any, ...]]:
+    return language, tuple(getattr(args, name, None) for name in _SETTINGS_ARGS)
+
+
+def prepare_settings(languages: Sequence[str], args: argparse.Namespace) -> None:
+    """
+    Instantiate the settings of `languages` for later `_settings_from_args`
+    calls with matching args. The settings are handed out as they are, so
+    this is only meant for processes forked for a single request.
+    """
+    for language in languages:
+        get_all_settings()[language]
+    if not _prepared_classes:
+        _prepared_classes.update(_snapshot_classes())
+
+    for language in languages:
+        _prepared_settings[_settings_key(language, args)] = call_factory(
+            get_all_settings()[language], args
+        )
+
+
+def _transpiler_classes() -> List[type]:
+    classes: List[type] = []
+    pending: List[type] = [CLikeTranspiler]
+    while pending:
+        cls = pending.pop()
+        classes.append(cls)
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+def _snapshot_classes() -> Dict[type, Dict[str, Any]]:
+    """The attributes of the transpiler classes imported so far."""
+    return {cls: dict(vars(cls)) for cls in _transpiler_classes()}
+
 
-            rv = not (failures or format_errors)
+def _restore_classes(snapshot: Mapping[type, Mapping[str, Any]]) -> None:
+    """Set the attributes of the classes in `snapshot` back to what they were."""
+    for cls, attrs in snapshot.items():
+        for name in [n for n in vars(cls) if n not in attrs]:
+            delattr(cls, name)
+        for name, value in attrs.items():
+            if name not in ("__dict__", "__weakref__") and vars(cls).get(name) is not value:
+                setattr(cls, name, value)
 
-        return 0 if rv is True else 1
 
-    return 1
+def restore_prepared_classes() -> None:
+    """
+    Undo what creating the prepared settings did to the transpiler
+    classes. `_settings_from_args` then only replays the constructors of
+    the languages requested, as if their settings were created fresh.
+    """
+    _restore_classes(_prepared_classes)
+
 
+def _settings_from_args(language: str, args: argparse.Namespace) -> LanguageSettings:
+    """Instantiate the settings of a single language with runtime args."""
+    settings = _prepared_settings.get(_settings_key(language, args))
+    if settings is None:
+        settings = call_factory(get_all_settings()[language], args)
+    elif hasattr(settings.transpiler, "_reset"):
+        # Replays the class wide defaults set by its constructor
+        settings.transpiler._reset()
+
+    if getattr(args, "comment_unsupported", False) or not getattr(args, "strict", True):
+        settings.transpiler.set_continue_on_unimplemented()
+
+    # Update settings immutably using dataclasses.replace()
+    return replace(
+        settings,
+        ignore_formatter_errors=getattr(args, "ignore_formatter_errors", False)
+    )
+
+
+def _jobs_from_args(args: argparse.Namespace) -> int:
+    """Number of worker processes requested with --jobs (0 means one per CPU)."""
+    jobs = getattr(args, "jobs", 1) or 0
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    return jobs
+
+
+def _cache_from_args(args: argparse.Namespace) -> Optional[TranspileCache]:
+    """The transpile cache selected on the command line, with --cache."""
+    if not getattr(args, "cache", False):
+        return None
+    cache_dir = getattr(args, "cache_dir", None)
+    return TranspileCache(Path(cache_dir) if cache_dir else None)
 
 
 # ------------------------------------------------------------------------------
@@ -589,6 +1276,7 @@ def _process_one(
         out_dir: Path,
         args: argparse.Namespace,
         # environment: Optional[Mapping[str, str]],
+        cache: Optional[TranspileCache] = None,
 ) -> bool | Tuple[Set[Path], Set[Path]]:
     """
     Transpile and optionally format a single file.
@@ -598,16 +1286,16 @@ def _process_one(
         False on failure
         tuple when stdin mode is used
     """
-    suffix = f".{args.suffix}" if args.suffix is not None else settings.ext
-
-    output_path = _get_output_path(
-        filename.relative_to(filename.parent),
-        suffix,
-        out_dir,
-    )
-
     if filename.name == STDIN:
         output = _process_one_data(sys.stdin.read(), Path("test.py"), settings)
+
+        if settings.formatter and settings.stdin_formatter:
+            formatted, ok = _format_source(settings, output, Path(f"test{settings.ext}"))
+            sys.stdout.write(formatted)
+            if not ok:
+                sys.stderr.write("Formatting failed")
+            return {filename}, {filename}
+
         tmp_name: Optional[str] = None
 
         try:
@@ -631,28 +1319,67 @@ def _process_one(
 
         return {filename}, {filename}
 
-    if filename.resolve() == output_path.resolve() and not args.force:
-        print(f"Refusing to overwrite {filename}. Use --force to overwrite")
-        return False
+    return _process_one_langs([settings], filename, out_dir, args, cache)[0]
+
+
+def _process_one_langs(
+        settings_list: Sequence[LanguageSettings],
+        filename: Path,
+        out_dir: Path,
+        args: argparse.Namespace,
+        cache: Optional[TranspileCache] = None,
+) -> List[bool]:
+    """
+    Transpile and optionally format a single file to several languages,
+    parsing it only once.
+
+    Returns whether each language succeeded, in the order of `settings_list`.
+    """
+    langs: List[int] = []
+    output_paths: List[Path] = []
+
+    for lang, settings in enumerate(settings_list):
+        suffix = f".{args.suffix}" if args.suffix is not None else settings.ext
+
+        output_path = _get_output_path(
+            filename.relative_to(filename.parent),
+            suffix,
+            out_dir,
+        )
+
+        if filename.resolve() == output_path.resolve() and not args.force:
+            print(f"Refusing to overwrite {filename}. Use --force to overwrite")
+            continue
 
-    print(f"{filename} ... {output_path}")
+        print(f"{filename} ... {output_path}")
+        langs.append(lang)
+        output_paths.append(output_path)
+
+    results = [False] * len(settings_list)
+    if not langs:
+        return results
 
     with open(filename) as f:
         source_data = f.read()
 
     if filename.stem == "__init__" and not source_data:
         print("Detected empty __init__; skipping")
-        return True
-
-    outputs, _ = _transpile([filename], [source_data], settings, args)
-
-    with open(output_path, "wb") as f:
-        f.write(outputs[0].encode("utf-8"))
+        for lang in langs:
+            results[lang] = True
+        return results
+
+    transpiled = _transpile_langs(
+        [filename],
+        [source_data],
+        [settings_list[lang] for lang in langs],
+        args,
+        cache=cache,
+    )
 
-    if settings.formatter:
-        return _format_one(settings, output_path)
+    for lang, output_path, (outputs, _) in zip(langs, output_paths, transpiled):
+        results[lang] = not _write_formatted(settings_list[lang], outputs, [output_path])
 
-    return True
+    return results
 
 
 @lru_cache(maxsize=100)
@@ -678,41 +1405,183 @@ def _process_many(
         filenames: Sequence[Path],
         out_dir: Path,
         _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        incremental: bool = False,
+        force: bool = False,
 ) -> Tuple[FileSet, FileSet]:
-    """Transpile and optionally format multiple files."""
-
-    settings.transpiler.set_continue_on_unimplemented()
-
-    source_data = _read_sources(basedir, filenames)
+    """
+    Transpile and optionally format multiple files.
 
-    outputs, successful = _transpile(
-        list(filenames),
-        source_data,
-        settings,
+    With `incremental`, only modules that changed since the last build
+    into `out_dir`, and the modules importing them, are transpiled.
+    """
+    return _process_many_langs(
+        [settings],
+        basedir,
+        filenames,
+        [out_dir],
         _suppress_exceptions=_suppress_exceptions,
-    )
-
-    output_paths = [
-        _get_output_path(filename, settings.ext, out_dir)
-        for filename in filenames
-    ]
+        jobs=jobs,
+        cache=cache,
+        incremental=incremental,
+        force=force,
+    )[0]
 
-    _write_outputs(outputs, output_paths)
 
-    successful_set: Set[Path] = set(successful)
-    format_errors: Set[Path] = set()
+def _process_many_langs(
+        settings_list: Sequence[LanguageSettings],
+        basedir: Path,
+        filenames: Sequence[Path],
+        out_dirs: Sequence[Path],
+        _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        incremental: bool = False,
+        analysed_list: Optional[Sequence[AnalysedTrees]] = None,
+        force: bool = False,
+) -> List[Tuple[FileSet, FileSet]]:
+    """
+    Transpile and optionally format multiple files to several languages,
+    the output of each going to the matching entry of `out_dirs`.
 
-    if settings.formatter:
+    With `analysed_list` (only together with `incremental`), modules
+    that are not outdated are not transpiled again to resolve imports of
+    outdated ones; their trees from an earlier build are used instead.
 
-        for filename, output_path in zip(filenames, output_paths):
+    Unless `force` is set, a module whose output would replace it is not
+    transpiled, and counts as failed. So do modules that can't be read
+    and, in incremental builds, ones that don't parse and the modules
+    importing them.
+    """
 
-            if filename in successful_set and not _format_one(
-                    settings,
-                    output_path,
-            ):
-                format_errors.add(filename)
+    for settings in settings_list:
+        settings.transpiler.set_continue_on_unimplemented()
 
-    return successful_set, format_errors
+    source_data: List[str] = []
+    readable: List[Path] = []
+    for filename in filenames:
+        try:
+            source_data.extend(_read_sources(basedir, [filename]))
+        except (OSError, UnicodeDecodeError) as e:
+            # E.g. removed since the directory was listed; counts as failed
+            print(f"Failed to read {basedir / filename}: {e}")
+            continue
+        readable.append(filename)
+    filenames = readable
+
+    output_paths_list: List[List[Path]] = []
+    states: List[Optional[BuildState]] = []
+    outdated_list: List[Set[Path]] = []
+    successful_sets: List[Set[Path]] = []
+    needed: Set[Path] = set()
+
+    for settings, out_dir in zip(settings_list, out_dirs):
+        output_paths = [
+            _get_output_path(filename, settings.ext, out_dir)
+            for filename in filenames
+        ]
+        state = BuildState.load(out_dir, settings) if incremental else None
+        refused = set() if force else {
+            filename
+            for filename, output_path in zip(filenames, output_paths)
+            if (basedir / filename).resolve() == output_path.resolve()
+        }
+        for filename in sorted(refused):
+            print(f"Refusing to overwrite {basedir / filename}. Use --force to overwrite")
+
+        skipped = set(refused)
+        if state is not None:
+            outdated = state.outdated(filenames, source_data, output_paths)
+            for filename, error in sorted(state.unparsable.items()):
+                print(f"Failed to parse {basedir / filename}: {error}")
+            if state.unparsable:
+                # Modules importing one that doesn't parse wait until it does
+                skipped |= {
+                    filename
+                    for filename in outdated
+                    if state.import_closure([filename], filenames) & state.unparsable.keys()
+                }
+            needed |= state.import_closure(outdated - skipped, filenames)
+            _log.debug(
+                f"incremental {settings.display_name} build: "
+                f"{len(outdated)} of {len(filenames)} modules outdated"
+            )
+        else:
+            outdated = set(filenames)
+        if analysed_list is not None:
+            analysed = analysed_list[len(states)]
+            for filename in outdated & analysed.keys():
+                del analysed[filename]
+
+        outdated -= skipped
+        needed |= outdated
+
+        output_paths_list.append(output_paths)
+        states.append(state)
+        outdated_list.append(outdated)
+        successful_sets.append(set(filenames) - outdated - skipped)
+
+    # Languages with something to rebuild share a single parse
+    stale = [i for i, outdated in enumerate(outdated_list) if outdated]
+    selected = [i for i, filename in enumerate(filenames) if filename in needed]
+
+    results = _transpile_langs(
+        [filenames[i] for i in selected],
+        [source_data[i] for i in selected],
+        [settings_list[i] for i in stale],
+        _suppress_exceptions=_suppress_exceptions,
+        jobs=jobs,
+        cache=cache,
+        analysed_list=None if analysed_list is None else [analysed_list[i] for i in stale],
+    ) if stale else []
+
+    format_errors_list: List[Set[Path]] = [set() for _ in settings_list]
+
+    for lang, (outputs, successful) in zip(stale, results):
+        settings, state = settings_list[lang], states[lang]
+        outdated, output_paths = outdated_list[lang], output_paths_list[lang]
+        successful_set = successful_sets[lang]
+
+        written: List[Tuple[Path, str, str, Path]] = []
+        for i, output in zip(selected, outputs):
+            filename, output_path = filenames[i], output_paths[i]
+            if filename not in outdated:
+                # Only transpiled to resolve the imports of an outdated module
+                continue
+            if state is not None and state.unchanged_output(filename, output, output_path):
+                successful_set.add(filename)
+                state.record(filename, source_data[i], output, output_path)
+                continue
+            written.append((filename, source_data[i], output, output_path))
+
+        successful_set.update(f for f in successful if f in outdated)
+
+        # Modules that failed to transpile are written as they are
+        unformatted = [entry for entry in written if entry[0] not in successful_set]
+        _write_outputs(
+            [output for _, _, output, _ in unformatted],
+            [output_path for _, _, _, output_path in unformatted],
+        )
+
+        written = [entry for entry in written if entry[0] in successful_set]
+        failed = _write_formatted(
+            settings,
+            [output for _, _, output, _ in written],
+            [output_path for _, _, _, output_path in written],
+        )
+
+        for filename, source, output, output_path in written:
+            if output_path in failed:
+                format_errors_list[lang].add(filename)
+            elif state is not None:
+                state.record(filename, source, output, output_path)
+
+    for state in states:
+        if state is not None:
+            state.save()
+
+    return list(zip(successful_sets, format_errors_list))
 
 
 # ------------------------------------------------------------------------------
@@ -726,22 +1595,85 @@ def _process_dir(
         project: bool,
         # env: Optional[Mapping[str, str]] = None,
         _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        incremental: bool = False,
+        force: bool = False,
 ) -> Tuple[Set[Path], Set[Path], Set[Path]]:
     """Transpile an entire directory recursively."""
+    return _process_dir_langs(
+        [settings],
+        source,
+        [out_dir],
+        project,
+        _suppress_exceptions=_suppress_exceptions,
+        jobs=jobs,
+        cache=cache,
+        incremental=incremental,
+        force=force,
+    )[0]
+
+
+def _create_projects(
+        settings_list: Sequence[LanguageSettings],
+        out_dirs: Sequence[Path],
+        project: bool,
+) -> Tuple[List[int], List[Path]]:
+    """
+    Create the projects of the languages that have one. Returns the
+    languages that can be written and the directory modules go to.
+    """
+    langs: List[int] = []
+    project_dirs: List[Path] = []
 
-    print(f"Transpiling whole directory to {out_dir}:")
+    for lang, (settings, out_dir) in enumerate(zip(settings_list, out_dirs)):
+        print(f"Transpiling whole directory to {out_dir}:")
 
-    if settings.create_project is not None and project:
-        cmd = settings.create_project + (f"{out_dir}",)
+        if settings.create_project is not None and project:
+            cmd = settings.create_project + (f"{out_dir}",)
 
-        proc = run(cmd, capture_output=True)
+            proc = run(cmd, capture_output=True)
 
-        if proc.returncode:
-            print(f"Error: running {' '.join(cmd)}: {proc.stderr}")
-            return set(), set(), set()
+            if proc.returncode:
+                print(f"Error: running {' '.join(cmd)}: {proc.stderr}")
+                continue
+
+            if settings.project_subdir is not None:
+                out_dir = out_dir / settings.project_subdir
+
+        langs.append(lang)
+        project_dirs.append(out_dir)
+
+    return langs, project_dirs
+
+
+def _process_dir_langs(
+        settings_list: Sequence[LanguageSettings],
+        source: Path,
+        out_dirs: Sequence[Path],
+        project: bool,
+        _suppress_exceptions: type[BaseException] = Exception,
+        jobs: int = 1,
+        cache: Optional[TranspileCache] = None,
+        incremental: bool = False,
+        projects: Optional[Tuple[List[int], List[Path]]] = None,
+        analysed_list: Optional[Sequence[AnalysedTrees]] = None,
+        force: bool = False,
+) -> List[Tuple[Set[Path], Set[Path], Set[Path]]]:
+    """
+    Transpile an entire directory recursively to several languages.
+
+    `projects` are the result of `_create_projects` when the projects
+    were already created, e.g. by an earlier build of --watch.
+    """
+
+    results: List[Tuple[Set[Path], Set[Path], Set[Path]]] = [
+        (set(), set(), set()) for _ in settings_list
+    ]
+    langs, project_dirs = projects or _create_projects(settings_list, out_dirs, project)
 
-        if settings.project_subdir is not None:
-            out_dir = out_dir / settings.project_subdir
+    if not langs:
+        return results
 
     input_paths: List[Path] = []
 
@@ -752,30 +1684,94 @@ def _process_dir(
 
         relative_path = path.relative_to(source)
 
-        target_dir = (out_dir / relative_path).parent
-
-        os.makedirs(target_dir, exist_ok=True)
+        for out_dir in project_dirs:
+            target_dir = (out_dir / relative_path).parent
+            os.makedirs(target_dir, exist_ok=True)
 
         input_paths.append(relative_path)
 
-    successful, format_errors = _process_many(
-        settings,
+    processed = _process_many_langs(
+        [settings_list[lang] for lang in langs],
         source,
         input_paths,
-        out_dir,
+        project_dirs,
         # env=env,
         _suppress_exceptions=_suppress_exceptions,
+        jobs=jobs,
+        cache=cache,
+        incremental=incremental,
+        analysed_list=None if analysed_list is None else [analysed_list[lang] for lang in langs],
+        force=force,
     )
 
-    failures = set(input_paths) - successful
+    for lang, (successful, format_errors) in zip(langs, processed):
+        failures = set(input_paths) - successful
 
-    print("\nFinished!")
-    print(f"Successful: {len(successful)}")
+        print("\nFinished!")
+        if len(settings_list) > 1:
+            print(f"Language: {settings_list[lang].display_name}")
+        print(f"Successful: {len(successful)}")
 
-    if format_errors:
-        print(f"Failed to reformat: {len(format_errors)}")
+        if format_errors:
+            print(f"Failed to reformat: {len(format_errors)}")
 
-    print(f"Failed to convert: {len(failures)}")
+        print(f"Failed to convert: {len(failures)}")
+
+        results[lang] = successful, format_errors, failures
+
+    if cache is not None:
+        print(f"Cache: {cache.stats}")
     print()
 
-    return successful, format_errors, failures
\ No newline at end of file
+    return results
+
+
+def _watch_dir_langs(
+        settings_list: Sequence[LanguageSettings],
+        source: Path,
+        out_dirs: Sequence[Path],
+        project: bool,
+        cache: Optional[TranspileCache] = None,
+        poll: bool = False,
+        force: bool = False,
+) -> int:
+    """
+    Transpile a directory, then again whenever its sources change, until
+    interrupted.
+
+    Builds are incremental and run in this process, so the analysed
+    trees of modules that didn't change stay in memory and resolve the
+    imports of the modules that did.
+    """
+    projects = _create_projects(settings_list, out_dirs, project)
+    analysed_list: List[AnalysedTrees] = [{} for _ in settings_list]
+
+    def build() -> None:
+        _process_dir_langs(
+            settings_list,
+            source,
+            out_dirs,
+            project,
+            cache=cache,
+            incremental=True,
+            projects=projects,
+            analysed_list=analysed_list,
+            force=force,
+        )
+
+    build()
+    print(f"Watching {source} for changes (Ctrl-C to stop)", file=sys.stderr)
+    try:
+        for changed in changes(source, poll):
+            start = time.perf_counter()
+            _log.debug(f"changed: {sorted(str(p) for p in changed)}")
+            build()
+            print(
+                f"Rebuilt {len(changed)} changed file(s) in "
+                f"{time.perf_counter() - start:.2f}s",
+                file=sys.stderr,
+            )
+    except KeyboardInterrupt:
+        pass
+    return 0
+
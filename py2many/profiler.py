@@ -0,0 +1,139 @@
+"""
+Per-pass profiling of the transpile pipeline (``--profile-passes``).
+
+Every rewriter, core analysis walk, transformer and emit step run on a
+module is recorded with its wall time, the size of the tree it leaves
+behind and the memory it allocated (traced with `tracemalloc`).
+
+The report is a single JSON file: a summary per pass under ``passes``,
+and the individual steps as Chrome trace events under ``traceEvents``,
+so it can be opened as-is in chrome://tracing or Perfetto. Tracing
+allocations slows down every step, so compare timings with each other
+rather than with unprofiled runs.
+"""
+
+import ast
+import json
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+@dataclass
+class PassStats:
+    stage: str
+    name: str
+    calls: int = 0
+    seconds: float = 0.0
+    nodes: int = 0
+    allocated: int = 0
+    peak: int = 0
+
+
+def count_nodes(tree: ast.AST) -> int:
+    return sum(1 for _ in ast.walk(tree))
+
+
+class PassProfiler:
+    """Collect timings of pipeline steps and write them as a report."""
+
+    def __init__(self) -> None:
+        self._events: List[Dict[str, Any]] = []
+        self._stats: Dict[Tuple[str, str], PassStats] = {}
+        # Totals reported alongside the passes
+        self.counters: Dict[str, int] = {}
+        self._start = time.perf_counter()
+        self._stop_tracing = not tracemalloc.is_tracing()
+        if self._stop_tracing:
+            tracemalloc.start()
+
+    def run(self, stage: str, name: str, step: Callable[[ast.AST], Any], tree: ast.AST) -> Any:
+        """
+        Run and record ``step(tree)``. Nodes are counted in the tree the
+        step returns, or in `tree` if it changes it in place.
+        """
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        result = step(tree)
+        seconds = time.perf_counter() - start
+        after, peak = tracemalloc.get_traced_memory()
+        self._record(
+            stage,
+            name,
+            getattr(tree, "__file__", None),
+            start,
+            seconds,
+            count_nodes(result if isinstance(result, ast.AST) else tree),
+            max(after - current, 0),
+            max(peak - current, 0),
+        )
+        return result
+
+    def _record(
+            self,
+            stage: str,
+            name: str,
+            module: Optional[Path],
+            start: float,
+            seconds: float,
+            nodes: int,
+            allocated: int,
+            peak: int,
+    ) -> None:
+        stats = self._stats.get((stage, name))
+        if stats is None:
+            stats = self._stats[(stage, name)] = PassStats(stage, name)
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.nodes += nodes
+        stats.allocated += allocated
+        stats.peak = max(stats.peak, peak)
+
+        self._events.append(
+            {
+                "name": name,
+                "cat": stage,
+                "ph": "X",
+                "ts": (start - self._start) * 1e6,
+                "dur": seconds * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+                "args": {
+                    "module": str(module) if module is not None else None,
+                    "nodes": nodes,
+                    "allocated_bytes": allocated,
+                    "peak_bytes": peak,
+                },
+            }
+        )
+
+    def report(self) -> Dict[str, Any]:
+        passes = sorted(self._stats.values(), key=lambda s: s.seconds, reverse=True)
+        return {
+            "passes": [
+                {
+                    "stage": s.stage,
+                    "name": s.name,
+                    "calls": s.calls,
+                    "wall_ms": round(s.seconds * 1e3, 3),
+                    "nodes": s.nodes,
+                    "allocated_bytes": s.allocated,
+                    "peak_bytes": s.peak,
+                }
+                for s in passes
+            ],
+            "counters": self.counters,
+            "traceEvents": self._events,
+            "displayTimeUnit": "ms",
+        }
+
+    def write(self, path: Path) -> None:
+        """Write the report and stop tracing allocations."""
+        if self._stop_tracing:
+            tracemalloc.stop()
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=1)
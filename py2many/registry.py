@@ -8,8 +8,8 @@ import importlib
 import inspect
 import logging
 import pkgutil
-from collections.abc import Callable, Mapping
-from typing import Any
+from collections.abc import Callable, Iterator, Mapping
+from typing import Any, NamedTuple
 
 import targets
 from py2many.defaults import DEFAULTS
@@ -25,34 +25,118 @@ def python_settings(args: argparse.Namespace | None) -> LanguageSettings:
     # FIXME: TODO: extract into <root>/targets/python/__init__.py
     return LanguageSettings(
         transpiler=PythonTranspiler(args.no_prologue),
-        ext=",py",
+        ext=".py",
         display_name="Python",
         formatter=("black",),
+        batch_formatter=True,
+        stdin_formatter=("black", "-q", "--stdin-filename", "{filename}", "-"),
         rewriters=(RestoreMainRewriter(),),
         post_rewriters=(InferredAnnAssignRewriter(),),
     )
 
 
-def _discover_targets() -> dict[str, SettingsFactory]:
-    discovered: dict[str, SettingsFactory] = {}
+class Backend(NamedTuple):
+    """Manifest entry of a backend, known without importing it."""
+
+    name: str
+    entry_point: str
+    """``module:factory`` returning the LanguageSettings of the backend."""
+    ext: str | None = None
+    display_name: str | None = None
+
+    def describe(self) -> str:
+        """``name (Display name, .ext)``, for help and error messages."""
+        details = [d for d in (self.display_name, self.ext) if d]
+        return f"{self.name} ({', '.join(details)})" if details else self.name
+
+
+# Backends shipped under targets/. Packages added there without an entry
+# are still discovered, but their extension is only known once loaded.
+# The extension and display name describe a backend without importing it,
+# and must match its LanguageSettings.
+MANIFEST: dict[str, Backend] = {
+    backend.name: backend
+    for backend in (
+        Backend("python", "py2many.registry:python_settings", ".py", "Python"),
+        Backend("cpp", "targets.cpp:settings", ".cpp", "C++"),
+        Backend("dart", "targets.dart:settings", ".dart", "Dart"),
+        Backend("dlang", "targets.dlang:settings", ".d", "D"),
+        Backend("go", "targets.go:settings", ".go", "Go"),
+        Backend("kotlin", "targets.kotlin:settings", ".kt", "Kotlin"),
+        Backend("nim", "targets.nim:settings", ".nim", "Nim"),
+        Backend("rust", "targets.rust:settings", ".rs", "Rust"),
+        Backend("zig", "targets.zig:settings", ".zig", "Zig"),
+    )
+}
+
+
+def _discover_targets() -> dict[str, Backend]:
+    """Manifest of the packages under targets/, without importing them."""
+    discovered: dict[str, Backend] = {}
 
     for module in pkgutil.iter_modules(targets.__path__):
         name = module.name
-        modname = f"targets.{name}"
+        discovered[name] = MANIFEST.get(name) or Backend(name, f"targets.{name}:settings")
 
-        try:
-            module_obj = importlib.import_module(modname)
-            factory = getattr(module_obj, "settings")
-        except Exception as exc:
-            log.warning("Skipping backend '%s': %s", name, exc)
-            continue
+    return discovered
 
-        if callable(factory):
-            discovered[name] = factory
-        else:
-            print(f"Skipping backend '{name}': 'settings' not callable")
 
-    return discovered
+@functools.cache
+def load_factory(backend: Backend) -> SettingsFactory:
+    """Import the module of a backend and return its settings factory."""
+    modname, _, attr = backend.entry_point.partition(":")
+    factory = getattr(importlib.import_module(modname), attr)
+    if not callable(factory):
+        raise TypeError(f"Backend '{backend.name}': '{attr}' not callable")
+    return factory
+
+
+class Factories(Mapping[str, SettingsFactory]):
+    """
+    Settings factories by language, loaded on first access.
+
+    Listing or testing for languages only reads the manifest, so
+    ``--lang`` can be validated without importing any backend.
+    """
+
+    def __init__(self, manifest: Mapping[str, Backend]):
+        self.manifest = manifest
+
+    def __getitem__(self, lang: str) -> SettingsFactory:
+        return load_factory(self.manifest[lang])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.manifest)
+
+    def __len__(self) -> int:
+        return len(self.manifest)
+
+    def __contains__(self, lang: object) -> bool:
+        return lang in self.manifest
+
+
+class LazySettings(Mapping[str, LanguageSettings]):
+    """Settings by language, instantiated with `args` on first access."""
+
+    def __init__(self, factories: Factories, args: argparse.Namespace | None):
+        self._factories = factories
+        self._args = args
+        self._settings: dict[str, LanguageSettings] = {}
+
+    def __getitem__(self, lang: str) -> LanguageSettings:
+        settings = self._settings.get(lang)
+        if settings is None:
+            settings = self._settings[lang] = call_factory(self._factories[lang], self._args)
+        return settings
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._factories)
+
+    def __len__(self) -> int:
+        return len(self._factories)
+
+    def __contains__(self, lang: object) -> bool:
+        return lang in self._factories
 
 
 def call_factory(factory: SettingsFactory, args: argparse.Namespace | None) -> LanguageSettings:
@@ -68,7 +152,7 @@ def call_factory(factory: SettingsFactory, args: argparse.Namespace | None) -> L
 
 
 @functools.cache
-def _get_all_factories_cached(defaults_frozen: frozenset[tuple[str, str]]) -> dict[str, SettingsFactory]:
+def _get_all_factories_cached(defaults_frozen: frozenset[tuple[str, str]]) -> Factories:
     """Internal cached function that returns factories bound to default settings.
     
     Returns factory functions that will use default settings when called.
@@ -83,11 +167,11 @@ def _get_all_factories_cached(defaults_frozen: frozenset[tuple[str, str]]) -> di
     
     # Return the raw factories (not instantiated), but some may be wrapped
     # to use defaults if they need them
-    return { "python": python_settings, **_discover_targets(), }
+    return Factories({"python": MANIFEST["python"], **_discover_targets()})
     
 
 
-def get_all_settings(args: argparse.Namespace | None = None) -> dict[str, SettingsFactory]:
+def get_all_settings(args: argparse.Namespace | None = None) -> Factories:
     """Get all language settings factories.
     
     Returns a dict of factory functions that can be called to instantiate language settings.
@@ -103,7 +187,8 @@ def get_all_settings(args: argparse.Namespace | None = None) -> dict[str, Settin
         
     Notes:
         - Module-level initialization (args=None) uses @functools.cache for performance
-        - Backend discovery is cached to avoid expensive module imports
+        - Backend discovery only lists targets/; a backend is imported when
+          its factory is first looked up
         - Each factory function returns a LanguageSettings instance when called
     """
     # Use cached factory discovery
@@ -1,7 +1,10 @@
 import ast
+from collections.abc import Sequence
 from contextlib import contextmanager
+from typing import Iterable, Iterator
 
 from py2many.ast_helpers import get_id
+from py2many.passes import AnalysisPass
 
 # All AST node types that introduce lexical scopes.
 # FIX: Explicit central definition ensures consistent scope detection
@@ -55,21 +58,136 @@ class ScopeMixin:
         return self.scopes[-1] if self.scopes else None
 
 
-class ScopeList(list):
+class SymbolIndex:
+    """
+    Names defined by the nodes of a list, each mapped to its first
+    definition as a linear search would find it.
+
+    The `vars` lists built by VariableTransformer only ever grow, so
+    entries appended since the last lookup are indexed as they come.
+    Other lists, like the `body` of a scope, may be changed in place by
+    rewriters, so they are compared with a snapshot on every lookup and
+    indexed again if they differ.
+    """
+
+    __slots__ = ("nodes", "_append_only", "_snapshot", "_indexed", "_symbols")
+
+    def __init__(self, nodes: list, append_only: bool):
+        self.nodes = nodes
+        self._append_only = append_only
+        self._snapshot: list = []
+        self._indexed = 0
+        self._symbols: dict = {}
+
+    def find(self, name: str) -> ast.AST | None:
+        nodes = self.nodes
+        if len(nodes) != self._indexed:
+            if len(nodes) < self._indexed or not self._append_only:
+                self._clear()
+        elif not self._append_only and nodes != self._snapshot:
+            self._clear()
+
+        if len(nodes) != self._indexed:
+            symbols = self._symbols
+            for node in nodes[self._indexed:]:
+                # Includes None, like the linear search did
+                node_id = get_id(node)
+                if node_id not in symbols:
+                    symbols[node_id] = node
+            self._indexed = len(nodes)
+            if not self._append_only:
+                self._snapshot = list(nodes)
+
+        return self._symbols.get(name)
+
+    def _clear(self) -> None:
+        self._indexed = 0
+        self._symbols = {}
+
+
+class ScopeList(Sequence):
     """
     Wraps around list of scopes and provides find method for finding
     the definition of a variable
+
+    The list is an immutable chain of links to the parent scopes, so
+    all nodes of a scope share the same ScopeList and nested scopes
+    share the lists of their parents.
     """
 
+    __slots__ = ("_scope", "_parent", "_len")
+
+    def __init__(self, scopes: Iterable[ast.AST] = ()):
+        self._scope: ast.AST | None = None
+        self._parent: ScopeList | None = None
+        self._len = 0
+        scopes = list(scopes)
+        if scopes:
+            self._parent = ScopeList(scopes[:-1])
+            self._scope = scopes[-1]
+            self._len = len(scopes)
+
+    def push(self, scope: ast.AST) -> "ScopeList":
+        """The scopes of nodes nested in `scope`."""
+        chain = ScopeList.__new__(ScopeList)
+        chain._scope, chain._parent, chain._len = scope, self, self._len + 1
+        return chain
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, index):
+        if index == -1 and self._len:
+            return self._scope
+        if isinstance(index, slice):
+            return ScopeList(list(self)[index])
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("scope index out of range")
+        chain = self
+        for _ in range(self._len - 1 - index):
+            chain = chain._parent
+        return chain._scope
+
+    def __iter__(self) -> Iterator[ast.AST]:
+        return iter(list(reversed(self))[::-1])
+
+    def __reversed__(self) -> Iterator[ast.AST]:
+        chain = self
+        while chain._len:
+            yield chain._scope
+            chain = chain._parent
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ScopeList, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ScopeList({list(self)!r})"
+
     @staticmethod
     def _lookup(scope, attr, name):
         # FIX:
         # getattr default prevents AttributeError when analysis passes
         # have not attached attributes like vars/body_vars/orelse_vars.
-        for var in getattr(scope, attr, ()):
-            if get_id(var) == name:
-                return var
-        return None
+        nodes = getattr(scope, attr, ())
+        if not isinstance(nodes, list):
+            for var in nodes:
+                if get_id(var) == name:
+                    return var
+            return None
+
+        indexes = scope.__dict__.get("_symbol_indexes")
+        if indexes is None:
+            indexes = scope._symbol_indexes = {}
+        index = indexes.get(attr)
+        if index is None or index.nodes is not nodes:
+            index = indexes[attr] = SymbolIndex(nodes, append_only=attr != "body")
+        return index.find(name)
 
     def find(self, lookup: str) -> ast.AST | None:
         """Find definition of variable lookup."""
@@ -103,39 +221,40 @@ class ScopeList(list):
         # Returning [] previously would break callers expecting ScopeList.
         if len(self) <= 1:
             return ScopeList()
-        return ScopeList(self[:-1])
+        return self._parent
 
 
-class ScopeTransformer(ast.NodeTransformer, ScopeMixin):
+class ScopeTransformer(AnalysisPass):
     """Adds a scope attribute to each AST node.
 
-    This transformer traverses the AST and attaches a `ScopeList` to each node,
-    representing the lexical scope (e.g., Module, Function, For loop) the
-    node belongs to.
+    This pass attaches a `ScopeList` to each node, representing the
+    lexical scope (e.g., Module, Function, For loop) the node belongs to.
 
     Attributes:
-        scopes: Inherited from ScopeMixin, tracks the current nesting level.
+        scopes: Inherited from AnalysisPass, tracks the current nesting level.
     """
 
     def __init__(self):
-        ast.NodeTransformer.__init__(self)
-        ScopeMixin.__init__(self)
-
-    def visit(self, node:ast.AST) -> ast.AST:
-        """Override visit to ensure every node gets a scope attribute, even if it's None."""
-        with self.enter_scope(node):
+        # Shared by all nodes of the current scope
+        self._chain = ScopeList()
 
-            node.scopes = ScopeList(list(self.scopes))
+    def enter_node(self, node: ast.AST) -> None:
+        """Ensure every node gets a scope attribute, even if it's None."""
+        if isinstance(node, _SCOPE_TYPES):
+            self._chain = self._chain.push(node)
+        node.scopes = self._chain
 
-            if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
 
-                if not hasattr(node, "vars"):
-                    node.vars = set()
+            if not hasattr(node, "vars"):
+                node.vars = set()
 
-                if not hasattr(node, "body_vars"):
-                    node.body_vars = set()
+            if not hasattr(node, "body_vars"):
+                node.body_vars = set()
 
-                if not hasattr(node, "orelse_vars"):
-                    node.orelse_vars = set()
+            if not hasattr(node, "orelse_vars"):
+                node.orelse_vars = set()
 
-            return super().visit(node)
\ No newline at end of file
+    def leave_node(self, node: ast.AST) -> None:
+        if isinstance(node, _SCOPE_TYPES):
+            self._chain = self._chain._parent
@@ -0,0 +1,164 @@
+"""
+``py2many serve``: a daemon transpiling on behalf of ``py2many-client``.
+
+Starting py2many imports the backends and builds their settings and
+dispatch tables before any module is transpiled. The daemon does that
+once, transpiles a small module with every backend to warm up lazy
+imports and caches, and then listens on a Unix socket.
+
+Every request is handled in a process forked from the warm daemon, so
+requests run concurrently, and whatever state a request leaves behind in
+transpilers, rewriters or module globals is gone with its process.
+
+A request is the command line of a py2many run, its working directory
+and environment, plus its stdin, stdout and stderr, which are passed as
+file descriptors. The settings prepared by the daemon are built with its
+environment; requests with other --indent, --extension or --no-prologue
+values build settings of their own.
+
+The socket is created in a directory only the user can write to, and
+connections from processes of other users are refused.
+"""
+
+import contextlib
+import io
+import json
+import os
+import socket
+import socketserver
+import sys
+import traceback
+from pathlib import Path
+from typing import List, Mapping, Optional, Sequence
+
+from py2many import pipeline
+from py2many.cli import parse_args
+from py2many.client import (
+    STREAMS,
+    default_socket_path,
+    is_private_dir,
+    peer_uid,
+    recv_line,
+)
+
+WARM_UP_FILENAME = Path("py2many_warm_up.py")
+WARM_UP_SOURCE = (
+    "def main():\n"
+    "    xs: list[int] = [1, 2, 3]\n"
+    "    for x in xs:\n"
+    "        print(x * 2)\n"
+    "\n"
+    "\n"
+    "if __name__ == '__main__':\n"
+    "    main()\n"
+)
+
+
+def _exit_status(e: SystemExit) -> int:
+    if e.code is None or isinstance(e.code, int):
+        return e.code or 0
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_request(message: Mapping, fds: Sequence[int]) -> int:
+    """Run the py2many command of a request in this (forked) process."""
+    for stream in (sys.stdout, sys.stderr):
+        stream.flush()
+    for target, fd in zip(STREAMS, fds):
+        os.dup2(fd, target)
+
+    try:
+        os.chdir(message["cwd"])
+        pipeline.CWD = Path.cwd()
+        os.environ.clear()
+        os.environ.update(message["env"])
+        pipeline.restore_prepared_classes()
+        return pipeline.transpile_from_args(parse_args(message["argv"]))
+    except SystemExit as e:
+        return _exit_status(e)
+    except Exception:
+        traceback.print_exc()
+        return 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            stream.flush()
+
+
+class RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        fds: List[int] = []
+        status = 1
+        try:
+            message = json.loads(recv_line(self.request, fds))
+            status = run_request(message, fds)
+        except ConnectionError:
+            # Closed without a request, by a client checking who serves
+            return
+        finally:
+            for fd in fds:
+                os.close(fd)
+        self.request.sendall(json.dumps({"status": status}).encode() + b"\n")
+
+
+class Server(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    def verify_request(self, request, client_address) -> bool:
+        """Only serve the user running the daemon."""
+        uid = peer_uid(request)
+        # Without SO_PEERCRED, the private directory keeps other users out
+        return uid is None or uid == os.getuid()
+
+
+def _is_listening(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        try:
+            conn.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def warm_up(languages: Sequence[str]) -> None:
+    """Transpile a small module with the prepared settings of `languages`."""
+    args = parse_args(["--lang", ",".join(languages)])
+    for language in languages:
+        settings = pipeline._settings_from_args(language, args)
+        # Rewriters keep counters for names of temporaries and the like,
+        # which requests have to start from
+        rewriters = [*settings.rewriters, *settings.post_rewriters]
+        states = [pipeline._transpiler_state(r) for r in rewriters]
+        # Constructs a backend doesn't support only make it warm up less
+        with contextlib.redirect_stdout(io.StringIO()):
+            pipeline._transpile([WARM_UP_FILENAME], [WARM_UP_SOURCE], settings)
+        for rewriter, state in zip(rewriters, states):
+            pipeline._restore_transpiler_state(rewriter, state)
+
+
+def serve(path: Optional[Path], languages: Sequence[str]) -> int:
+    """Prepare the backends of `languages` and serve requests on `path`."""
+    path = path or default_socket_path()
+    path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+    if not is_private_dir(path.parent):
+        print(
+            f"Not serving on {path}: {path.parent} must be a directory "
+            "of the user that other users can't write to",
+            file=sys.stderr,
+        )
+        return 1
+    if _is_listening(path):
+        print(f"py2many is already serving on {path}", file=sys.stderr)
+        return 1
+    path.unlink(missing_ok=True)
+
+    pipeline.prepare_settings(languages, parse_args(["--lang", ",".join(languages)]))
+    warm_up(languages)
+
+    with Server(str(path), RequestHandler) as server:
+        print(f"Serving on {path}", file=sys.stderr)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+    return 0
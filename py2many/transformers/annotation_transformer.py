@@ -1,11 +1,13 @@
 import ast
 
+from py2many.passes import AnalysisPass
+
 
 def add_annotation_flags(node: ast.AST) -> ast.AST:
     return AnnotationTransformer().visit(node)
 
 
-class AnnotationTransformer(ast.NodeTransformer):
+class AnnotationTransformer(AnalysisPass):
     """
     Adds a flag for every type annotation and nested types so they can be differentiated from array
     """
@@ -13,43 +15,27 @@ class AnnotationTransformer(ast.NodeTransformer):
     def __init__(self):
         self.handling_annotation = False
 
-    def visit_arg(self, node: ast.AST) -> ast.AST:
-        if node.annotation:
-            self.handling_annotation = True
-            self.visit(node.annotation)
-            self.handling_annotation = False
-        return node
-
-    def visit_FunctionDef(self, node: ast.AST) -> ast.AST:
-        if node.returns:
-            self.handling_annotation = True
-            self.visit(node.returns)
-            self.handling_annotation = False
-        self.generic_visit(node)
-        return node
-
-    def _visit_record_handling_annotation(self, node: ast.AST) -> ast.AST:
-        if self.handling_annotation:
-            node.is_annotation = True
-        self.generic_visit(node)
-        return node
+    def _enter_annotation(self, node: ast.AST) -> None:
+        self.handling_annotation = True
 
-    # without this Dict[x,y] will be translated to HashMap<(x,y)>
-    def visit_Tuple(self, node: ast.AST):
-        return self._visit_record_handling_annotation(node)
+    def _leave_annotation(self, node: ast.AST) -> None:
+        self.handling_annotation = False
 
-    def visit_List(self, node: ast.AST):
-        return self._visit_record_handling_annotation(node)
+    enter_arg_annotation = _enter_annotation
+    leave_arg_annotation = _leave_annotation
 
-    def visit_Name(self, node: ast.AST):
-        return self._visit_record_handling_annotation(node)
+    enter_FunctionDef_returns = _enter_annotation
+    leave_FunctionDef_returns = _leave_annotation
 
-    def visit_Subscript(self, node: ast.AST):
-        return self._visit_record_handling_annotation(node)
+    enter_AnnAssign_target = _enter_annotation
+    leave_AnnAssign_target = _leave_annotation
 
-    def visit_AnnAssign(self, node: ast.AST):
-        self.handling_annotation = True
-        self.visit(node.target)
-        self.handling_annotation = False
-        self.generic_visit(node)
-        return node
+    def _record_handling_annotation(self, node: ast.AST) -> None:
+        if self.handling_annotation:
+            node.is_annotation = True
+
+    # without this Dict[x,y] will be translated to HashMap<(x,y)>
+    enter_Tuple = _record_handling_annotation
+    enter_List = _record_handling_annotation
+    enter_Name = _record_handling_annotation
+    enter_Subscript = _record_handling_annotation
@@ -7,6 +7,9 @@ import ast
 from typing import Dict, List, Optional
 
 from py2many.ast_helpers import get_id
+from py2many.context import VariableTransformer
+from py2many.passes import SKIP, AnalysisPass
+from py2many.scope import ScopeTransformer
 from py2many.utilities.logger import setup_logger, LogLevel
 
 log = setup_logger()
@@ -16,13 +19,15 @@ def detect_mutable_vars(node: ast.AST) -> ast.AST:
     return MutabilityTransformer().visit(node)
 
 
-class MutabilityTransformer(ast.NodeTransformer):
+class MutabilityTransformer(AnalysisPass):
     """
     Detect variables that are written to more than once inside a function.
     A variable is considered mutable if assigned multiple times or mutated
     through list operations.
     """
 
+    requires = (VariableTransformer, ScopeTransformer)
+
     def __init__(self) -> None:
         super().__init__()
 
@@ -32,6 +37,7 @@ class MutabilityTransformer(ast.NodeTransformer):
         self._usage_stack: List[Dict[str, int]] = []
 
         self._in_lvalue: bool = False
+        self._lvalue_stack: List[bool] = []
 
     # ---------------------------------------------------------
     # MARK: - Helpers
@@ -64,63 +70,40 @@ class MutabilityTransformer(ast.NodeTransformer):
     # MARK: - Visitors
     # ---------------------------------------------------------
 
-    def _visit_function(self, node: ast.AST) -> ast.AST:
-        """
-        Shared handler for FunctionDef and AsyncFunctionDef.
-
-        FIX: AsyncFunctionDef previously had no mutability analysis which
-        caused downstream AttributeError when mutable_vars was expected.
-        """
+    # FIX: async functions must be analyzed the same way as normal functions
+    def enter_FunctionDef(self, node: ast.AST) -> None:
         self._enter_function()
-        self.generic_visit(node)
+
+    enter_AsyncFunctionDef = enter_FunctionDef
+
+    def leave_FunctionDef(self, node: ast.AST) -> None:
         self._leave_function(node)
-        return node
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
-        return self._visit_function(node)
+    leave_AsyncFunctionDef = leave_FunctionDef
 
-    # FIX: async functions must be analyzed the same way as normal functions
-    def visit_AsyncFunctionDef(self, node: ast.AsyncFunctionDef) -> ast.AST:
-        return self._visit_function(node)
-
-    def visit_Assign(self, node: ast.Assign) -> ast.AST:
-        for target in node.targets:
-            self._visit_assignment_target(target)
-        self.visit(node.value)
-        return node
-
-    def visit_AnnAssign(self, node: ast.AnnAssign) -> ast.AST:
-        self._visit_assignment_target(node.target)
-        if node.value:
-            self.visit(node.value)
-        return node
-
-    def visit_AugAssign(self, node: ast.AugAssign) -> ast.AST:
-        self._visit_assignment_target(node.target)
-        self.visit(node.value)
-        return node
-
-    def _visit_assignment_target(self, target: ast.AST) -> None:
-        previous = self._in_lvalue
+    def _enter_assignment_target(self, node: ast.AST) -> None:
+        self._lvalue_stack.append(self._in_lvalue)
         self._in_lvalue = True
 
-        # FIX: tuple/list unpacking targets were previously ignored,
-        # resulting in missed mutations such as:  a, b = foo()
-        if isinstance(target, (ast.Tuple, ast.List)):
-            for elt in target.elts:
-                self.visit(elt)
-        else:
-            self.visit(target)
+    def _leave_assignment_target(self, node: ast.AST) -> None:
+        self._in_lvalue = self._lvalue_stack.pop()
+
+    enter_Assign_targets = _enter_assignment_target
+    leave_Assign_targets = _leave_assignment_target
+    enter_AnnAssign_target = _enter_assignment_target
+    leave_AnnAssign_target = _leave_assignment_target
+    enter_AugAssign_target = _enter_assignment_target
+    leave_AugAssign_target = _leave_assignment_target
 
-        self._in_lvalue = previous
+    def enter_AnnAssign_annotation(self, node: ast.AnnAssign) -> object:
+        # Names in the annotation are types, not variables
+        return SKIP
 
-    def visit_Name(self, node: ast.Name) -> ast.AST:
+    def enter_Name(self, node: ast.Name) -> None:
         if self._in_lvalue:
             self._increment(get_id(node))
-        return node
 
-
-    def visit_Call(self, node: ast.Call) -> ast.AST:
+    def enter_Call(self, node: ast.Call) -> None:
         # Track list mutations like x.append(...)
         if isinstance(node.func, ast.Attribute):
             if node.func.attr in {"append", "extend", "insert", "remove", "pop"}:
@@ -164,6 +147,3 @@ class MutabilityTransformer(ast.NodeTransformer):
                 if fnarg.arg in getattr(fndef, "mutable_vars", []):
                     if isinstance(arg_node, ast.Name):
                         self._increment(get_id(arg_node))
-
-        self.generic_visit(node)
-        return node
\ No newline at end of file
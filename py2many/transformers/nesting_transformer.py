@@ -1,11 +1,13 @@
 import ast
 
+from py2many.passes import AnalysisPass
+
 
 def detect_nesting_levels(node: ast.AST) -> ast.AST:
     return NestingTransformer().visit(node)
 
 
-class NestingTransformer(ast.NodeTransformer):
+class NestingTransformer(AnalysisPass):
     """
     Some languages are white space sensitive. This transformer
     annotates relevant nodes with the nesting level
@@ -14,41 +16,42 @@ class NestingTransformer(ast.NodeTransformer):
     def __init__(self):
         self.level = 0
 
-    def _visit_level(self, node: ast.AST) -> ast.AST:
-        """Annotate node with nesting level and visit children"""
+    def _enter_level(self, node: ast.AST) -> None:
+        """Annotate node with nesting level before visiting children"""
         node.level = self.level
         self.level += 1
-        self.generic_visit(node)
+
+    def _leave_level(self, node: ast.AST) -> None:
         self.level -= 1
-        return node
 
-    def visit_FunctionDef(self, node: ast.AST) -> ast.AST:
+    def enter_FunctionDef(self, node: ast.AST) -> None:
         """Annotate function definitions with nesting level"""
-        return self._visit_level(node)
+        self._enter_level(node)
 
-    def visit_ClassDef(self, node: ast.AST) -> ast.AST:
+    def enter_ClassDef(self, node: ast.AST) -> None:
         """
         Annotate class definitions with nesting level.
         This is relevant for languages like Java
         where nested classes are a thing,
         but not for Python where nested classes are not a thing.
         """
-        return self._visit_level(node)
+        self._enter_level(node)
 
-    def visit_If(self, node: ast.AST):
+    def enter_If(self, node: ast.AST) -> None:
         """Annotate if statements with nesting level"""
-        return self._visit_level(node)
+        self._enter_level(node)
 
-    def visit_While(self, node: ast.AST):
+    def enter_While(self, node: ast.AST) -> None:
         """Annotate while statements with nesting level"""
-        return self._visit_level(node)
+        self._enter_level(node)
 
-    def visit_For(self, node: ast.AST):
+    def enter_For(self, node: ast.AST) -> None:
         """Annotate for statements with nesting level"""
-        return self._visit_level(node)
+        self._enter_level(node)
+
+    leave_FunctionDef = leave_ClassDef = _leave_level
+    leave_If = leave_While = leave_For = _leave_level
 
-    def visit_Assign(self, node: ast.AST):
+    def enter_Assign(self, node: ast.AST) -> None:
         """Annotate assignment statements with nesting level"""
         node.level = self.level
-        self.generic_visit(node)
-        return node
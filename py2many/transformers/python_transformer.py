@@ -30,6 +30,9 @@ class PythonTranspiler(CLikeTranspiler):
     def visit(self, node):
         return ast.unparse(node)
 
+    def module_chunks(self, node):
+        return [self.visit(node)]
+
     def usings(self):
         return (
             "" if self._no_prologue
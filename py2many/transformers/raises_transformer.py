@@ -2,13 +2,16 @@ import ast
 from typing import Optional
 
 from py2many.ast_helpers import get_id
+from py2many.context import VariableTransformer
+from py2many.passes import AnalysisPass
+from py2many.scope import ScopeTransformer
 
 
 def detect_raises(node: ast.AST) -> ast.AST:
     return RaisesTransformer().visit(node)
 
 
-class RaisesTransformer(ast.NodeTransformer):
+class RaisesTransformer(AnalysisPass):
     """
     Annotate FunctionDef nodes with a boolean attribute `raises`.
     A function is marked as raising if it:
@@ -16,15 +19,14 @@ class RaisesTransformer(ast.NodeTransformer):
       - calls another function already marked as raising
     """
 
-    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+    requires = (VariableTransformer, ScopeTransformer)
+
+    def enter_FunctionDef(self, node: ast.FunctionDef) -> None:
         # Initialize attribute for stability
         node.raises = False
-        self.generic_visit(node)
-        return node
 
-    def visit_Raise(self, node: ast.Raise) -> ast.AST:
+    def enter_Raise(self, node: ast.Raise) -> None:
         self._mark_parent_raises(node)
-        return self.generic_visit(node)
 
 
     @staticmethod
@@ -45,16 +47,15 @@ class RaisesTransformer(ast.NodeTransformer):
         if fndef is not None:
             fndef.raises = True
 
-    def visit_Assert(self, node: ast.Assert) -> ast.AST:
+    def enter_Assert(self, node: ast.Assert) -> None:
         """Assert statements indicate the function can raise."""
         self._mark_parent_raises(node)
-        return self.generic_visit(node)
 
-    def visit_Call(self, node: ast.Call) -> ast.AST:
+    def enter_Call(self, node: ast.Call) -> None:
         """Calls to functions marked as raising indicate the caller can raise."""
         scopes = getattr(node, "scopes", None)
         if not scopes:
-            return self.generic_visit(node)
+            return
 
         # Extract function name safely
         func_name = None
@@ -69,5 +70,3 @@ class RaisesTransformer(ast.NodeTransformer):
                 callee = finder(func_name)
                 if callee is not None and getattr(callee, "raises", False):
                     self._mark_parent_raises(node)
-
-        return self.generic_visit(node)
\ No newline at end of file
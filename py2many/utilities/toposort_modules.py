@@ -80,7 +80,10 @@ class ImportDependencyVisitor(ast.NodeVisitor):
         return result
 
 
-def get_dependencies(trees: Tuple[ast.AST, ...]) -> Dict[str, FrozenSet[str]]:
+def get_dependencies(
+        trees: Tuple[ast.AST, ...],
+        project_modules: FrozenSet[str] | None = None,
+) -> Dict[str, FrozenSet[str]]:
     """Extract complete dependency graph from list of Python AST trees.
 
     Ensures every project module appears in deps graph (empty frozenset if no deps).
@@ -88,6 +91,8 @@ def get_dependencies(trees: Tuple[ast.AST, ...]) -> Dict[str, FrozenSet[str]]:
 
     Args:
         trees: List of ast.Module nodes with __file__ attribute set
+        project_modules: Modules to track, if the project has more modules
+            than the trees given (e.g. when only some of them are parsed)
 
     Returns:
         Dict[module_name, frozenset(dependencies)] - immutable graph 
@@ -104,7 +109,8 @@ def get_dependencies(trees: Tuple[ast.AST, ...]) -> Dict[str, FrozenSet[str]]:
         frozenset()
     """
     # Extract module names from trees - only track these modules
-    project_modules = frozenset(module_for_path(Path(node.__file__)) for node in trees)
+    if project_modules is None:
+        project_modules = frozenset(module_for_path(Path(node.__file__)) for node in trees)
     
     # Visit AST trees to find dependencies
     visitor = ImportDependencyVisitor(project_modules)
@@ -171,3 +177,57 @@ def toposort(trees: Tuple[ast.AST, ...]) -> Tuple[ast.AST, ...]:
     }
     ts = StableTopologicalSorter(deps)
     return tuple(tree_dict[t] for t in ts.static_order())
+
+
+def symbol_dependency_groups(trees: Tuple[ast.AST, ...]) -> Tuple[Tuple[int, ...], ...]:
+    """Partition trees into groups that must be analysed in the same process.
+
+    Cross-module symbol resolution happens in
+    ``VariableTransformer.visit_ImportFrom``, which looks imported names up
+    in ``m.scopes`` of the tree whose file *stem* equals ``node.module``.
+    Modules linked by such imports (directly or transitively, in either
+    direction) end up in the same group; unrelated modules can be
+    transpiled independently of each other.
+
+    Indices inside each group keep the order of ``trees``, so passing
+    toposorted trees yields groups that are toposorted as well.
+
+    Example:
+        >>> import ast
+        >>> foo = ast.parse("pass"); foo.__file__ = Path("foo.py")
+        >>> bar = ast.parse("from foo import x"); bar.__file__ = Path("bar.py")
+        >>> baz = ast.parse("pass"); baz.__file__ = Path("baz.py")
+        >>> symbol_dependency_groups((foo, bar, baz))
+        ((0, 1), (2,))
+    """
+    parent = list(range(len(trees)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int) -> None:
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    by_stem: Dict[str, list[int]] = defaultdict(list)
+    for index, tree in enumerate(trees):
+        by_stem[Path(tree.__file__).stem].append(index)
+
+    # Modules sharing a stem shadow each other in VariableTransformer's lookup
+    for indices in by_stem.values():
+        for index in indices[1:]:
+            union(indices[0], index)
+
+    for index, tree in enumerate(trees):
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ImportFrom) and node.module in by_stem:
+                union(index, by_stem[node.module][0])
+
+    groups: Dict[int, list[int]] = defaultdict(list)
+    for index in range(len(trees)):
+        groups[find(index)].append(index)
+    return tuple(tuple(group) for group in groups.values())
@@ -0,0 +1,177 @@
+"""
+Change notification for ``--watch``.
+
+`changes` yields the Python files changed under a directory, a batch at
+a time. On Linux the directory tree is watched with inotify (through
+ctypes, no extra dependency); elsewhere, or when inotify is unavailable,
+the tree is scanned for changed mtimes every `POLL_INTERVAL` seconds.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+from py2many.utilities.logger import setup_logger
+
+_log = setup_logger()
+
+POLL_INTERVAL = 0.5
+# Editors save in several steps; changes closer than this are batched
+DEBOUNCE = 0.05
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = os.O_CLOEXEC
+
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT = struct.Struct("iIII")
+
+
+def _is_source(path: Path) -> bool:
+    return path.suffix == ".py" and path.parent.name != "__pycache__"
+
+
+def _source_files(root: Path) -> Iterator[Path]:
+    return (path for path in root.rglob("*.py") if _is_source(path))
+
+
+class InotifyWatcher:
+    """Watches every directory under a root with one inotify instance."""
+
+    def __init__(self, root: Path):
+        libc_name = ctypes.util.find_library("c")
+        if libc_name is None:
+            raise OSError("libc not found")
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+
+        self._fd = self._libc.inotify_init1(IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        self.root = root
+        self._add_tree(root)
+
+    def _add_tree(self, directory: Path) -> Set[Path]:
+        """Watch `directory` and the directories under it; returns the sources in them."""
+        sources: Set[Path] = set()
+        for dirpath, dirnames, filenames in os.walk(directory):
+            dirnames[:] = [d for d in dirnames if d != "__pycache__"]
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(dirpath), _WATCH_MASK)
+            if wd < 0:
+                _log.warning(f"Can't watch {dirpath}: {os.strerror(ctypes.get_errno())}")
+                continue
+            self._dirs[wd] = Path(dirpath)
+            sources.update(Path(dirpath, f) for f in filenames if f.endswith(".py"))
+        return sources
+
+    def read(self, timeout: Optional[float]) -> Set[Path]:
+        """Sources changed within `timeout` seconds (None waits for the first change)."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+
+        data = os.read(self._fd, 64 * 1024)
+        changed: Set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, treat everything as changed
+                changed.update(_source_files(self.root))
+                continue
+            if mask & IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+
+            directory = self._dirs.get(wd)
+            if directory is None or not name:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changed.update(self._add_tree(path))
+            elif _is_source(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    """Compares the mtimes and sizes of the sources under a root."""
+
+    def __init__(self, root: Path, interval: float = POLL_INTERVAL):
+        self.root = root
+        self.interval = interval
+        self._stats = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        stats: Dict[Path, Tuple[int, int]] = {}
+        for path in _source_files(self.root):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            stats[path] = (stat.st_mtime_ns, stat.st_size)
+        return stats
+
+    def read(self, timeout: Optional[float]) -> Set[Path]:
+        """Sources changed within `timeout` seconds (None waits for the first change)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            time.sleep(self.interval if deadline is None
+                       else max(min(self.interval, deadline - time.monotonic()), 0))
+            stats = self._scan()
+            changed = {
+                path for path in stats.keys() | self._stats.keys()
+                if stats.get(path) != self._stats.get(path)
+            }
+            self._stats = stats
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+def changes(root: Path, poll: bool = False) -> Iterator[Set[Path]]:
+    """Batches of sources changed under `root`, as they happen."""
+    watcher: InotifyWatcher | PollingWatcher
+    try:
+        if poll:
+            raise OSError("polling requested")
+        watcher = InotifyWatcher(root)
+    except (OSError, AttributeError) as e:
+        _log.debug(f"Polling for changes: {e}")
+        watcher = PollingWatcher(root)
+
+    try:
+        while True:
+            batch = watcher.read(None)
+            while batch:
+                more = watcher.read(DEBOUNCE)
+                if not more:
+                    break
+                batch |= more
+            if batch:
+                yield batch
+    finally:
+        watcher.close()
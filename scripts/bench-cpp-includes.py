@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Measure C++ backend startup with a cold and a warm Conan include cache.
+
+Builds a synthetic Conan 2 cache of PACKAGES packages with FILES headers
+each, then times `targets.cpp.settings()` in fresh interpreters: once
+with an empty py2many cache dir (cold, the Conan cache is searched) and
+REPEAT times with the include dirs cached (warm).
+
+    scripts/bench-cpp-includes.py [--packages N] [--files N] [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.absolute()
+
+STARTUP = (
+    "import argparse\n"
+    "from targets.cpp import settings\n"
+    "settings(argparse.Namespace(extension=False, no_prologue=False))\n"
+)
+
+
+def make_conan_cache(home: Path, packages: int, files: int) -> None:
+    store = home / ".conan2" / "p"
+    for i in range(packages):
+        include = store / f"pkg{i}" / "p" / "include" / f"pkg{i}"
+        include.mkdir(parents=True)
+        for j in range(files):
+            (include / f"header{j}.hpp").touch()
+    for header in ("catch2/catch_test_macros.hpp", "cppitertools/range.hpp"):
+        path = store / header.split("/")[0] / "p" / "include" / header
+        path.parent.mkdir(parents=True)
+        path.touch()
+
+
+def startup(env: dict) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-c", STARTUP], env=env, cwd=ROOT_DIR, check=True)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--packages", type=int, default=500)
+    parser.add_argument("--files", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        make_conan_cache(home, args.packages, args.files)
+        env = {
+            **os.environ,
+            "HOME": str(home),
+            "PY2MANY_CACHE_DIR": str(home / "py2many-cache"),
+            "PYTHONPATH": str(ROOT_DIR),
+        }
+        env.pop("PY2MANY_CPP_INCLUDES", None)
+
+        cold = startup(env)
+        warm = [startup(env) for _ in range(args.repeat)]
+
+    print(f"Conan cache: {args.packages} packages x {args.files} headers")
+    print(f"cold: {cold * 1e3:8.1f} ms")
+    print(f"warm: {statistics.median(warm) * 1e3:8.1f} ms (median of {args.repeat})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Measure the stdout throughput of generated C++ with and without --buffered-output.
+
+Transpiles a loop printing LINES lines in both modes, compiles each with
+$CXX (default g++) at -O2 and reports the best of RUNS runs writing to a
+file and to a pipe.
+
+    scripts/bench-cpp-print.py [--lines N] [--runs N]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(ROOT_DIR))
+
+from py2many.api import transpile  # noqa: E402
+
+PROGRAM = """
+def run(n: int):
+    i: int = 0
+    while i < n:
+        print(i, "line")
+        i += 1
+
+
+if __name__ == "__main__":
+    run({lines})
+"""
+
+
+def best(command: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, shell=True, check=True)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lines", type=int, default=5_000_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    cxx = os.environ.get("CXX", "g++")
+    source = PROGRAM.format(lines=args.lines)
+    with tempfile.TemporaryDirectory() as tmp:
+        for buffered in (False, True):
+            results = transpile({"bench.py": source}, ["cpp"], buffered_output=buffered)
+            assert results.ok, results.diagnostics
+            cpp = Path(tmp, "bench.cpp")
+            exe = Path(tmp, "bench")
+            cpp.write_text(results.outputs["cpp"]["bench.py"])
+            subprocess.run([cxx, "-O2", "-std=c++17", "-o", str(exe), str(cpp)], check=True)
+
+            to_file = best(f"{exe} > {Path(tmp, 'out.txt')}", args.runs)
+            to_pipe = best(f"{exe} | cat > /dev/null", args.runs)
+            mode = "buffered" if buffered else "default "
+            print(f"{mode}  file: {to_file:6.2f}s  pipe: {to_pipe:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
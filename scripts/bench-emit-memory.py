@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Measure the peak memory of transpiling and writing one large module.
+
+Generates a module of FUNCTIONS functions and reports, as traced by
+tracemalloc, the peak of the whole transpile, of the code generation
+step (as in --profile-passes) and of writing the output file.
+
+    scripts/bench-emit-memory.py [--lang LANG] [--functions N]
+"""
+
+import argparse
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent.parent.absolute()
+sys.path.insert(0, str(ROOT_DIR))
+
+from py2many import pipeline  # noqa: E402
+from py2many.cli import parse_args  # noqa: E402
+from py2many.profiler import PassProfiler  # noqa: E402
+
+FUNCTION = '''
+def func_{i}(a: int, b: int) -> int:
+    """Compute something {i}."""
+    total: int = 0
+    for j in range(a):
+        if j % 3 == 0:
+            total += j * b + {i}
+        else:
+            total -= b
+    return total
+'''
+
+
+def make_module(functions: int) -> str:
+    return "\n".join(FUNCTION.format(i=i) for i in range(functions))
+
+
+def mb(size: int) -> str:
+    return f"{size / 1e6:8.2f} MB"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--lang", default="cpp")
+    parser.add_argument("--functions", type=int, default=3000)
+    args = parser.parse_args()
+
+    source = make_module(args.functions)
+    settings = pipeline._settings_from_args(args.lang, parse_args(["--lang", args.lang]))
+
+    pipeline._profiler = PassProfiler()
+    outputs, _ = pipeline._transpile([Path("big.py")], [source], settings)
+    _, transpile_peak = tracemalloc.get_traced_memory()
+    emit_peak = max(
+        p["peak_bytes"] for p in pipeline._profiler.report()["passes"] if p["stage"] == "emit"
+    )
+
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    with tempfile.TemporaryDirectory() as tmp:
+        pipeline._write_outputs(outputs, [Path(tmp) / f"big{settings.ext}"])
+    _, write_peak = tracemalloc.get_traced_memory()
+
+    print(f"{args.functions} functions, source {mb(len(source))}, output {mb(len(outputs[0]))}")
+    print(f"transpile peak: {mb(transpile_peak)}")
+    print(f"emit peak:      {mb(emit_peak)}")
+    print(f"write peak:     {mb(write_peak - before)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,15 @@ object used for transpiling Python code to C++.
 """
 
 import argparse
+import functools
+import json
 import os
 import pathlib
 import sys
+import tempfile
 from typing import Tuple, Mapping
 
+from py2many.cache import default_cache_dir
 from py2many.language import LanguageSettings
 from py2many.utilities.find_executable import find_executable
 from .transpiler import CppListComparisonRewriter, CppTranspiler
@@ -18,27 +22,136 @@ from .transpiler import CppListComparisonRewriter, CppTranspiler
 # Constants for Conan include detection
 USER_HOME: str = os.path.expanduser("~")
 CONAN_ROOTS = (f"{USER_HOME}/.conan/", f"{USER_HOME}/.conan2/")
+# Where Conan 1 and Conan 2 unpack packages inside their root
+CONAN_PACKAGE_DIRS = ("data", "p")
 REQUIRED_INCLUDE_FILES = (
     "catch2/catch_test_macros.hpp",
     "cppitertools/range.hpp",
 )
+# os.pathsep separated include dirs, used instead of searching Conan
+INCLUDES_ENV = "PY2MANY_CPP_INCLUDES"
+INCLUDE_CACHE_FILENAME = "cpp-includes.json"
 
 
+def _conan_root_key(root: str) -> list | None:
+    """
+    mtimes of a Conan root, its package dirs and the packages in them.
+    Adding or removing a package changes the former, and Conan 1
+    installing another version of a package changes its own dir.
+    None if there is no such root.
+    """
+    try:
+        key: list = [os.stat(root).st_mtime_ns]
+    except OSError:
+        return None
+    for package_dir in CONAN_PACKAGE_DIRS:
+        path = os.path.join(root, package_dir)
+        try:
+            key.append(os.stat(path).st_mtime_ns)
+            with os.scandir(path) as entries:
+                packages = sorted(
+                    [entry.name, entry.stat().st_mtime_ns]
+                    for entry in entries
+                    if entry.is_dir()
+                )
+        except OSError:
+            key.append(0)
+            continue
+        key.append(packages)
+    return key
+
+
+def _scan_conan_root(root: str) -> dict[str, list[str]]:
+    """Include dirs of each of the required headers found under `root`."""
+    return {
+        hpp_filename: [
+            str(path.parent.parent) for path in pathlib.Path(root).rglob(hpp_filename)
+        ]
+        for hpp_filename in REQUIRED_INCLUDE_FILES
+    }
+
+
+def _load_include_cache(path: pathlib.Path) -> dict:
+    try:
+        with open(path) as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cached if isinstance(cached, dict) else {}
+
+
+def _store_include_cache(path: pathlib.Path, cached: dict) -> None:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", dir=path.parent, delete=False) as f:
+            json.dump(cached, f)
+        os.replace(f.name, path)
+    except OSError:
+        # Only costs a scan next time
+        pass
+
+
+def _is_current(entry, key: list) -> bool:
+    """True if `entry` was scanned for `key` and its include dirs still exist."""
+    return (
+        isinstance(entry, dict)
+        and entry.get("key") == key
+        and isinstance(entry.get("includes"), dict)
+        and set(entry["includes"]) == set(REQUIRED_INCLUDE_FILES)
+        and all(
+            os.path.isdir(directory)
+            for directories in entry["includes"].values()
+            for directory in directories
+        )
+    )
+
+
+@functools.cache
 def _conan_include_dirs() -> Tuple[str, ...]:
-    """Search Conan cache for known includes and extract their parent dirs."""
-    include_dirs = []
-    for hpp_filename in REQUIRED_INCLUDE_FILES:
-        for root in CONAN_ROOTS:
-            for path in pathlib.Path(root).rglob(hpp_filename):
-                include_dirs.append(str(path.parent.parent))
-    return tuple(include_dirs)
+    """
+    Search Conan cache for known includes and extract their parent dirs.
+
+    The search walks the whole Conan cache, so its result is kept in
+    the py2many cache dir and reused until a Conan root changes or one
+    of the dirs found is gone.
+    """
+    cache_path = default_cache_dir() / INCLUDE_CACHE_FILENAME
+    cached = _load_include_cache(cache_path)
+    changed = False
+    found: dict[str, dict[str, list[str]]] = {}
+    for root in CONAN_ROOTS:
+        key = _conan_root_key(root)
+        if key is None:
+            found[root] = {}
+            continue
+        entry = cached.get(root)
+        if not _is_current(entry, key):
+            entry = cached[root] = {"key": key, "includes": _scan_conan_root(root)}
+            changed = True
+        found[root] = entry["includes"]
+    if changed:
+        _store_include_cache(cache_path, cached)
+
+    return tuple(
+        directory
+        for hpp_filename in REQUIRED_INCLUDE_FILES
+        for root in CONAN_ROOTS
+        for directory in found[root].get(hpp_filename, ())
+    )
 
 
-def _conan_include_args() -> Tuple[str, ...]:
+def _include_dirs(env: Mapping[str, str] = os.environ) -> Tuple[str, ...]:
+    """Include dirs from $PY2MANY_CPP_INCLUDES, else from the Conan cache."""
+    if INCLUDES_ENV in env:
+        return tuple(d for d in env[INCLUDES_ENV].split(os.pathsep) if d)
+    return _conan_include_dirs()
+
+
+def _conan_include_args(env: Mapping[str, str] = os.environ) -> Tuple[str, ...]:
     """Convert Conan include dirs into -I flags for compiler."""
     return tuple(
         arg
-        for directory in _conan_include_dirs()
+        for directory in _include_dirs(env)
         for arg in ("-I", directory)
     )
 
@@ -49,7 +162,9 @@ def settings(args: argparse.Namespace | None, env: Mapping[str, str]=os.environ)
 
     Args:
         args: Parsed CLI args, must have .extension and .no_prologue
-        env: Environment mapping for $CXX, $CLANG_FORMAT_STYLE, $CXXFLAGS
+            (.buffered_output is optional)
+        env: Environment mapping for $CXX, $CLANG_FORMAT_STYLE, $CXXFLAGS,
+            $PY2MANY_CPP_INCLUDES
 
     Returns:
         LanguageSettings configured for C++ code generation.
@@ -73,7 +188,7 @@ def settings(args: argparse.Namespace | None, env: Mapping[str, str]=os.environ)
     cxx_flags: Tuple[str, ...]  = tuple(
         env.get("CXXFLAGS", "-std=c++17 -Wall -Werror").split()
     )
-    cxx_flags = _conan_include_args() + cxx_flags
+    cxx_flags = _conan_include_args(env) + cxx_flags
     if cxx.startswith("clang++") and sys.platform != "win32":
         cxx_flags += ("-stdlib=libc++",)
 
@@ -81,16 +196,25 @@ def settings(args: argparse.Namespace | None, env: Mapping[str, str]=os.environ)
     clang_style = env.get("CLANG_FORMAT_STYLE")
 
     clang_format_cmd: Tuple[str, ...] = ("clang-format", "-i")
+    # Formats stdin, finding .clang-format files as for the output file
+    clang_format_filter: Tuple[str, ...] = ("clang-format", "--assume-filename={filename}")
 
     if clang_style:
         clang_format_cmd += (f"-style={clang_style}",)
+        clang_format_filter += (f"-style={clang_style}",)
 
     return LanguageSettings(
-        transpiler=CppTranspiler(args.extension, args.no_prologue),
+        transpiler=CppTranspiler(
+            args.extension,
+            args.no_prologue,
+            getattr(args, "buffered_output", False),
+        ),
         ext=".cpp",
         display_name="C++",
         lang_id="cpp",  # ensures consistent key in registry
         formatter=clang_format_cmd,
+        batch_formatter=True,
+        stdin_formatter=clang_format_filter,
         rewriters=(
             #  LoopElseRewriter() used for CPP and all but python for some reason
             #   CLikeRewriter(),  # general structural normalization
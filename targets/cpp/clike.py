@@ -140,11 +140,8 @@ class CLikeTranspiler(CommonCLikeTranspiler):
         "Set": "std::set",
         "Optional": "std::optional",
     }
-
-    def __init__(self):
-        super().__init__()
-        self._type_map = PYCPP_TYPE_MAP
-        self._container_type_map = self.CONTAINER_TYPE_MAP
+    _type_map = PYCPP_TYPE_MAP
+    _container_type_map = CONTAINER_TYPE_MAP
 
     @staticmethod
     def _check_keyword(name: str) -> tuple[str, bool]:
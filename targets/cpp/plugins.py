@@ -7,11 +7,14 @@ import random
 import sys
 from typing import Callable, Dict, List, Tuple, Union
 
+from py2many.ast_helpers import get_id
+
 
 class CppTranspilerPlugins(ast.NodeVisitor):
     _usings: set[str]
     _headers: set[str]
     _aliases: Dict[str, str]
+    _buffered_output: bool
 
     @staticmethod
     def _translate_file(file: str):
@@ -32,13 +35,13 @@ class CppTranspilerPlugins(ast.NodeVisitor):
 
     def visit_textio_write(self, node: ast.AST, vargs: List[str]):
         self._usings.add("<iostream>")
-        return f"{CppTranspilerPlugins._translate_file()} << {vargs[0]}"
+        file = CppTranspilerPlugins._translate_file(get_id(node.func.value))
+        return f"{file} << {vargs[0]}"
 
     def visit_textio_flush(self, node: ast.AST, vargs: List[str]):
         self._usings.add("<iostream>")
-        return (
-            f"{CppTranspilerPlugins._translate_file()}.flush()"
-        )
+        file = CppTranspilerPlugins._translate_file(get_id(node.func.value))
+        return f"{file}.flush()"
 
     def visit_range(self, node: ast.AST, vargs: List[str]) -> str:
         self._usings.add("<cppitertools/range.hpp>")
@@ -47,6 +50,8 @@ class CppTranspilerPlugins(ast.NodeVisitor):
 
     def visit_print(self, node: ast.AST, vargs: List[str]) -> str:
         self._usings.add("<iostream>")
+        if self._buffered_output:
+            return CppTranspilerPlugins._visit_buffered_print(self, node)
         buf = []
         for n in node.args:
             value = self.visit(n)
@@ -62,6 +67,27 @@ class CppTranspilerPlugins(ast.NodeVisitor):
         buf.pop()
         return "\n".join(buf) + "\nstd::cout << std::endl;"
 
+    def _visit_buffered_print(self, node: ast.Call) -> str:
+        """One stream expression ending in '\\n', flushing only when asked to."""
+        values = []
+        for n in node.args:
+            if isinstance(n, ast.List) or isinstance(n, ast.Tuple):
+                values.append(" << ".join([self.visit(el) for el in n.elts]))
+            else:
+                values.append(self.visit(n))
+        stream = "std::cout"
+        if values:
+            stream += " << " + ' << " " << '.join(values)
+        stream += " << '\\n'"
+
+        flush = next((kw.value for kw in node.keywords if kw.arg == "flush"), None)
+        if isinstance(flush, ast.Constant):
+            if flush.value:
+                stream += " << std::flush"
+        elif flush is not None:
+            return f"{stream};\nif ({self.visit(flush)}) std::cout.flush();"
+        return f"{stream};"
+
     def visit_min_max(self, node, vargs, is_max: bool) -> str:
         min_max = "max" if is_max else "min"
         self._usings.add("<algorithm>")
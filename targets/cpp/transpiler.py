@@ -108,13 +108,21 @@ class CppListComparisonRewriter(ast.NodeTransformer):
 class CppTranspiler(CLikeTranspiler):
     NAME = "cpp"
 
-    def __init__(self, extension: bool = False, no_prologue: bool = False):
+    def __init__(
+        self,
+        extension: bool = False,
+        no_prologue: bool = False,
+        buffered_output: bool = False,
+    ):
         super().__init__()
         self._headers = []
         self._usings = {"<cstdint>"}
         self.use_catch_test_cases = False
         self._extension = extension
         self._no_prologue = no_prologue
+        # print() writes '\n' instead of std::endl, so stdout is only
+        # flushed when the buffer fills, at exit or when asked to
+        self._buffered_output = buffered_output
         self._dispatch_map = DISPATCH_MAP
         self._small_dispatch_map = SMALL_DISPATCH_MAP
         self._small_usings_map = SMALL_USINGS_MAP
@@ -124,8 +132,10 @@ class CppTranspiler(CLikeTranspiler):
 
     def _reset(self):
         use_catch_test_cases = self.use_catch_test_cases
+        buffered_output = self._buffered_output
         super()._reset()
         self.use_catch_test_cases = use_catch_test_cases
+        self._buffered_output = buffered_output
 
     def _get_nolint_suffix(self, nolint="build/include_order"):
         return f"  // NOLINT({nolint})" if not self._no_prologue else ""
@@ -160,6 +170,9 @@ class CppTranspiler(CLikeTranspiler):
             return generate_catch_test_case(node, body)
 
         is_python_main = getattr(node, "python_main", False)
+        if is_python_main and self._buffered_output:
+            self._usings.add("<iostream>")
+            body = "std::ios::sync_with_stdio(false);\n" + body
         typenames, args = self.visit(node.args)
 
         args_list = []
@@ -661,11 +674,22 @@ class CppTranspiler(CLikeTranspiler):
             self._usings.add("<string>")
             return f"{typename} {target} = {value};{lint_exception}"
 
-        return f"{typename} {target} = {value};"
+        return f"{typename} {target} = {value};{self._reserve(node.value, target)}"
 
     def visit_AnnAssign(self, node) -> str:
         target, type_str, val = super().visit_AnnAssign(node)
-        return f"{type_str} {target} = {val};"
+        return f"{type_str} {target} = {val};{self._reserve(node.value, target)}"
+
+    def _reserve(self, value: ast.AST, target: str) -> str:
+        """Reserve the elements a list is filled with right after declaring it."""
+        if not isinstance(value, ast.List):
+            return ""
+        capacity = self._list_capacity(value)
+        if capacity is None:
+            return ""
+        if capacity.isdigit():
+            return f"\n{target}.reserve({capacity});"
+        return f"\nif ({capacity} > 0) {{\n{target}.reserve({capacity});\n}}"
 
     def visit_Print(self, node) -> str:
         buf = []
@@ -24,6 +24,8 @@ def settings():
         ext=".dart",
         display_name="Dart",
         formatter=("dart", "format",),
+        batch_formatter=True,
+        stdin_formatter=("dart", "format",),
         post_rewriters=(DartIntegerDivRewriter(),),
     )
 
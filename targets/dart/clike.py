@@ -76,10 +76,8 @@ dart_keywords = frozenset(
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
-    def __init__(self):
-        super().__init__()
-        self._type_map = dart_type_map
-        self._container_type_map = DART_CONTAINER_TYPE_MAP
+    _type_map = dart_type_map
+    _container_type_map = DART_CONTAINER_TYPE_MAP
 
     def visit_Name(self, node) -> str:
         if node.id in dart_keywords:
@@ -5,6 +5,7 @@ from py2many.analysis import is_mutable, is_void_function
 from py2many.ast_helpers import get_id
 from py2many.clike import class_for_typename
 from py2many.declaration_extractor import DeclarationExtractor
+from py2many.dirty import mark_dirty
 from py2many.inference import get_inferred_type
 from py2many.tracer import defined_before, is_class_or_module, is_list, is_self_arg
 
@@ -31,6 +32,7 @@ class DartIntegerDivRewriter(ast.NodeTransformer):
                 # But python seems to use the same AST node for other
                 # division operations?
                 node.use_integer_div = True
+                mark_dirty(node)
         return node
 
 
@@ -76,10 +76,8 @@ dlang_keywords = frozenset(
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
-    def __init__(self):
-        super().__init__()
-        CommonCLikeTranspiler._type_map = dlang_type_map
-        CommonCLikeTranspiler._container_type_map = DLANG_CONTAINER_TYPE_MAP
+    _type_map = dlang_type_map
+    _container_type_map = DLANG_CONTAINER_TYPE_MAP
 
     def visit_Name(self, node) -> str:
         if node.id in dlang_keywords:
@@ -4,10 +4,10 @@ from typing import Any, Callable, Dict, List, Set, Tuple, Union
 
 
 class DTranspilerPlugins:
-    usings: Set[str]
+    _usings: Set[str]
 
     def visit_range(self, node, vargs: List[str]) -> str:
-        self.usings.add("std.range : iota")
+        self._usings.add("std.range : iota")
 
         start = "0"
         step = "1"
@@ -31,7 +31,7 @@ class DTranspilerPlugins:
     def visit_print(self, node, vargs: List[str]) -> str:
         placeholders = ["%s" for _ in node.args]
 
-        self.usings.add("std")
+        self._usings.add("std")
 
         placeholders_str = " ".join(placeholders)
         vargs_str = ", ".join(vargs)
@@ -49,7 +49,7 @@ class DTranspilerPlugins:
         return f"{min_max}({vargs_str})"
 
     def visit_exit(self, node, vargs) -> str:
-        self.usings.add("core.stdc.stdlib:exit")
+        self._usings.add("core.stdc.stdlib:exit")
         return f"exit({vargs[0]})"
 
 
@@ -6,6 +6,7 @@ from py2many.analysis import is_global, is_mutable, is_void_function
 from py2many.ast_helpers import get_id
 from py2many.clike import class_for_typename
 from py2many.declaration_extractor import DeclarationExtractor
+from py2many.dirty import mark_dirty
 from py2many.inference import get_inferred_type
 from py2many.tracer import defined_before, is_class_or_module, is_list, is_self_arg
 
@@ -32,6 +33,7 @@ class DIntegerDivRewriter(ast.NodeTransformer):
                 # But python seems to use the same AST node for other
                 # division operations?
                 node.use_integer_div = True
+                mark_dirty(node)
         return node
 
 
@@ -521,7 +523,18 @@ class DTranspiler(CLikeTranspiler):
         target, type_str, val = super().visit_AnnAssign(node)
         if self.is_const_var(node.target):
             type_str = "const " + type_str
-        return f"{type_str} {target} = {val};"
+        return f"{type_str} {target} = {val};{self._reserve(node.value, target)}"
+
+    def _reserve(self, value: ast.AST, target: str) -> str:
+        """Reserve the elements a list is filled with right after declaring it."""
+        if not isinstance(value, ast.List):
+            return ""
+        capacity = self._list_capacity(value)
+        if capacity is None:
+            return ""
+        if capacity.isdigit():
+            return f"\n{target}.reserve({capacity});"
+        return f"\nif ({capacity} > 0) {{\n{target}.reserve({capacity});\n}}"
 
     def _visit_AssignOne(self, node, target) -> str:
         kw = "auto"
@@ -573,7 +586,8 @@ class DTranspiler(CLikeTranspiler):
 
             if typename != self._default_type:
                 if kw == self._default_type:
-                    return f"{typename} {target} = {value};"
+                    reserve = self._reserve(node.value, target)
+                    return f"{typename} {target} = {value};{reserve}"
             else:
                 return f"{kw} {target} = {value};"
 
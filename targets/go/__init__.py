@@ -37,6 +37,8 @@ def settings(args, env=os.environ):
         ext=".go",
         display_name="Go",
         formatter=("gofmt", "-w",),
+        batch_formatter=True,
+        stdin_formatter=("gofmt",),
         rewriters=(
             GoNoneCompareRewriter(),
             GoVisibilityRewriter(),
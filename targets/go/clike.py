@@ -62,10 +62,8 @@ def go_symbol(node: ast.AST) -> str:
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
-    def __init__(self):
-        super().__init__()
-        CommonCLikeTranspiler._type_map = GO_TYPE_MAP
-        CLikeTranspiler._container_type_map = GO_CONTAINER_TYPE_MAP
+    _type_map = GO_TYPE_MAP
+    _container_type_map = GO_CONTAINER_TYPE_MAP
 
     def visit(self, node: ast.AST) -> str:
         if type(node) in go_symbols:
@@ -1,6 +1,6 @@
 import ast
 import textwrap
-from typing import List
+from typing import List, Optional, Set, Tuple
 
 from py2many.analysis import (
     IGNORED_MODULE_SET, is_global, is_void_function,
@@ -8,6 +8,7 @@ from py2many.analysis import (
 from py2many.ast_helpers import get_id
 from py2many.clike import _AUTO_INVOKED, class_for_typename
 from py2many.declaration_extractor import DeclarationExtractor
+from py2many.dirty import mark_dirty
 from py2many.exceptions import (
     AstClassUsedBeforeDeclaration, AstCouldNotInfer
 )
@@ -29,6 +30,26 @@ from .plugins import (
 )
 
 
+def _int_constant(node) -> Optional[int]:
+    """The value of an integer literal, negative ones included."""
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        value = _int_constant(node.operand)
+        return None if value is None else -value
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        return node.value
+    return None
+
+
+def _stored_names(loop: ast.For) -> Set[str]:
+    """Names assigned in the body of a loop."""
+    return {
+        n.id
+        for stmt in loop.body
+        for n in ast.walk(stmt)
+        if isinstance(n, ast.Name) and isinstance(n.ctx, (ast.Store, ast.Del))
+    }
+
+
 class GoMethodCallRewriter(ast.NodeTransformer):
     def visit_Call(self, node):
         needs_assign = False
@@ -78,6 +99,7 @@ class GoPropagateTypeAnnotation(ast.NodeTransformer):
             node.value, (ast.List, ast.Set, ast.Dict)
         ):
             node.value.annotation = node.annotation
+            mark_dirty(node.value)
         return node
 
     def visit_Assign(self, node):
@@ -148,6 +170,11 @@ class GoTranspiler(CLikeTranspiler):
         self._small_usings_map = SMALL_USINGS_MAP
         self._func_dispatch_table = FUNC_DISPATCH_TABLE
         self._attr_dispatch_table = ATTR_DISPATCH_TABLE
+        self._temp = 0
+
+    def _get_temp(self):
+        self._temp += 1
+        return f"__tmp{self._temp}"
 
     def headers(self, meta):
         return "\n".join(self._headers)
@@ -155,8 +182,10 @@ class GoTranspiler(CLikeTranspiler):
     def usings(self):
         buf = "package main\n\n"  # TODO naming
         if self._usings:
+            # By import path, like gofmt
+            usings = sorted(self._usings, key=lambda using: using.split()[-1])
             buf += "import (\n"
-            buf += "\n".join([f"{using}" for using in self._usings])
+            buf += "\n".join(usings)
             buf += ")\n"
         return buf + "\n\n"
 
@@ -307,7 +336,84 @@ class GoTranspiler(CLikeTranspiler):
             args = ""
         return f"{fname}({args})"
 
+    def _visit_range_bound(self, node, loop, inits: List[Tuple[str, str]]) -> str:
+        """A range() argument, evaluated once like in Python: anything
+        but a constant or a name the loop doesn't assign is hoisted into
+        the init statement of the loop. So is the loop target itself,
+        which the bound must read before the loop shadows it."""
+        value = self.visit(node)
+        if _int_constant(node) is not None or (
+            isinstance(node, ast.Name)
+            and get_id(node) != get_id(loop.target)
+            and get_id(node) not in _stored_names(loop)
+        ):
+            return value
+        temp = self._get_temp()
+        inits.append((temp, value))
+        return temp
+
+    def _visit_range_loop(self, node) -> Optional[str]:
+        """
+        Lower ``for i in range(...)`` to a counted Go loop, instead of
+        ranging over a go-iter sequence. None if the loop doesn't fit:
+        range() used any other way still goes through go-iter.
+        """
+        it = node.iter
+        if not (
+            isinstance(it, ast.Call)
+            and get_id(it.func) == "range"
+            and 1 <= len(it.args) <= 3
+            and not it.keywords
+            and not any(isinstance(arg, ast.Starred) for arg in it.args)
+            and isinstance(node.target, ast.Name)
+            # Python assigns the next value whatever the body did to it
+            and get_id(node.target) not in _stored_names(node)
+        ):
+            return None
+
+        start_node, stop_node, step_node = (
+            [None, *it.args, None] if len(it.args) == 1
+            else [*it.args, None] if len(it.args) == 2
+            else it.args
+        )
+        step = 1 if step_node is None else _int_constant(step_node)
+        if step == 0:
+            # A ValueError in Python, left to go-iter
+            return None
+
+        target = self.visit(node.target)
+        if target == "_":
+            target = self._get_temp()
+        inits = [(target, "0" if start_node is None else self.visit(start_node))]
+        stop = self._visit_range_bound(stop_node, node, inits)
+
+        if step is not None:
+            op = "<" if step > 0 else ">"
+            cond = f"{target} {op} {stop}"
+            if abs(step) == 1:
+                post = f"{target}++" if step > 0 else f"{target}--"
+            else:
+                post = f"{target} += {step}" if step > 0 else f"{target} -= {-step}"
+        else:
+            step_var = self._visit_range_bound(step_node, node, inits)
+            cond = (
+                f"({step_var} > 0 && {target} < {stop}) || "
+                f"({step_var} < 0 && {target} > {stop})"
+            )
+            post = f"{target} += {step_var}"
+
+        names = ", ".join(name for name, _ in inits)
+        values = ", ".join(value for _, value in inits)
+        buf = [f"for {names} := {values}; {cond}; {post} {{"]
+        buf.extend([self.visit(c) for c in node.body])
+        buf.append("}")
+        return "\n".join(buf)
+
     def visit_For(self, node) -> str:
+        counted = self._visit_range_loop(node)
+        if counted is not None:
+            return counted
+
         target = self.visit(node.target)
         it = self.visit(node.iter)
         buf = []
@@ -508,6 +614,11 @@ class GoTranspiler(CLikeTranspiler):
         element_type = self._default_type
         if hasattr(node, "container_type"):
             _, element_type = node.container_type
+        capacity = self._list_capacity(node)
+        if capacity is not None:
+            if not capacity.isdigit():
+                capacity = f"max({capacity}, 0)"
+            return f"make([]{element_type}, 0, {capacity})"
         elements = [self.visit(e) for e in node.elts]
         elements_str = ", ".join(elements)
         return f"[]{element_type}{{{elements_str}}}"
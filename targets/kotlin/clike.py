@@ -85,10 +85,11 @@ kotlin_keywords = frozenset(
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
+    _type_map = KT_TYPE_MAP
+    _container_type_map = KT_CONTAINER_TYPE_MAP
+
     def __init__(self):
         super().__init__()
-        self._type_map = KT_TYPE_MAP
-        self._container_type_map = KT_CONTAINER_TYPE_MAP
         self._statement_separator = ""
         self._temp = 0
 
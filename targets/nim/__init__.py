@@ -35,6 +35,7 @@ def settings(args, env=os.environ):
         ext=".nim",
         display_name="Nim",
         formatter=("nimpretty", *nimpretty_args,),
+        batch_formatter=True,
         indent = "  ",
         rewriters=(NimNoneCompareRewriter(),),
         transformers=(infer_nim_types,),
@@ -112,10 +112,11 @@ def nim_symbol(node):
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
+    _type_map = NIM_TYPE_MAP
+    _container_type_map = NIM_CONTAINER_TYPE_MAP
+
     def __init__(self):
         super().__init__()
-        self._type_map = NIM_TYPE_MAP
-        self._container_type_map = NIM_CONTAINER_TYPE_MAP
         self._statement_separator = ""
 
     def visit(self, node) -> str:
@@ -6,8 +6,7 @@ from typing import Callable, Dict, List, Tuple, Union
 
 
 class NimTranspilerPlugins:
-    @staticmethod
-    def visit_range(node, vargs: List[str]) -> str:
+    def visit_range(self, node, vargs: List[str]) -> str:
         if len(node.args) == 1:
             return f"(0..{vargs[0]} - 1)"
         elif len(node.args) == 2:
@@ -26,8 +25,7 @@ class NimTranspilerPlugins:
                 return "0.0"
         return f"{cast_to}({vargs[0]})"
 
-    @staticmethod
-    def visit_print(_node, vargs: List[str]) -> str:
+    def visit_print(self, _node, vargs: List[str]) -> str:
         args_str = ', " ", '.join(vargs)
         return f"echo {args_str}"
 
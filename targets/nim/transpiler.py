@@ -419,6 +419,14 @@ class NimTranspiler(CLikeTranspiler):
     def visit_AnnAssign(self, node) -> str:
         target, type_str, val = super().visit_AnnAssign(node)
         kw = "var" if is_mutable(node.scopes, target) else "let"
+        if isinstance(node.value, ast.List) and hasattr(node, "container_type"):
+            # The element type comes from the annotation: `[]` has none
+            capacity = self._list_capacity(node.value)
+            if capacity is not None:
+                _, element_type = node.container_type
+                if not capacity.isdigit():
+                    capacity = f"max({capacity}, 0)"
+                val = f"newSeqOfCap[{element_type}]({capacity})"
         if type_str == self._default_type:
             return f"{kw} {target} = {val}"
         return f"{kw} {target}: {type_str} = {val}"
@@ -3,6 +3,7 @@ from functools import partial
 from py2many.language import LanguageSettings
 from .inference import infer_rust_types
 from .transpiler import (
+    RustBufferedPrintRewriter,
     RustLoopIndexRewriter,
     RustNoneCompareRewriter,
     RustStringJoinRewriter,
@@ -11,6 +12,9 @@ from .transpiler import (
 
 
 def settings(args, env=os.environ) -> LanguageSettings:
+    post_rewriters = (RustLoopIndexRewriter(), RustStringJoinRewriter())
+    if getattr(args, "buffered_output", False):
+        post_rewriters += (RustBufferedPrintRewriter(),)
     return LanguageSettings(
         transpiler=RustTranspiler(args.extension, args.no_prologue),
         ext=".rs",
@@ -19,12 +23,14 @@ def settings(args, env=os.environ) -> LanguageSettings:
             "rustfmt",
             "--edition=2021",
         ),
+        batch_formatter=True,
+        stdin_formatter=(
+            "rustfmt",
+            "--edition=2021",
+        ),
         rewriters=(RustNoneCompareRewriter(),),
         transformers=(partial(infer_rust_types, extension=args.extension), ),
-        post_rewriters=(
-            RustLoopIndexRewriter(),
-            RustStringJoinRewriter(),
-        ),
+        post_rewriters=post_rewriters,
         linter=(
             "../../scripts/rust-runner.sh",
             "lint",
@@ -36,15 +36,16 @@ RUST_KEYWORDS = frozenset(
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
+    _type_map = RUST_TYPE_MAP
+    _container_type_map = RUST_CONTAINER_TYPE_MAP
+
     def __init__(self):
         super().__init__()
-        self._type_map = RUST_TYPE_MAP
-        self._container_type_map = RUST_CONTAINER_TYPE_MAP
         self._keywords = RUST_KEYWORDS
 
     @classmethod
     def _map_type(cls, typename, lifetime=LifeTime.UNKNOWN) -> str:
-        ret = CommonCLikeTranspiler._map_type(typename, lifetime)
+        ret = super()._map_type(typename, lifetime)
         if lifetime == LifeTime.STATIC and ret[0] == "&":
             return f"&'static {ret[1:]}"
         return ret
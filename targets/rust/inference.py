@@ -84,6 +84,9 @@ RUST_WIDTH_RANK = {
 
 RUST_RANK_TO_TYPE = {v: k for k, v in RUST_WIDTH_RANK.items()}
 
+# Element types iterators can copy out of references
+RUST_COPY_TYPES = {*RUST_WIDTH_RANK, "char", "isize", "usize"}
+
 
 class RustInference(LanguageInferenceBase):
     TYPE_MAP = RUST_TYPE_MAP
@@ -114,8 +114,7 @@ class RustTranspilerPlugins:
         # Do whatever transformation the decorator does to cls here
         return cls
 
-    @staticmethod
-    def visit_range(node, vargs: List[str]) -> str:
+    def visit_range(self, node, vargs: List[str]) -> str:
         if len(node.args) == 1:
             return f"(0..{vargs[0]})"
         elif len(node.args) == 2:
@@ -127,13 +126,28 @@ class RustTranspilerPlugins:
             f"encountered range() call with unknown parameters: range({vargs})"
         )
 
-    @staticmethod
-    def visit_print(node, vargs: List[str]) -> str:
+    def visit_print(self, node, vargs: List[str]) -> str:
         placeholders = []
         for _ in node.args:
             placeholders.append("{}")
+        if getattr(node, "rust_buffered_print", False):
+            return RustTranspilerPlugins._visit_buffered_print(node, vargs, placeholders)
         return 'println!("{}",{});'.format(" ".join(placeholders), ", ".join(vargs))
 
+    @staticmethod
+    def _visit_buffered_print(node, vargs: List[str], placeholders: List[str]) -> str:
+        args = "".join(f", {arg}" for arg in vargs[: len(node.args)])
+        buf = [f'writeln!(__out, "{" ".join(placeholders)}"{args}).unwrap();']
+        for kw, value in zip(node.keywords, vargs[len(node.args) :]):
+            if kw.arg != "flush":
+                continue
+            if isinstance(kw.value, ast.Constant):
+                if kw.value.value:
+                    buf.append("__out.flush().unwrap();")
+            else:
+                buf.append(f"if {value} {{ __out.flush().unwrap(); }}")
+        return "\n".join(buf)
+
     def visit_exit(self, node, vargs) -> str:
         self._allows.add("unreachable_code")
         return f"std::process::exit({vargs[0]})"
@@ -141,6 +155,20 @@ class RustTranspilerPlugins:
     def visit_min_max(self, node, vargs, is_max: bool) -> str:
         self._usings.add("std::cmp")
         min_max = "max" if is_max else "min"
+        if _is_lazy(node.args[0]):
+            node.result_type = True
+            comp = node.args[0]
+            if hasattr(comp.elt, "annotation"):
+                element_type = self._typename_from_annotation(comp.elt)
+            elif get_id(comp.elt) == get_id(comp.generators[0].target):
+                _, element_type = getattr(comp.generators[0].iter, "container_type", (None, None))
+            else:
+                element_type = None
+            if element_type == "f64":
+                # f64 isn't Ord, compare through FloatOrd and unwrap the result
+                self._usings.add("float-ord::FloatOrd")
+                return f"{vargs[0]}.map(FloatOrd).{min_max}().map(|x| x.0)"
+            return f"{vargs[0]}.{min_max}()"
         self._typename_from_annotation(node.args[0])
         if hasattr(node.args[0], "container_type"):
             node.result_type = True
@@ -170,6 +198,20 @@ class RustTranspilerPlugins:
         return f"block_on({vargs[0]})"
 
 
+def _is_lazy(node: ast.AST) -> bool:
+    """Check if a call argument was lowered to an iterator, see RustTranspiler._consume_lazily"""
+    return getattr(node, "rust_lazy", False)
+
+
+def _iter(node: ast.AST, varg: str) -> str:
+    return varg if _is_lazy(node.args[0]) else f"{varg}.iter()"
+
+
+# Builtins whose argument can be any iterator
+ITERATOR_CONSUMERS = {"all", "any", "len", "max", "min", "sum"}
+# The ones that always go through all of it: any() and all() stop early
+EXHAUSTIVE_CONSUMERS = ITERATOR_CONSUMERS - {"all", "any"}
+
 FIXED_SIZE_INT_MAP = {
     fixed: functools.partial(RustTranspilerPlugins.visit_cast, cast_to=fixed)
     for fixed in ("i8", "i16", "i32", "i64", "u8", "u16", "u32", "u64")
@@ -178,9 +220,17 @@ FIXED_SIZE_INT_MAP = {
 # small one liners are inlined here as lambdas
 SMALL_DISPATCH_MAP = {
     "str": lambda n, vargs: f"&{vargs[0]}.to_string()" if vargs else '""',
-    "len": lambda n, vargs: f"{vargs[0]}.len() as i32",
+    "len": lambda n, vargs: (
+        f"{vargs[0]}.count() as i32" if _is_lazy(n.args[0]) else f"{vargs[0]}.len() as i32"
+    ),
     "enumerate": lambda n, vargs: f"{vargs[0]}.iter().enumerate()",
-    "sum": lambda n, vargs: f"{vargs[0]}.iter().sum()",
+    "sum": lambda n, vargs: f"{_iter(n, vargs[0])}.sum()",
+    "any": lambda n, vargs: (
+        f"{vargs[0]}.any(|x| x)" if _is_lazy(n.args[0]) else f"{vargs[0]}.iter().any(|&x| x)"
+    ),
+    "all": lambda n, vargs: (
+        f"{vargs[0]}.all(|x| x)" if _is_lazy(n.args[0]) else f"{vargs[0]}.iter().all(|&x| x)"
+    ),
     "int": functools.partial(RustTranspilerPlugins.visit_cast, cast_to="i32"),
     "bool": lambda n, vargs: f"({vargs[0]} != 0)" if vargs else "false",
     "float": functools.partial(RustTranspilerPlugins.visit_cast, cast_to="f64"),
@@ -1,7 +1,9 @@
 import ast
+import builtins
+import sys
 import textwrap
 from pathlib import Path
-from typing import List, Tuple, Union
+from typing import Dict, Iterator, List, Set, Tuple
 
 from py2many.analysis import (
     FunctionTransformer,
@@ -18,13 +20,15 @@ from py2many.rewriters import camel_case
 from py2many.tracer import defined_before, is_class_or_module, is_list
 
 from .clike import CLikeTranspiler
-from .inference import get_inferred_rust_type, map_type
+from .inference import RUST_COPY_TYPES, get_inferred_rust_type, map_type
 from .plugins import (
     ATTR_DISPATCH_TABLE,
     CLASS_DISPATCH_TABLE,
     DISPATCH_MAP,
+    EXHAUSTIVE_CONSUMERS,
     FUNC_DISPATCH_TABLE,
     FUNC_USINGS_MAP,
+    ITERATOR_CONSUMERS,
     MODULE_DISPATCH_TABLE,
     SMALL_DISPATCH_MAP,
     SMALL_USINGS_MAP,
@@ -40,6 +44,141 @@ class RustLoopIndexRewriter(ast.NodeTransformer):
         return node
 
 
+def _own_nodes(node: ast.AST) -> Iterator[ast.AST]:
+    """Nodes under `node`, without those of nested functions, classes and lambdas."""
+    for child in ast.iter_child_nodes(node):
+        yield child
+        if not isinstance(
+            child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+        ):
+            yield from _own_nodes(child)
+
+
+def _is_call_to(node: ast.AST, name: str) -> bool:
+    return isinstance(node, ast.Call) and get_id(node.func) == name
+
+
+class RustBufferedPrintRewriter(ast.NodeTransformer):
+    """
+    Marks the functions printing in a loop, which write to a BufWriter of
+    locked stdout instead of using println!, which locks and flushes stdout
+    on every line.
+
+    A buffered function could reorder its output with that of the functions
+    it calls, so it may only call builtins, the standard library and
+    functions of the module that don't print. It flushes before returning
+    and before sys.exit(), which doesn't unwind.
+    """
+
+    def visit_Module(self, node: ast.Module) -> ast.Module:
+        functions = [
+            n
+            for n in ast.walk(node)
+            if isinstance(n, (ast.FunctionDef, ast.AsyncFunctionDef))
+        ]
+        self._defined: Set[str] = {
+            get_id(n) for n in ast.walk(node) if isinstance(n, ast.ClassDef)
+        } | {f.name for f in functions}
+        self._imported: Dict[str, str] = {}
+        for n in ast.walk(node):
+            if isinstance(n, ast.Import):
+                for alias in n.names:
+                    self._imported[alias.asname or alias.name] = alias.name
+            elif isinstance(n, ast.ImportFrom):
+                module = n.module if not n.level and n.module else ""
+                for alias in n.names:
+                    self._imported[alias.asname or alias.name] = module
+
+        # Functions writing to stdout, directly or through the functions they call
+        self._printing: Set[str] = set()
+        printing = {
+            f.name for f in functions if any(map(self._writes_stdout, _own_nodes(f)))
+        }
+        while not printing <= self._printing:
+            self._printing |= printing
+            printing = {
+                f.name
+                for f in functions
+                if any(self._callee(n) in self._printing for n in _own_nodes(f))
+            }
+
+        for f in functions:
+            self._mark(f)
+        return node
+
+    @staticmethod
+    def _callee(node: ast.AST) -> str | None:
+        if not isinstance(node, ast.Call):
+            return None
+        if isinstance(node.func, ast.Name):
+            return node.func.id
+        if isinstance(node.func, ast.Attribute):
+            return node.func.attr
+        return None
+
+    @staticmethod
+    def _writes_stdout(node: ast.AST) -> bool:
+        return _is_call_to(node, "print") or (
+            isinstance(node, ast.Attribute) and get_id(node) == "sys.stdout"
+        )
+
+    def _from_stdlib(self, name: str) -> bool:
+        return self._imported[name].split(".")[0] in sys.stdlib_module_names
+
+    def _is_safe_call(self, node: ast.Call) -> bool:
+        if _is_call_to(node, "print") or _is_call_to(node, "sys.exit"):
+            return True
+        if self._callee(node) in self._printing:
+            return False
+        func = node.func
+        if isinstance(func, ast.Name):
+            if func.id in self._defined:
+                return True
+            if func.id in self._imported:
+                return self._from_stdlib(func.id)
+            return hasattr(builtins, func.id)
+        if isinstance(func, ast.Attribute):
+            base = func.value
+            while isinstance(base, ast.Attribute):
+                base = base.value
+            if isinstance(base, ast.Name) and base.id in self._imported:
+                return self._from_stdlib(base.id)
+            # A method
+            return True
+        return False
+
+    def _mark(self, node: ast.FunctionDef) -> None:
+        nodes = list(_own_nodes(node))
+        loops = [n for n in nodes if isinstance(n, (ast.For, ast.While))]
+        if not any(_is_call_to(n, "print") for loop in loops for n in _own_nodes(loop)):
+            return
+
+        exits = {id(n.value) for n in nodes if isinstance(n, ast.Expr)}
+        for n in nodes:
+            if isinstance(n, (ast.Yield, ast.YieldFrom)):
+                return
+            if isinstance(n, ast.Attribute) and get_id(n) == "sys.stdout":
+                return
+            if not isinstance(n, ast.Call):
+                continue
+            if not self._is_safe_call(n):
+                return
+            if _is_call_to(n, "print") and any(kw.arg != "flush" for kw in n.keywords):
+                return
+            # Flushing before an exit nested in an expression needs a block
+            if _is_call_to(n, "sys.exit") and id(n) not in exits:
+                return
+
+        node.rust_buffered_output = True
+        for n in nodes:
+            if _is_call_to(n, "print"):
+                n.rust_buffered_print = True
+            elif isinstance(n, ast.Return) or (
+                isinstance(n, ast.Expr) and _is_call_to(n.value, "sys.exit")
+            ):
+                n.rust_flush_stdout = True
+
+
 class RustNoneCompareRewriter(ast.NodeTransformer):
     def visit_Compare(self, node):
         right = self.visit(node.comparators[0])
@@ -189,10 +328,18 @@ class RustTranspiler(CLikeTranspiler):
     def visit_Expr(self, node) -> str:
         if hasattr(node, "unused"):
             self._allows.add("clippy::no_effect")
+        if getattr(node, "rust_flush_stdout", False):
+            return f"__out.flush().unwrap();\n{super().visit_Expr(node)}"
         return super().visit_Expr(node)
 
     def visit_FunctionDef(self, node, async_prefix="") -> str:
         body = "\n".join([self.visit(n) for n in node.body])
+        if getattr(node, "rust_buffered_output", False):
+            # See RustBufferedPrintRewriter
+            self._usings.add("std::io::Write")
+            body = f"let mut __out = std::io::BufWriter::new(std::io::stdout().lock());\n{body}"
+            if not getattr(node.body[-1], "rust_flush_stdout", False):
+                body += "\n__out.flush().unwrap();"
         typenames, args = self.visit(node.args)
 
         args_list = []
@@ -241,7 +388,7 @@ class RustTranspiler(CLikeTranspiler):
         if len(typedecls) > 0:
             template = "<{}>".format(", ".join(typedecls))
 
-        extension = "#[pyfunction]\n" if self.extension else ""
+        extension = "#[pyfunction]\n" if self._extension else ""
         args_list = ", ".join(args_list)
         funcdef = f"{extension}pub {async_prefix}fn {node.name}{template}({args_list}) {return_type}"
         return_success = (
@@ -270,6 +417,12 @@ class RustTranspiler(CLikeTranspiler):
         return typename, id
 
     def visit_Return(self, node) -> str:
+        ret = self._visit_return(node)
+        if getattr(node, "rust_flush_stdout", False):
+            return f"__out.flush().unwrap();\n{ret}"
+        return ret
+
+    def _visit_return(self, node) -> str:
         fndef = None
         for scope in node.scopes:
             if isinstance(scope, ast.FunctionDef):
@@ -332,9 +485,8 @@ class RustTranspiler(CLikeTranspiler):
             return ret(self, node, value_id, attr)
         return ret
 
-    def _func_for_lookup(self, fname) -> Union[str, object]:
-        fname_for_lookup = fname.replace("::", ".")
-        return super()._func_for_lookup(fname_for_lookup)
+    def _func_lookup_name(self, fname: str) -> str:
+        return fname.replace("::", ".")
 
     def _func_name_split(self, fname: str) -> Tuple[str, str]:
         # string based fallback
@@ -370,6 +522,9 @@ class RustTranspiler(CLikeTranspiler):
         if isinstance(fndef, ast.ClassDef):
             return self._visit_struct_literal(node, fname, fndef)
 
+        if fname in ITERATOR_CONSUMERS and fndef is None and len(node.args) == 1:
+            self._consume_lazily(node.args[0], fname in EXHAUSTIVE_CONSUMERS)
+
         vargs = []  # visited args
         if node.args:
             vargs += [self.visit(a) for a in node.args]
@@ -400,8 +555,21 @@ class RustTranspiler(CLikeTranspiler):
         unwrap = "?" if node_result_type or node_func_result_type else ""
         return f"{fname}({args}){unwrap}"
 
+    @staticmethod
+    def _consume_lazily(node: ast.AST, exhaustive: bool = False) -> None:
+        """
+        A generator expression only iterated once needn't be collected
+        into a Vec. A list comprehension is built before it is used, so it
+        can only stay lazy when its consumer goes through all of it at once.
+        """
+        if isinstance(node, ast.GeneratorExp) or (
+            exhaustive and isinstance(node, ast.ListComp)
+        ):
+            node.rust_lazy = True
+
     def visit_For(self, node) -> str:
         target = self.visit(node.target)
+        self._consume_lazily(node.iter)
         it = self.visit(node.iter)
         buf = []
         buf.append(f"for {target} in {it} {{")
@@ -594,11 +762,11 @@ class RustTranspiler(CLikeTranspiler):
             if isinstance(b, ast.FunctionDef):
                 b.self_type = node.name
 
-        extension = "#[pyclass]\n" if self.extension else ""
+        extension = "#[pyclass]\n" if self._extension else ""
         struct_def = "pub struct {0} {{\n{1}\n}}\n\n".format(
             node.name, "\n".join(fields)
         )
-        impl_extension = "#[pymethods]\n" if self.extension else ""
+        impl_extension = "#[pymethods]\n" if self._extension else ""
         impl_def = f"{impl_extension}impl {node.name} {{\n"
         buf = [self.visit(b) for b in node.body]
         buf_str = "\n".join(buf)
@@ -674,8 +842,12 @@ class RustTranspiler(CLikeTranspiler):
             elements = [self.visit(e) for e in node.elts]
             return "vec![{}]".format(", ".join(elements))
 
-        else:
-            return "vec![]"
+        capacity = self._list_capacity(node)
+        if capacity is not None:
+            if not capacity.isdigit():
+                capacity = f"({capacity}).max(0) as usize"
+            return f"Vec::with_capacity({capacity})"
+        return "vec![]"
 
     def visit_Dict(self, node) -> str:
         self._usings.add("std::collections::HashMap")
@@ -921,24 +1093,33 @@ class RustTranspiler(CLikeTranspiler):
         generator = node.generators[0]
         target = self.visit(generator.target)
         this_iter = self.visit(generator.iter)
+        ifs = [self.visit(cond) for cond in generator.ifs]
 
-        is_range = (
-            ("range" in get_id(generator.iter.func))
-            if isinstance(generator.this_iter, ast.Call) and get_id(generator.iter.func)
-            else False
-        )
-        # HACK for dictionary iterators to work
-        if not (this_iter.endswith("keys()") or this_iter.endswith("values()")) and not is_range:
-            this_iter += ".iter()"
-
-        map_str = f".map(|{target}| {elt})"
-        filter_str = ""
-        if generator.ifs:
-            filter_str = ".cloned().filter(|&{}| {})".format(
-                target, self.visit(generator.ifs[0])
-            )
-
-        return f"{iter}{filter_str}{map_str}.collect::<Vec<_>>()"
+        map_target = target
+        if get_id(getattr(generator.iter, "func", None)) in ("range", "xrange"):
+            # Ranges yield values
+            filter_target = f"&{target}"
+        else:
+            # HACK for dictionary iterators to work
+            if not (this_iter.endswith("keys()") or this_iter.endswith("values()")):
+                this_iter += ".iter()"
+            self._typename_from_annotation(generator.iter)
+            _, element_type = getattr(generator.iter, "container_type", (None, None))
+            if element_type is not None and map_type(element_type) in RUST_COPY_TYPES:
+                # Copy the elements out of the references instead of cloning them
+                filter_target = f"&&{target}"
+                map_target = f"&{target}"
+            else:
+                filter_target = f"&{target}"
+                if ifs:
+                    this_iter += ".cloned()"
+
+        filter_str = "".join(f".filter(|{filter_target}| {cond})" for cond in ifs)
+        chain = f"{this_iter}{filter_str}.map(|{map_target}| {elt})"
+        if getattr(node, "rust_lazy", False):
+            # Consumed by a function or loop taking any iterator
+            return chain
+        return f"{chain}.collect::<Vec<_>>()"
 
     def visit_ListComp(self, node) -> str:
         return self.visit_GeneratorExp(node)  # right now they are the same
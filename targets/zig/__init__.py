@@ -12,6 +12,7 @@ def settings():
         ext=".zig",
         display_name="Zig",
         formatter=("zig", "fmt",),
+        batch_formatter=True,
         # None,
         rewriters=(ZigInferMoveSemantics(),),
         transformers=(infer_zig_types,),
@@ -99,10 +99,11 @@ def zig_symbol(node):
 
 
 class CLikeTranspiler(CommonCLikeTranspiler):
+    _type_map = ZIG_TYPE_MAP
+    _container_type_map = ZIG_CONTAINER_TYPE_MAP
+
     def __init__(self):
         super().__init__()
-        CommonCLikeTranspiler._type_map = ZIG_TYPE_MAP
-        CommonCLikeTranspiler._container_type_map = ZIG_CONTAINER_TYPE_MAP
         self._statement_separator = ";"
         # zig has a sys module
         self._ignored_module_set.remove("sys")
@@ -0,0 +1,35 @@
+from typing import List
+
+
+def ranges(n: int) -> List[int]:
+    out: List[int] = []
+    for i in range(1, n):
+        out.append(i)
+    return out
+
+
+def literals() -> List[int]:
+    fixed: List[int] = []
+    for j in [1, 2]:
+        fixed.append(j * 2)
+    return fixed
+
+
+def exits_early(n: int) -> List[int]:
+    out: List[int] = []
+    for i in range(n):
+        if i == 2:
+            break
+        out.append(i)
+    return out
+
+
+if __name__ == "__main__":
+    for i in ranges(4):
+        print(i)
+    for i in ranges(0):
+        print(i)
+    for j in literals():
+        print(j)
+    for k in exits_early(1000):
+        print(k)
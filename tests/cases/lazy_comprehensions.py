@@ -0,0 +1,20 @@
+from typing import List
+
+
+def stats(n: int, xs: List[int]) -> int:
+    evens: List[int] = [x for x in xs if x % 2 == 0]
+    print(len(evens))
+    if any(x > 3 for x in xs):
+        print(len([x for x in range(n) if x > 1]))
+    for y in (x + 1 for x in xs):
+        print(y)
+    if all([x > 0 for x in xs]):
+        print(n)
+    for z in [x * 2 for x in xs]:
+        print(z)
+    return sum(x * x for x in range(n))
+
+
+if __name__ == "__main__":
+    xs = [1, 2, 5]
+    print(stats(4, xs))
@@ -0,0 +1,32 @@
+def counted(n: int):
+    for i in range(n):
+        print(i)
+    for j in range(1, n):
+        print(j)
+    for k in range(n, 0, -2):
+        print(k)
+    for _ in range(2):
+        print("x")
+
+
+def bounds_evaluated_once(n: int, step: int):
+    for i in range(n):
+        n = 2
+        print(i)
+    for j in range(len([1, 2]) - 1):
+        print(j)
+    for k in range(0, n, step):
+        print(k)
+
+
+def bounds_reading_the_target(i: int, step: int):
+    for i in range(i):
+        print(i)
+    for step in range(10, 0, step):
+        print(step)
+
+
+if __name__ == "__main__":
+    counted(4)
+    bounds_evaluated_once(3, 1)
+    bounds_reading_the_target(2, -4)
@@ -0,0 +1,47 @@
+package main
+
+import (
+	"fmt"
+)
+
+func Ranges(n int) []int {
+	var out []int = make([]int, 0, max(n-1, 0))
+	for i := 1; i < n; i++ {
+		out = append(out, i)
+	}
+	return out
+}
+
+func Literals() []int {
+	var fixed []int = make([]int, 0, 2)
+	for _, j := range []int{1, 2} {
+		fixed = append(fixed, (j * 2))
+	}
+	return fixed
+}
+
+func ExitsEarly(n int) []int {
+	var out []int = []int{}
+	for i := 0; i < n; i++ {
+		if i == 2 {
+			break
+		}
+		out = append(out, i)
+	}
+	return out
+}
+
+func main() {
+	for _, i := range Ranges(4) {
+		fmt.Printf("%v\n", i)
+	}
+	for _, i := range Ranges(0) {
+		fmt.Printf("%v\n", i)
+	}
+	for _, j := range Literals() {
+		fmt.Printf("%v\n", j)
+	}
+	for _, k := range ExitsEarly(1000) {
+		fmt.Printf("%v\n", k)
+	}
+}
@@ -0,0 +1,77 @@
+//! ```cargo
+//! [package]
+//! edition = "2021"
+//! [dependencies]
+//! anyhow = "*"
+//! ```
+
+#![allow(clippy::assertions_on_constants)]
+#![allow(clippy::bool_comparison)]
+#![allow(clippy::collapsible_else_if)]
+#![allow(clippy::comparison_to_empty)]
+#![allow(clippy::double_parens)] // https://github.com/adsharma/py2many/issues/17
+#![allow(clippy::eq_op)]
+#![allow(clippy::let_with_type_underscore)]
+#![allow(clippy::map_identity)]
+#![allow(clippy::needless_return)]
+#![allow(clippy::nonminimal_bool)]
+#![allow(clippy::partialeq_to_none)]
+#![allow(clippy::print_literal)]
+#![allow(clippy::ptr_arg)]
+#![allow(clippy::redundant_static_lifetimes)] // https://github.com/adsharma/py2many/issues/266
+#![allow(clippy::unnecessary_cast)]
+#![allow(clippy::upper_case_acronyms)]
+#![allow(clippy::useless_vec)]
+#![allow(non_camel_case_types)]
+#![allow(non_snake_case)]
+#![allow(non_upper_case_globals)]
+#![allow(unused_imports)]
+#![allow(unused_mut)]
+#![allow(unused_parens)]
+
+extern crate anyhow;
+use anyhow::Result;
+use std::collections;
+
+pub fn ranges(n: i32) -> Vec<i32> {
+    let mut out: Vec<i32> = Vec::with_capacity((n - 1).max(0) as usize);
+    for i in (1..n) {
+        out.push(i);
+    }
+    return out.to_vec();
+}
+
+pub fn literals() -> Vec<i32> {
+    let mut fixed: Vec<i32> = Vec::with_capacity(2);
+    for j in vec![1, 2] {
+        fixed.push(((j as i32) * 2));
+    }
+    return fixed.to_vec();
+}
+
+pub fn exits_early(n: i32) -> Vec<i32> {
+    let mut out: Vec<i32> = vec![];
+    for i in (0..n) {
+        if (i as i32) == 2 {
+            break;
+        }
+        out.push(i);
+    }
+    return out.to_vec();
+}
+
+pub fn main() -> Result<()> {
+    for i in ranges(4) {
+        println!("{}", i);
+    }
+    for i in ranges(0) {
+        println!("{}", i);
+    }
+    for j in literals() {
+        println!("{}", j);
+    }
+    for k in exits_early(1000) {
+        println!("{}", k);
+    }
+    Ok(())
+}
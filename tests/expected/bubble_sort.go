@@ -3,13 +3,12 @@ package main
 import (
 	"fmt"
 	"github.com/google/go-cmp/cmp"
-	iter "github.com/hgfischer/go-iter"
 )
 
 func BubbleSort(seq []int) []int {
 	L := len(seq)
-	for range iter.NewIntSeq(iter.Start(0), iter.Stop(L)).All() {
-		for _, n := range iter.NewIntSeq(iter.Start(1), iter.Stop(L)).All() {
+	for __tmp1 := 0; __tmp1 < L; __tmp1++ {
+		for n := 1; n < L; n++ {
 			if seq[n] < seq[(n-1)] {
 				{
 					var __tmp1, __tmp2 = seq[n], seq[(n - 1)]
@@ -3,7 +3,6 @@ package main
 import (
 	"fmt"
 	"github.com/google/go-cmp/cmp"
-	iter "github.com/hgfischer/go-iter"
 	"math"
 )
 
@@ -13,7 +12,7 @@ func CombSort(seq []int) []int {
 	for gap > 1 || swap {
 		gap = int(math.Max(1, math.Floor((float64(gap) / 1.25))))
 		swap = false
-		for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop((len(seq) - gap))).All() {
+		for i, __tmp1 := 0, (len(seq) - gap); i < __tmp1; i++ {
 			if seq[i] > seq[(i+gap)] {
 				{
 					var __tmp1, __tmp2 = seq[(i + gap)], seq[i]
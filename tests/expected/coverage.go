@@ -3,7 +3,6 @@ package main
 import (
 	"fmt"
 	"github.com/electrious/refutil"
-	iter "github.com/hgfischer/go-iter"
 	"strings"
 )
 
@@ -18,7 +17,7 @@ func InlineEllipsis() {
 func Indexing() int {
 	var sum int = 0
 	var a []int = []int{}
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(10)).All() {
+	for i := 0; i < 10; i++ {
 		a = append(a, i)
 		sum += a[i]
 	}
@@ -46,10 +45,10 @@ func Show() {
 	}
 	var a2 float64 = 2.1
 	fmt.Printf("%v\n", a2)
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(10)).All() {
+	for i := 0; i < 10; i++ {
 		fmt.Printf("%v\n", i)
 	}
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(10), iter.Step(2)).All() {
+	for i := 0; i < 10; i += 2 {
 		fmt.Printf("%v\n", i)
 	}
 	var a3 int = -(a1)
@@ -0,0 +1,71 @@
+//! ```cargo
+//! [package]
+//! edition = "2021"
+//! [dependencies]
+//! anyhow = "*"
+//! ```
+
+#![allow(clippy::assertions_on_constants)]
+#![allow(clippy::bool_comparison)]
+#![allow(clippy::collapsible_else_if)]
+#![allow(clippy::comparison_to_empty)]
+#![allow(clippy::double_parens)] // https://github.com/adsharma/py2many/issues/17
+#![allow(clippy::eq_op)]
+#![allow(clippy::let_with_type_underscore)]
+#![allow(clippy::map_identity)]
+#![allow(clippy::needless_return)]
+#![allow(clippy::nonminimal_bool)]
+#![allow(clippy::partialeq_to_none)]
+#![allow(clippy::print_literal)]
+#![allow(clippy::ptr_arg)]
+#![allow(clippy::redundant_static_lifetimes)] // https://github.com/adsharma/py2many/issues/266
+#![allow(clippy::unnecessary_cast)]
+#![allow(clippy::upper_case_acronyms)]
+#![allow(clippy::useless_vec)]
+#![allow(non_camel_case_types)]
+#![allow(non_snake_case)]
+#![allow(non_upper_case_globals)]
+#![allow(unused_imports)]
+#![allow(unused_mut)]
+#![allow(unused_parens)]
+
+extern crate anyhow;
+use anyhow::Result;
+use std::collections;
+
+pub fn stats(n: i32, xs: &Vec<i32>) -> i32 {
+    let evens: Vec<i32> = xs
+        .iter()
+        .filter(|&&x| ((x as i32) % 2) == 0)
+        .map(|&x| x)
+        .collect::<Vec<_>>();
+    println!("{}", evens.len() as i32);
+    if xs.iter().map(|&x| (x as i32) > 3).any(|x| x) {
+        println!(
+            "{}",
+            (0..n).filter(|&x| (x as i32) > 1).map(|x| x).count() as i32
+        );
+    }
+    for y in xs.iter().map(|&x| ((x as i32) + 1)) {
+        println!("{}", y);
+    }
+    if xs
+        .iter()
+        .map(|&x| (x as i32) > 0)
+        .collect::<Vec<_>>()
+        .iter()
+        .all(|&x| x)
+    {
+        println!("{}", n);
+    }
+    for z in xs.iter().map(|&x| ((x as i32) * 2)).collect::<Vec<_>>() {
+        println!("{}", z);
+    }
+    return (0..n).map(|x| (x * x)).sum();
+}
+
+pub fn main() -> Result<()> {
+    let xs: &Vec<i32> = &vec![1, 2, 5];
+    println!("{}", stats(4, xs));
+    Ok(())
+}
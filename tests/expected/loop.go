@@ -2,11 +2,10 @@ package main
 
 import (
 	"fmt"
-	iter "github.com/hgfischer/go-iter"
 )
 
 func ForWithBreak() {
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(4)).All() {
+	for i := 0; i < 4; i++ {
 		if i == 2 {
 			break
 		}
@@ -15,7 +14,7 @@ func ForWithBreak() {
 }
 
 func ForWithContinue() {
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(4)).All() {
+	for i := 0; i < 4; i++ {
 		if i == 2 {
 			continue
 		}
@@ -25,7 +24,7 @@ func ForWithContinue() {
 
 func ForWithElse() {
 	var has_break bool = false
-	for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(4)).All() {
+	for i := 0; i < 4; i++ {
 		fmt.Printf("%v\n", i)
 	}
 	if has_break != true {
@@ -0,0 +1,48 @@
+package main
+
+import (
+	"fmt"
+)
+
+func Counted(n int) {
+	for i := 0; i < n; i++ {
+		fmt.Printf("%v\n", i)
+	}
+	for j := 1; j < n; j++ {
+		fmt.Printf("%v\n", j)
+	}
+	for k := n; k > 0; k -= 2 {
+		fmt.Printf("%v\n", k)
+	}
+	for __tmp1 := 0; __tmp1 < 2; __tmp1++ {
+		fmt.Printf("%v\n", "x")
+	}
+}
+
+func BoundsEvaluatedOnce(n int, step int) {
+	for i, __tmp2 := 0, n; i < __tmp2; i++ {
+		n = 2
+		fmt.Printf("%v\n", i)
+	}
+	for j, __tmp3 := 0, (len([]int{1, 2}) - 1); j < __tmp3; j++ {
+		fmt.Printf("%v\n", j)
+	}
+	for k := 0; (step > 0 && k < n) || (step < 0 && k > n); k += step {
+		fmt.Printf("%v\n", k)
+	}
+}
+
+func BoundsReadingTheTarget(i int, step int) {
+	for i, __tmp4 := 0, i; i < __tmp4; i++ {
+		fmt.Printf("%v\n", i)
+	}
+	for step, __tmp5 := 10, step; (__tmp5 > 0 && step < 0) || (__tmp5 < 0 && step > 0); step += __tmp5 {
+		fmt.Printf("%v\n", step)
+	}
+}
+
+func main() {
+	Counted(4)
+	BoundsEvaluatedOnce(3, 1)
+	BoundsReadingTheTarget(2, -4)
+}
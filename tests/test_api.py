@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from py2many import pipeline
+from py2many.api import transpile
+from py2many.pipeline import LANGS, _transpile
+
+PROJECT = {
+    "bar.py": "def bar1():\n    return 1\n",
+    "foo.py": "from bar import bar1\n\ndef foo1() -> int:\n    return bar1()\n",
+}
+
+
+def test_transpile_matches_pipeline():
+    results = transpile(PROJECT, ["go"])
+
+    assert results.ok
+    filenames = [Path(f) for f in PROJECT]
+    outputs, _ = _transpile(filenames, list(PROJECT.values()), LANGS["go"])
+    assert results.outputs["go"] == dict(zip(PROJECT, outputs))
+
+
+def test_diagnostics_are_returned_not_printed(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    sources = {
+        **PROJECT,
+        "broken.py": "def (:\n",
+        "unsupported.py": "def f() -> int:\n    return ...\n",
+    }
+
+    results = transpile(sources, ["rust"])
+
+    assert not results.ok
+    assert {d.filename for d in results.diagnostics} == {"broken.py", "unsupported.py"}
+    unsupported = next(d for d in results.diagnostics if d.filename == "unsupported.py")
+    assert (unsupported.lang, unsupported.lineno, unsupported.col_offset) == ("rust", 2, 11)
+    assert "AstNotImplementedError" in unsupported.message
+    assert set(results.outputs["rust"]) == set(PROJECT)
+    assert capsys.readouterr() == ("", "")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_languages_and_options_are_rejected():
+    with pytest.raises(ValueError):
+        transpile(PROJECT, ["cobol"])
+    with pytest.raises(TypeError):
+        transpile(PROJECT, ["go"], colour=True)
+
+
+def test_concurrent_calls_match_serial_calls():
+    requests = [(PROJECT, [lang]) for lang in ("go", "dart", "kotlin", "rust")] * 2
+    serial = [transpile(*request) for request in requests]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        concurrent = list(pool.map(lambda request: transpile(*request), requests))
+
+    assert concurrent == serial
+
+
+def test_settings_are_built_once_and_do_not_print(monkeypatch, capsys):
+    monkeypatch.setenv("CXX", "no-such-compiler")
+    first = transpile(PROJECT, ["cpp"], indent=3)
+
+    assert first.warnings == ("Warning: CXX=no-such-compiler not found",)
+    assert capsys.readouterr() == ("", "")
+
+    def build(*args):
+        raise AssertionError("settings built again")
+
+    monkeypatch.setattr(pipeline, "_settings_from_args", build)
+    assert transpile(PROJECT, ["cpp"], indent=3) == first
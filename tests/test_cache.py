@@ -0,0 +1,80 @@
+import os
+from pathlib import Path
+
+from py2many.cache import TranspileCache
+from py2many.cli import parse_args
+from py2many.defaults import DEFAULTS
+from py2many.pipeline import LANGS, _transpile
+
+PROJECT = {
+    Path("bar.py"): "def bar1():\n    return 0\n",
+    Path("baz.py"): 'def baz1():\n    return "foo"\n',
+    Path("foo.py"): "from bar import bar1\n\ndef foo1():\n    return bar1()\n",
+}
+
+
+def _keys(cache, project, lang="go"):
+    return cache.module_keys(list(project), list(project.values()), LANGS[lang])
+
+
+class TestTranspileCache:
+    def test_hit_returns_stored_output(self, tmp_path):
+        cache = TranspileCache(tmp_path)
+        filenames = list(PROJECT)
+        sources = list(PROJECT.values())
+
+        outputs, _ = _transpile(filenames, sources, LANGS["go"], cache=cache)
+        assert cache.stats.misses == 3
+
+        cached, successful = _transpile(filenames, sources, LANGS["go"], cache=cache)
+        assert cache.stats.hits == 3
+        assert cached == outputs
+        assert set(successful) == set(filenames)
+
+    def test_importers_are_invalidated(self, tmp_path):
+        cache = TranspileCache(tmp_path)
+        before = _keys(cache, PROJECT)
+        changed = {**PROJECT, Path("bar.py"): "def bar1():\n    return 1\n"}
+        after = _keys(cache, changed)
+
+        assert before[Path("bar.py")] != after[Path("bar.py")]
+        assert before[Path("foo.py")] != after[Path("foo.py")]
+        assert before[Path("baz.py")] == after[Path("baz.py")]
+
+    def test_keys_depend_on_backend(self, tmp_path):
+        cache = TranspileCache(tmp_path)
+        assert _keys(cache, PROJECT, "go") != _keys(cache, PROJECT, "rust")
+
+    def test_evicts_least_recently_used(self, tmp_path):
+        cache = TranspileCache(tmp_path, max_size=10)
+        cache.put("a" * 64, "12345")
+        cache.put("b" * 64, "12345")
+        old = cache._path("out", "a" * 64)
+        os.utime(old, ns=(0, 0))
+        cache.put("c" * 64, "12345")
+
+        cache.evict()
+
+        assert cache.get("a" * 64) is None
+        assert cache.get("c" * 64) == "12345"
+        assert cache.stats.evictions == 1
+
+    def test_eviction_is_throttled(self, tmp_path):
+        cache = TranspileCache(tmp_path, max_size=10)
+        cache.evict()
+        assert not (tmp_path / "last-evict").exists()
+
+        cache.put("a" * 64, "12345")
+        cache.evict()
+        cache.put("b" * 64, "12345")
+        cache.put("c" * 64, "12345")
+        cache.evict()
+        assert cache.stats.evictions == 0
+
+        cache.evict(force=True)
+        assert cache.stats.evictions == 1
+
+
+def test_cache_is_opt_in():
+    assert parse_args(["--lang=go"]).cache is DEFAULTS["cache"] is False
+    assert parse_args(["--lang=go", "--cache"]).cache is True
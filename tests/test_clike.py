@@ -1,9 +1,60 @@
 import ast
+import os.path
 
-from py2many.clike import c_symbol
+from py2many.clike import c_symbol, class_for_typename, typename_cache_info
 
 
 def test_c_symbol():
     source = ast.parse("x == y")
     equals_symbol = source.body[0].value.ops[0]
     assert c_symbol(equals_symbol) == "=="
+
+
+def test_class_for_typename_is_cached():
+    assert class_for_typename("os.path.join") is os.path.join
+    hits = typename_cache_info().hits
+    assert class_for_typename("os.path.join") is os.path.join
+    assert class_for_typename("no.such.module", "fallback") == "fallback"
+    assert class_for_typename("no.such.module", "other") == "other"
+    assert typename_cache_info().hits == hits + 2
+    # The namespace is searched before the cache
+    assert class_for_typename("os.path.join", None, {"os.path.join": int}) is int
+
+
+def test_dispatch_index_matches_dispatch_order():
+    from py2many.clike import CLikeTranspiler
+
+    def direct(self, node, vargs):
+        return "direct"
+
+    def small(node, vargs):
+        return "small"
+
+    def by_object(self, node, vargs):
+        return "object"
+
+    transpiler = CLikeTranspiler()
+    transpiler._dispatch_map = {"len": direct}
+    transpiler._small_dispatch_map = {"len": small, "max": small}
+    transpiler._small_usings_map = {"max": "<algorithm>"}
+    transpiler._func_dispatch_table = {
+        os.path.join: (by_object, "str"),
+        "sqrt": (by_object, "float"),
+    }
+    transpiler._func_usings_map = {}
+
+    index = transpiler.compile_dispatch()
+    assert index.lookup("len").handler is direct
+    assert index.lookup("max").usings == ("<algorithm>",)
+    assert index.lookup("os.path.join").result_type == "str"
+    # os.path.join is indexed under its qualified name up front
+    assert "posixpath.join" in index._entries or "ntpath.join" in index._entries
+    assert index.lookup("foo.sqrt").stem == "foo."
+    assert index.lookup("bar") is None
+    assert transpiler.compile_dispatch() is index
+
+    # Imported names are resolved per module
+    transpiler._imported_names = {"pj": os.path.join}
+    call = ast.parse("pj(a, b)").body[0].value
+    assert transpiler._dispatch(call, "pj", ["a", "b"]) == "object"
+    assert "pj" not in index._entries
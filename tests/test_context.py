@@ -1,6 +1,6 @@
 import ast
 
-from py2many.context import add_list_calls, add_variable_context
+from py2many.context import add_list_calls, add_list_capacity, add_variable_context
 from py2many.scope import add_scope_context
 
 
@@ -18,6 +18,64 @@ class TestListCallTransformer:
         assert len(source.scopes[-1].vars[0].calls) == 1
 
 
+class TestListCapacityTransformer:
+    def capacity(self, *lines):
+        source = parse(*lines)
+        add_list_calls(source)
+        add_list_capacity(source)
+        value = source.body[0].value
+        return getattr(value, "capacity_of", None), getattr(value, "capacity_factor", None)
+
+    def test_append_loop_is_bounded(self):
+        counted, factor = self.capacity(
+            "out: List[int] = []",
+            "for i in range(len(xs) - 1):",
+            "    out.append(i)",
+            "    out.append(-i)",
+        )
+        assert ast.unparse(counted) == "range(len(xs) - 1)"
+        assert factor == 2
+
+    def test_literal_loop_is_bounded(self):
+        counted, factor = self.capacity("out = []", "for x in [1, 2]:", "    out.append(x)")
+        assert isinstance(counted, ast.List) and factor == 1
+
+    def test_unbounded_loops(self):
+        assert self.capacity(
+            "out = []", "for i in range(n):", "    if i:", "        out.append(i)"
+        ) == (None, None)
+        assert self.capacity(
+            "out = []", "for i in range(f()):", "    out.append(i)"
+        ) == (None, None)
+        assert self.capacity(
+            "out = []", "for i in range(n):", "    out.append(i)", "out.append(n)"
+        ) == (None, None)
+        assert self.capacity(
+            "out = []", "x = 1", "for i in range(n):", "    out.append(i)"
+        ) == (None, None)
+        for exit in ("break", "return", "raise ValueError", "yield i", "continue"):
+            assert self.capacity(
+                "out = []",
+                "for i in range(n):",
+                "    if i > 3:",
+                f"        {exit}",
+                "    out.append(i)",
+            ) == (None, None), exit
+
+    def test_jumps_after_appends_or_in_inner_scopes(self):
+        assert self.capacity(
+            "out = []",
+            "for i in range(n):",
+            "    out.append(i)",
+            "    while True:",
+            "        break",
+            "    if i:",
+            "        continue",
+            "    def f():",
+            "        return 1",
+        )[1] == 1
+
+
 class TestVariableTranformer:
     def test_vars_of_if(self):
         source = parse("x = 5", "if True:", "   y = 10", "   x *= y")
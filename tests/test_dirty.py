@@ -0,0 +1,36 @@
+import ast
+
+from py2many.dirty import DirtyTracker, mark_dirty
+
+SOURCE = "def foo():\n    return 1\n\ndef bar():\n    return 2 / 3\n"
+
+
+class TestDirtyTracker:
+    def test_unchanged_tree_is_clean(self):
+        tree = ast.parse(SOURCE)
+        tracker = DirtyTracker(tree)
+
+        assert not tracker.is_dirty(tree)
+
+    def test_replaced_statement_is_dirty(self):
+        tree = ast.parse(SOURCE)
+        tracker = DirtyTracker(tree)
+        tree.body[0].body[0] = ast.parse("return 3").body[0]
+
+        assert tracker.dirty_statements(tree) == [tree.body[0]]
+
+    def test_removed_statement_is_dirty(self):
+        tree = ast.parse(SOURCE)
+        tracker = DirtyTracker(tree)
+        del tree.body[0]
+
+        assert tracker.is_dirty(tree)
+
+    def test_reported_change_is_dirty(self):
+        tree = ast.parse(SOURCE)
+        tracker = DirtyTracker(tree)
+        div = tree.body[1].body[0].value
+        div.use_integer_div = True
+        mark_dirty(div)
+
+        assert tracker.dirty_statements(tree) == [tree.body[1]]
@@ -0,0 +1,118 @@
+import os
+from dataclasses import replace
+from pathlib import Path
+
+from py2many.incremental import STATE_FILENAME
+from py2many.pipeline import LANGS, _process_many_langs
+
+PROJECT = {
+    Path("bar.py"): "def bar1():\n    return 0\n",
+    Path("baz.py"): 'def baz1():\n    return "foo"\n',
+    Path("foo.py"): "from bar import bar1\n\ndef foo1():\n    return bar1()\n",
+}
+
+
+class TestIncrementalBuild:
+    def _build(self, src, out, analysed=None):
+        settings = replace(LANGS["go"], formatter=None)
+        filenames = sorted(p.relative_to(src) for p in src.glob("*.py"))
+        return _process_many_langs(
+            [settings],
+            src,
+            filenames,
+            [out],
+            incremental=True,
+            analysed_list=None if analysed is None else [analysed],
+        )[0]
+
+    def _mtimes(self, out):
+        return {p.name: p.stat().st_mtime_ns for p in out.glob("*.go")}
+
+    def _setup(self, tmp_path):
+        src, out = tmp_path / "src", tmp_path / "out"
+        src.mkdir()
+        for filename, source in PROJECT.items():
+            (src / filename).write_text(source)
+        successful, _ = self._build(src, out)
+        assert successful == set(PROJECT)
+        assert (out / STATE_FILENAME).exists()
+        for path in out.glob("*.go"):
+            os.utime(path, ns=(0, 0))
+        return src, out
+
+    def test_unchanged_project_is_not_rewritten(self, tmp_path):
+        src, out = self._setup(tmp_path)
+
+        successful, _ = self._build(src, out)
+
+        assert successful == set(PROJECT)
+        assert set(self._mtimes(out).values()) == {0}
+
+    def test_only_changed_modules_are_rewritten(self, tmp_path):
+        src, out = self._setup(tmp_path)
+        (src / "bar.py").write_text("def bar1():\n    return 1\n")
+
+        successful, _ = self._build(src, out)
+
+        assert successful == set(PROJECT)
+        mtimes = self._mtimes(out)
+        assert mtimes["bar.go"] != 0
+        # foo.py is transpiled again, but its output is the same
+        assert mtimes["foo.go"] == mtimes["baz.go"] == 0
+        assert "return 1" in (out / "bar.go").read_text()
+
+    def test_missing_output_is_regenerated(self, tmp_path):
+        src, out = self._setup(tmp_path)
+        (out / "baz.go").unlink()
+
+        self._build(src, out)
+
+        assert (out / "baz.go").exists()
+        assert self._mtimes(out)["bar.go"] == 0
+
+    def test_analysed_imports_are_not_transpiled_again(self, tmp_path):
+        src, out = tmp_path / "src", tmp_path / "out"
+        src.mkdir()
+        for filename, source in PROJECT.items():
+            (src / filename).write_text(source)
+        analysed = {}
+        self._build(src, out, analysed)
+        bar = analysed[Path("bar.py")]
+
+        (src / "foo.py").write_text("from bar import bar1\n\ndef foo1():\n    return bar1() + 1\n")
+        successful, _ = self._build(src, out, analysed)
+
+        assert successful == set(PROJECT)
+        assert analysed[Path("bar.py")] is bar
+        assert Path("foo.py") in analysed
+        fresh = tmp_path / "fresh"
+        self._build(src, fresh)
+        assert (out / "foo.go").read_text() == (fresh / "foo.go").read_text()
+
+    def test_module_that_does_not_parse_fails_until_fixed(self, tmp_path, capsys):
+        src, out = self._setup(tmp_path)
+        (src / "bar.py").write_text("def f(:\n")
+
+        successful, _ = self._build(src, out)
+
+        # foo.py imports bar.py, so it waits for it too
+        assert successful == {Path("baz.py")}
+        assert "Failed to parse" in capsys.readouterr().out
+        assert self._mtimes(out)["foo.go"] == 0
+
+        (src / "bar.py").write_text("def bar1():\n    return 1\n")
+        successful, _ = self._build(src, out)
+
+        assert successful == set(PROJECT)
+        assert "return 1" in (out / "bar.go").read_text()
+
+    def test_unreadable_module_fails(self, tmp_path, capsys):
+        src, out = self._setup(tmp_path)
+        settings = replace(LANGS["go"], formatter=None)
+
+        [(successful, _)] = _process_many_langs(
+            [settings], src, [*PROJECT, Path("gone.py")], [out], incremental=True
+        )
+
+        assert successful == set(PROJECT)
+        assert "Failed to read" in capsys.readouterr().out
@@ -2,7 +2,16 @@ import ast
 import sys
 import unittest
 
-from py2many.inference import infer_types, infer_types_typpete
+from py2many.context import add_variable_context
+from py2many.dirty import mark_dirty
+from py2many.inference import (
+    INFERENCE_STATS,
+    get_inferred_type,
+    infer_types,
+    infer_types_typpete,
+    invalidate_inference,
+)
+from py2many.scope import add_scope_context
 
 
 def parse(*args):
@@ -20,6 +29,48 @@ class TestInference:
             assert tree.body[0].targets[0].annotation.slice.id == "int"
 
 
+class TestInferenceCache:
+    def _tree(self):
+        tree = parse("x: int = 1", "y = x")
+        add_scope_context(tree)
+        add_variable_context(tree, (tree,))
+        infer_types(tree)
+        return tree
+
+    def _shadow_x(self, tree, typename):
+        x = ast.Name(id="x", annotation=ast.Name(id=typename))
+        x.scopes = tree.scopes
+        tree.vars = [x, *tree.vars]
+        return x
+
+    def test_lookups_are_cached(self):
+        tree = self._tree()
+        use = tree.body[1].value
+        assert get_inferred_type(use).id == "int"
+
+        hits = INFERENCE_STATS.hits
+        assert get_inferred_type(use).id == "int"
+        assert INFERENCE_STATS.hits > hits
+
+    def test_invalidate_inference(self):
+        tree = self._tree()
+        use = tree.body[1].value
+        get_inferred_type(use)
+        self._shadow_x(tree, "str")
+
+        assert get_inferred_type(use).id == "int"
+        invalidate_inference(tree)
+        assert get_inferred_type(use).id == "str"
+
+    def test_mark_dirty_invalidates(self):
+        tree = self._tree()
+        use = tree.body[1].value
+        get_inferred_type(use)
+        mark_dirty(self._shadow_x(tree, "bool"))
+
+        assert get_inferred_type(use).id == "bool"
+
+
 class TestInferenceTyppete(unittest.TestCase):
     def test_infer_types_list_failure(self):
         tree = parse("a = [10, 20]")
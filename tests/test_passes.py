@@ -0,0 +1,63 @@
+import ast
+
+from py2many.context import VariableTransformer
+from py2many.passes import SKIP, AnalysisPass, run_passes, schedule
+from py2many.scope import ScopeTransformer
+
+
+class NameCollector(AnalysisPass):
+    def __init__(self):
+        self.names = []
+
+    def enter_Name(self, node):
+        self.names.append((node.id, [type(s).__name__ for s in self.scopes]))
+
+
+class SkipCalls(NameCollector):
+    def enter_Call(self, node):
+        return SKIP
+
+
+class SkipAnnotations(NameCollector):
+    def enter_AnnAssign_annotation(self, node):
+        return SKIP
+
+
+class NeedsVariables(AnalysisPass):
+    requires = (VariableTransformer,)
+
+
+class TestPasses:
+    def test_schedule_fuses_independent_passes(self):
+        variables, scopes, dependent = (
+            VariableTransformer([]),
+            ScopeTransformer(),
+            NeedsVariables(),
+        )
+
+        walks = schedule([variables, scopes, dependent])
+
+        assert walks == [[variables, scopes], [dependent]]
+
+    def test_hooks_see_enclosing_scopes(self):
+        collector = NameCollector()
+
+        run_passes(ast.parse("def foo():\n    x = y\n"), [collector])
+
+        assert collector.names == [
+            ("x", ["Module", "FunctionDef"]),
+            ("y", ["Module", "FunctionDef"]),
+        ]
+
+    def test_skip_only_affects_its_pass(self):
+        tree = ast.parse("a = f(b)\nc: int = d\n")
+        collector, calls, annotations = NameCollector(), SkipCalls(), SkipAnnotations()
+
+        run_passes(tree, [collector, calls, annotations])
+
+        def ids(p):
+            return [name for name, _ in p.names]
+
+        assert ids(collector) == ["a", "f", "b", "c", "int", "d"]
+        assert ids(calls) == ["a", "c", "int", "d"]
+        assert ids(annotations) == ["a", "f", "b", "c", "d"]
@@ -0,0 +1,245 @@
+import ast
+import json
+import pickle
+import subprocess
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+from py2many.cli import parse_args
+from py2many.exceptions import AstNotImplementedError
+from py2many.pipeline import (
+    FORMAT_BATCH_SIZE,
+    LANGS,
+    _format_many,
+    _transpile,
+    _transpile_langs,
+    _write_formatted,
+    describe_languages,
+    parse_languages,
+    transpile_from_args,
+)
+from py2many.registry import MANIFEST
+from py2many.utilities.toposort_modules import symbol_dependency_groups
+
+PROJECT = {
+    Path("bar.py"): "def bar1():\n    return 0\n",
+    Path("baz.py"): 'def baz1():\n    return "foo"\n',
+    Path("foo.py"): (
+        "from bar import bar1\n"
+        "from baz import baz1\n"
+        "\n"
+        "def foo1():\n"
+        "    return bar1()\n"
+    ),
+    Path("lone.py"): "def lone(x: int) -> int:\n    return x * 2\n",
+    Path("other.py"): "import math\n\ndef other() -> float:\n    return math.pi\n",
+}
+
+
+def _transpile_project(lang, jobs):
+    filenames = list(PROJECT)
+    sources = [PROJECT[f] for f in filenames]
+    return _transpile(filenames, sources, LANGS[lang], jobs=jobs)
+
+
+@pytest.mark.parametrize("lang", ["go", "python"])
+def test_parallel_output_matches_serial(lang):
+    serial_outputs, serial_successful = _transpile_project(lang, jobs=1)
+    parallel_outputs, parallel_successful = _transpile_project(lang, jobs=4)
+
+    assert parallel_outputs == serial_outputs
+    assert parallel_successful == serial_successful
+
+
+def test_multi_language_output_matches_single():
+    filenames = list(PROJECT)
+    sources = [PROJECT[f] for f in filenames]
+    langs = ["go", "python", "dart"]
+
+    results = _transpile_langs(filenames, sources, [LANGS[lang] for lang in langs])
+
+    for lang, result in zip(langs, results):
+        assert result == _transpile(filenames, sources, LANGS[lang])
+
+
+def test_parse_languages():
+    assert parse_languages("go") == ["go"]
+    assert parse_languages("rust, go,rust") == ["rust", "go"]
+    assert set(parse_languages("all")) == set(LANGS)
+    with pytest.raises(ValueError):
+        parse_languages("go,cobol")
+
+
+def test_backends_are_loaded_on_demand():
+    script = (
+        "import sys\n"
+        "from py2many.cli import parse_args\n"
+        "from py2many.pipeline import LANGS\n"
+        "parse_args(['--lang=rust,go', 'x.py'])\n"
+        "assert not [m for m in sys.modules if m.startswith('targets.')]\n"
+        "LANGS['go']\n"
+        "assert 'targets.go' in sys.modules and 'targets.rust' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", script], check=True, cwd=Path(__file__).parent.parent)
+
+
+def test_each_language_maps_its_own_types():
+    source = "from typing import List\n\ndef first(xs: List[int]) -> int:\n    return xs[0]\n"
+    signatures = {
+        "cpp": "inline int first(std::vector<int>& xs) {",
+        "dart": "int first(List<int> xs) {",
+        "dlang": "int first(int[] xs) {",
+        "go": "func First(xs []int) int {",
+        "nim": "proc first(xs: openArray[int]): int =",
+        "rust": "pub fn first(xs: &Vec<i32>) -> i32 {",
+    }
+
+    # Backends loaded before another one mustn't change its types
+    for langs in (list(signatures), list(reversed(signatures))):
+        for lang in langs:
+            outputs, _ = _transpile([Path("first.py")], [source], LANGS[lang])
+            assert signatures[lang] in outputs[0], lang
+
+
+def test_directory_sources_are_not_overwritten(tmp_path, capsys):
+    source = tmp_path / "src"
+    source.mkdir()
+    original = "def f():\n    for i in range(3):\n        pass\n    else:\n        return 1\n"
+    (source / "a.py").write_text(original)
+    argv = ["--lang=python", "--no-cache", "--ignore-formatter-errors"]
+
+    args = parse_args([*argv, f"--out_dir={source}", str(source)])
+    assert transpile_from_args(args) == 1
+    assert (source / "a.py").read_text() == original
+    assert f"Refusing to overwrite {source / 'a.py'}" in capsys.readouterr().out
+
+    args = parse_args([*argv, "--force", f"--out_dir={source}", str(source)])
+    assert transpile_from_args(args) == 0
+    assert (source / "a.py").read_text() != original
+
+
+def test_profile_passes(tmp_path):
+    source = tmp_path / "lone.py"
+    source.write_text(PROJECT[Path("lone.py")])
+    report = tmp_path / "profile.json"
+    args = parse_args(
+        [
+            "--lang=python",
+            "--ignore-formatter-errors",
+            f"--profile-passes={report}",
+            f"--out_dir={tmp_path / 'out'}",
+            str(source),
+        ]
+    )
+
+    assert transpile_from_args(args) == 0
+
+    profile = json.loads(report.read_text())
+    stages = {p["stage"] for p in profile["passes"]}
+    assert {"rewriter", "core", "emit"} <= stages
+    assert all(p["nodes"] > 0 for p in profile["passes"])
+    assert len(profile["traceEvents"]) == sum(p["calls"] for p in profile["passes"])
+
+
+def test_symbol_dependency_groups():
+    trees = []
+    for filename, source in PROJECT.items():
+        tree = ast.parse(source)
+        tree.__file__ = filename
+        trees.append(tree)
+
+    assert symbol_dependency_groups(tuple(trees)) == ((0, 1, 2), (3,), (4,))
+
+
+def test_ast_errors_survive_pickling():
+    node = ast.parse("x").body[0]
+    error = AstNotImplementedError("not supported", node)
+
+    restored = pickle.loads(pickle.dumps(error))
+
+    assert type(restored) is AstNotImplementedError
+    assert str(restored) == "not supported"
+    assert (restored.lineno, restored.col_offset) == (1, 0)
+
+
+def test_emit_errors_are_located(monkeypatch, capsys):
+    settings = LANGS["go"]
+    source = "def bar1():\n    return 0\n"
+    error = "py2many.exceptions.AstNotImplementedError: broken"
+
+    def fail(self, node):
+        raise RuntimeError("broken")
+
+    monkeypatch.setattr(type(settings.transpiler), "visit_Return", fail)
+    outputs, successful = _transpile([Path("bar.py")], [source], settings)
+    assert (outputs, successful) == (["FAILED"], [])
+    assert capsys.readouterr().out.startswith(f"bar.py:2:4: {error}")
+
+    monkeypatch.setattr(type(settings.transpiler), "module_chunks", fail)
+    _transpile([Path("bar.py")], [source], settings)
+    assert capsys.readouterr().out.startswith(f"bar.py:1:0: {error}")
+
+
+FORMATTER = """
+import sys
+with open(sys.argv[1], "a") as log:
+    log.write(" ".join(sys.argv[2:]) + "\\n")
+sys.exit(any("BAD" in open(path).read() for path in sys.argv[2:]))
+"""
+
+
+def test_format_many_batches_and_attributes_errors(tmp_path):
+    formatter = tmp_path / "formatter.py"
+    formatter.write_text(FORMATTER)
+    log = tmp_path / "log"
+    paths = []
+    for i in range(FORMAT_BATCH_SIZE + 2):
+        path = tmp_path / f"out{i}.go"
+        path.write_text("BAD" if i == 3 else "ok")
+        paths.append(path)
+    settings = replace(
+        LANGS["go"],
+        formatter=(sys.executable, str(formatter), str(log)),
+        batch_formatter=True,
+    )
+
+    assert _format_many(settings, paths) == {paths[3]}
+    calls = log.read_text().splitlines()
+    # Two chunks, then the files of the failed chunk one by one
+    assert len(calls) == 2 + FORMAT_BATCH_SIZE
+    assert _format_many(replace(settings, batch_formatter=False), paths[:2]) == set()
+
+
+STDIN_FORMATTER = """
+import sys
+source = sys.stdin.read()
+sys.stdout.write(source.upper())
+sys.exit("BAD" in source)
+"""
+
+
+def test_write_formatted_pipes_through_stdin_formatter(tmp_path):
+    formatter = tmp_path / "formatter.py"
+    formatter.write_text(STDIN_FORMATTER)
+    settings = replace(
+        LANGS["go"],
+        formatter=("false",),
+        stdin_formatter=(sys.executable, str(formatter), "{filename}"),
+        batch_formatter=False,
+    )
+    paths = [tmp_path / "a.go", tmp_path / "b.go"]
+
+    assert _write_formatted(settings, ["ok", "BAD"], paths) == {paths[1]}
+    assert paths[0].read_text() == "OK"
+    # Failed files keep the unformatted output
+    assert paths[1].read_text() == "BAD"
+
+
+def test_manifest_matches_backends():
+    for lang, backend in MANIFEST.items():
+        settings = LANGS[lang]
+        assert (settings.ext, settings.display_name) == (backend.ext, backend.display_name)
+    assert "rust (Rust, .rs)" in describe_languages()
@@ -17,6 +17,15 @@ class TestScopeTransformer:
         assert isinstance(source.body[0].scopes[-1], ast.FunctionDef)
         assert isinstance(source.body[0].body[0].scopes[-1], ast.FunctionDef)
 
+    def test_scopes_are_shared(self):
+        source = parse("def foo():", "   return 10")
+        foo = source.body[0]
+        ret = foo.body[0]
+        assert ret.scopes is ret.value.scopes is foo.scopes
+        assert foo.scopes.parent_scopes is source.scopes
+        assert list(ret.scopes) == [source, foo]
+        assert ret.scopes[0] is source and ret.scopes[-2] is source
+
 
 class TestScopeList:
     def test_find_returns_most_upper_definition(self):
@@ -24,3 +33,26 @@ class TestScopeList:
         add_variable_context(source, (source,))
         definition = source.scopes.find("x")
         assert definition.lineno == 1
+
+    def test_find_returns_first_definition_in_scope(self):
+        source = parse("x = 1", "x = 2")
+        add_variable_context(source, (source,))
+        assert source.scopes.find("x").lineno == 1
+
+    def test_find_sees_appended_vars(self):
+        source = parse("x = 1")
+        add_variable_context(source, (source,))
+        assert source.scopes.find("y") is None
+
+        y = ast.Name(id="y", lineno=2)
+        source.vars.append(y)
+        assert source.scopes.find("y") is y
+
+    def test_find_sees_replaced_body(self):
+        source = parse("def foo():", "   return 1")
+        assert source.scopes.find("foo") is source.body[0]
+
+        bar = ast.parse("def bar():\n   return 2").body[0]
+        source.body[0] = bar
+        assert source.scopes.find("foo") is None
+        assert source.scopes.find("bar") is bar
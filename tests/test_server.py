@@ -0,0 +1,84 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from py2many.client import connect, default_socket_path, request
+from py2many.server import Server, serve
+
+ROOT_DIR = Path(__file__).parent.parent
+
+
+@pytest.fixture
+def socket_path(tmp_path):
+    path = tmp_path / "py2many.sock"
+    daemon = subprocess.Popen(
+        [sys.executable, "-m", "py2many", "serve", "--lang=go", "--socket", str(path)],
+        cwd=ROOT_DIR,
+    )
+    try:
+        # The socket file exists from bind(), shortly before it accepts connections
+        for _ in range(200):
+            try:
+                connect(path).close()
+                break
+            except OSError:
+                time.sleep(0.05)
+        yield path
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+def _run(socket_path, argv):
+    with connect(socket_path) as conn:
+        return request(conn, argv)
+
+
+def test_request_is_transpiled_in_client_cwd(socket_path, tmp_path, monkeypatch):
+    (tmp_path / "bar.py").write_text("def bar1():\n    return 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    assert _run(socket_path, ["--lang=go", "--ignore-formatter-errors", "bar.py"]) == 0
+    assert "func Bar1() int" in (tmp_path / "bar.go").read_text()
+
+
+def test_requests_are_isolated(socket_path, tmp_path, monkeypatch):
+    (tmp_path / "bar.py").write_text("def bar1():\n    return 1\n")
+    monkeypatch.chdir(tmp_path)
+
+    # A request that fails doesn't break the next one
+    assert _run(socket_path, ["--lang=cobol", "bar.py"]) == 2
+    assert _run(socket_path, ["--lang=go", "--ignore-formatter-errors", "bar.py"]) == 0
+    assert (tmp_path / "bar.go").exists()
+
+
+def test_default_socket_is_in_a_private_directory(monkeypatch):
+    monkeypatch.delenv("PY2MANY_SOCKET", raising=False)
+    monkeypatch.delenv("XDG_RUNTIME_DIR", raising=False)
+
+    path = default_socket_path()
+    assert path.parent.name == f"py2many-{os.getuid()}"
+
+
+def test_socket_in_a_shared_directory_is_refused(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    shared.chmod(0o777)
+
+    assert serve(shared / "py2many.sock", ["go"]) == 1
+    assert not (shared / "py2many.sock").exists()
+
+
+def test_other_users_are_refused(socket_path, monkeypatch):
+    monkeypatch.setattr(os, "getuid", lambda: os.geteuid() + 1)
+
+    with pytest.raises(PermissionError):
+        connect(socket_path)
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(str(socket_path))
+        assert not Server.verify_request(None, conn, None)
@@ -1,6 +1,9 @@
+import os
+import shutil
+import tempfile
 import unittest
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 from py2many.pipeline import get_all_settings
 
@@ -9,12 +12,14 @@ try:
         REQUIRED_INCLUDE_FILES,
         _conan_include_args,
         _conan_include_dirs,
+        _include_dirs,
     )
 except ImportError:
     from targets.cpp import (
         REQUIRED_INCLUDE_FILES,
         _conan_include_args,
-        _conan_include_dirs
+        _conan_include_dirs,
+        _include_dirs,
     )
 
 
@@ -29,6 +34,75 @@ class TestSettings(unittest.TestCase):
     def test_conan_include_args(self):
         assert len(_conan_include_args()) == len(REQUIRED_INCLUDE_FILES) * 2
 
+    def test_includes_env_overrides_conan(self):
+        env = {"PY2MANY_CPP_INCLUDES": os.pathsep.join(["/a", "/b"])}
+        with patch("targets.cpp._conan_include_dirs") as scan:
+            assert _include_dirs(env) == ("/a", "/b")
+            assert _include_dirs({"PY2MANY_CPP_INCLUDES": ""}) == ()
+        scan.assert_not_called()
+
+    def test_conan_include_dirs_are_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp, "conan")
+            header = root / "p" / "catch2" / "include" / REQUIRED_INCLUDE_FILES[0]
+            header.parent.mkdir(parents=True)
+            header.touch()
+            env = {"PY2MANY_CACHE_DIR": str(Path(tmp, "cache"))}
+
+            def include_dirs():
+                _conan_include_dirs.cache_clear()
+                return _conan_include_dirs()
+
+            with patch("targets.cpp.CONAN_ROOTS", (str(root),)), patch.dict(os.environ, env):
+                assert include_dirs() == (str(header.parent.parent),)
+                with patch("targets.cpp._scan_conan_root") as scan:
+                    assert include_dirs() == (str(header.parent.parent),)
+                scan.assert_not_called()
+
+                # A new package invalidates the cached scan
+                other = root / "p" / "cppitertools" / "include" / REQUIRED_INCLUDE_FILES[1]
+                other.parent.mkdir(parents=True)
+                other.touch()
+                os.utime(root / "p", ns=(0, 0))
+                assert include_dirs() == (str(header.parent.parent), str(other.parent.parent))
+            _conan_include_dirs.cache_clear()
+
+    def test_conan_include_cache_sees_new_package_versions(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            root = Path(tmp, "conan")
+            package = root / "data" / "catch2"
+
+            def install(version):
+                header = package / version / "include" / REQUIRED_INCLUDE_FILES[0]
+                header.parent.mkdir(parents=True)
+                header.touch()
+                return str(header.parent.parent)
+
+            def include_dirs():
+                _conan_include_dirs.cache_clear()
+                return _conan_include_dirs()
+
+            old = install("2.0")
+            os.utime(package, ns=(0, 0))
+            env = {"PY2MANY_CACHE_DIR": str(Path(tmp, "cache"))}
+            with patch("targets.cpp.CONAN_ROOTS", (str(root),)), patch.dict(os.environ, env):
+                assert include_dirs() == (old,)
+
+                # Conan 1 adds a version inside the package's own dir
+                mtimes = [(path, path.stat().st_mtime_ns) for path in (root, root / "data")]
+                new = install("3.0")
+                for path, mtime in mtimes:
+                    os.utime(path, ns=(mtime, mtime))
+                assert sorted(include_dirs()) == [old, new]
+
+                # A cached dir that is gone is scanned for again
+                mtimes.append((package, package.stat().st_mtime_ns))
+                shutil.rmtree(package / "2.0")
+                for path, mtime in mtimes:
+                    os.utime(path, ns=(mtime, mtime))
+                assert include_dirs() == (new,)
+            _conan_include_dirs.cache_clear()
+
     def test_env_clang_format_style(self):
         lang = "cpp"
         env = {"CLANG_FORMAT_STYLE": "Google"}
@@ -1,4 +1,8 @@
 import textwrap
+from pathlib import Path
+
+from py2many.cli import parse_args
+from py2many.pipeline import _settings_from_args, _transpile
 
 try:
     from py2many.cpp.transpiler import transpile
@@ -167,3 +171,81 @@ def test_map_function():
         return results;}
     """
     assert cpp == textwrap.dedent(expected)
+
+
+def transpile_module(source: str, *options: str) -> str:
+    """C++ for `source` as transpiled by the CLI with `options`, unformatted."""
+    args = parse_args(["--lang=cpp", "--no-prologue", *options])
+    [cpp], _ = _transpile([Path("out.py")], [source], _settings_from_args("cpp", args))
+    return cpp
+
+
+def test_buffered_print_is_one_expression():
+    source = parse(
+        "def show(quiet: bool):",
+        '    print(1, "a")',
+        "    print()",
+        '    print("now", flush=True)',
+        '    print("maybe", flush=quiet)',
+    )
+    cpp = transpile_module(source, "--buffered-output")
+    expected = """\
+        #include <cstdint>
+        #include <iostream>
+        #include <string>
+        inline void show(bool quiet) {
+        std::cout << 1 << " " << std::string{"a"} << '\\n';
+        std::cout << '\\n';
+        std::cout << std::string{"now"} << '\\n' << std::flush;
+        std::cout << std::string{"maybe"} << '\\n';
+        if (quiet) std::cout.flush();}
+
+    """
+    assert cpp == textwrap.dedent(expected)
+
+
+def test_buffered_main_unsyncs_stdio():
+    source = parse(
+        "import sys",
+        'if __name__ == "__main__":',
+        '    sys.stdout.write("x")',
+        "    sys.stdout.flush()",
+    )
+    cpp = transpile_module(source, "--buffered-output")
+    expected = """\
+        #include <cstdint>
+        #include <iostream>
+        #include <string>
+        int main(int argc, char ** argv) {
+        std::ios::sync_with_stdio(false);
+        std::cout << std::string{"x"};
+        std::cout.flush();}
+
+    """
+    assert cpp == textwrap.dedent(expected)
+
+
+def test_append_loops_reserve():
+    source = parse(
+        "from typing import List",
+        "def loops(n: int):",
+        "    out: List[int] = []",
+        "    for i in range(n):",
+        "        out.append(i)",
+    )
+    cpp = transpile_module(source)
+    expected = """\
+        #include <cppitertools/range.hpp>
+        #include <cstdint>
+        #include <vector>
+        inline void loops(int n) {
+        std::vector<int> out = {};
+        if (n > 0) {
+        out.reserve(n);
+        }
+        for(auto i : iter::range(n)) {
+        out.push_back(i);
+        }}
+
+    """
+    assert cpp == textwrap.dedent(expected)
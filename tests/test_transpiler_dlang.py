@@ -0,0 +1,58 @@
+import textwrap
+from pathlib import Path
+
+from py2many.pipeline import LANGS, _transpile
+
+LOOPS = """
+    from typing import List
+
+    def loops(n: int) -> List[int]:
+        res: List[int] = []
+        for i in range(1, n):
+            res.append(i)
+        fixed: List[int] = []
+        for j in range(4):
+            fixed.append(j)
+        early: List[int] = []
+        for k in range(n):
+            if k == 2:
+                break
+            early.append(k)
+        return res
+    """
+
+
+def transpile(source: str) -> str:
+    [code], _ = _transpile([Path("loops.py")], [textwrap.dedent(source)], LANGS["dlang"])
+    return code.strip()
+
+
+def test_append_loops_are_preallocated():
+    dlang = transpile(LOOPS)
+    expected = """\
+        // generated by py2many --dlang=1
+        import std.range : iota;
+        int[] loops(int n) {
+        int[] res = [];
+        if (n - 1 > 0) {
+        res.reserve(n - 1);
+        }
+        foreach (i; iota(1, n, 1)) {
+        res ~= (i);
+        }
+        int[] fixed = [];
+        fixed.reserve(4);
+        foreach (j; iota(0, 4, 1)) {
+        fixed ~= (j);
+        }
+        int[] early = [];
+        foreach (k; iota(0, n, 1)) {
+
+
+        if(k == 2) {
+        break;
+        }
+        early ~= (k);
+        }
+        return res;}"""
+    assert dlang == textwrap.dedent(expected)
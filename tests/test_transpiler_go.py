@@ -0,0 +1,64 @@
+import textwrap
+from pathlib import Path
+
+from py2many.pipeline import LANGS, _transpile
+
+
+def transpile(source: str) -> str:
+    [code], _ = _transpile([Path("loops.py")], [textwrap.dedent(source)], LANGS["go"])
+    return code.strip()
+
+
+def test_loops_assigning_their_target_use_go_iter():
+    go = transpile(
+        """
+        def loops(n: int):
+            for i in range(n):
+                i = i + 1
+        """
+    )
+    expected = """\
+        package main
+
+        import (
+        iter "github.com/hgfischer/go-iter")
+
+
+
+        func Loops(n int) {
+        for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(n)).All() {
+        var i int = (i + 1)
+        }}"""
+    assert go == textwrap.dedent(expected)
+
+
+def test_imports_are_sorted():
+    go = transpile(
+        """
+        import sys
+
+        def main(n: int):
+            for i in range(n):
+                i = i + 1
+                print(i)
+            sys.exit(len(sys.argv))
+        """
+    )
+    # By path, whatever the order of the set of imports
+    expected = """\
+        package main
+
+        import (
+        "fmt"
+        iter "github.com/hgfischer/go-iter"
+        "os")
+
+
+
+        func Main(n int) {
+        for _, i := range iter.NewIntSeq(iter.Start(0), iter.Stop(n)).All() {
+        var i int = (i + 1)
+        fmt.Printf("%v\\n",i);
+        }
+        os.Exit(len(os.Args));}"""
+    assert go == textwrap.dedent(expected)
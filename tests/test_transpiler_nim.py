@@ -0,0 +1,47 @@
+import textwrap
+from pathlib import Path
+
+from py2many.pipeline import LANGS, _transpile
+
+LOOPS = """
+    from typing import List
+
+    def loops(n: int) -> List[int]:
+        res: List[int] = []
+        for i in range(1, n):
+            res.append(i)
+        fixed: List[int] = []
+        for j in range(4):
+            fixed.append(j)
+        early: List[int] = []
+        for k in range(n):
+            if k == 2:
+                break
+            early.append(k)
+        return res
+    """
+
+
+def transpile(source: str) -> str:
+    [code], _ = _transpile([Path("loops.py")], [textwrap.dedent(source)], LANGS["nim"])
+    return code.strip()
+
+
+def test_append_loops_are_preallocated():
+    nim = transpile(LOOPS)
+    expected = """\
+        proc loops(n: int): seq[int] =
+            var res: seq[int] = newSeqOfCap[int](max(n - 1, 0))
+            for i in (1..n - 1):
+                res.add(i)
+            var fixed: seq[int] = newSeqOfCap[int](4)
+            for j in (0..4 - 1):
+                fixed.add(j)
+            var early: seq[int] = @[]
+            for k in (0..n - 1):
+                if k == 2:
+                    break;
+
+                early.add(k)
+            return res"""
+    assert nim == textwrap.dedent(expected)
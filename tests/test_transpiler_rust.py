@@ -0,0 +1,141 @@
+import textwrap
+from pathlib import Path
+
+from py2many.cli import parse_args
+from py2many.pipeline import _settings_from_args, _transpile
+
+
+def transpile(source: str, *options: str) -> str:
+    """Rust for `source` as transpiled, without the embedded Cargo.toml."""
+    settings = _settings_from_args("rust", parse_args(["--lang=rust", "--no-prologue", *options]))
+    [code], _ = _transpile([Path("out.py")], [textwrap.dedent(source)], settings)
+    return code.split("//! ```\n", 1)[1].strip()
+
+
+def test_printing_in_a_loop_is_buffered():
+    rust = transpile(
+        """
+        import sys
+
+        def table(n: int) -> int:
+            for i in range(n):
+                print(i, abs(i))
+            if n > 100:
+                sys.exit(1)
+            print("done", flush=True)
+            return n
+
+        def once():
+            print("once")
+        """,
+        "--buffered-output",
+    )
+    expected = """\
+        #![allow(unreachable_code)]
+
+
+        use std::io::Write;
+
+        pub fn table(n: i32) -> i32 {
+        let mut __out = std::io::BufWriter::new(std::io::stdout().lock());
+        for i in (0..n) {
+        writeln!(__out, "{} {}", i, abs(i)).unwrap();
+        }
+        if n > 100 {
+        __out.flush().unwrap();
+        std::process::exit(1);
+        }
+        writeln!(__out, "{}", "done").unwrap();
+        __out.flush().unwrap();
+        __out.flush().unwrap();
+        return n;
+         }
+
+        pub fn once()  {
+        println!("{}","once");
+         }"""
+    assert rust == textwrap.dedent(expected)
+
+
+def test_calls_that_may_print_are_not_reordered():
+    rust = transpile(
+        """
+        from helpers import report
+
+        def shout(x: int):
+            print(x)
+
+        def loud(n: int):
+            for i in range(n):
+                shout(i)
+                print(i)
+
+        def imported(n: int):
+            for i in range(n):
+                report(i)
+                print(i)
+        """,
+        "--buffered-output",
+    )
+    expected = """\
+        extern crate helpers;
+
+
+        use helpers::{report};
+        pub fn shout(x: i32)  {
+        println!("{}",x);
+         }
+
+        pub fn loud(n: i32)  {
+        for i in (0..n) {
+        shout(i);
+        println!("{}",i);
+        }
+         }
+
+        pub fn imported(n: i32)  {
+        for i in (0..n) {
+        report(i);
+        println!("{}",i);
+        }
+         }"""
+    assert rust == textwrap.dedent(expected)
+
+
+def test_only_extensions_export_functions():
+    source = """
+        def f(x: int):
+            print(x)
+        """
+    function = 'pub fn f(x: i32)  {\nprintln!("{}",x);\n }'
+
+    assert transpile(source) == function
+    assert transpile(source, "--extension") == textwrap.dedent(
+        """\
+        extern crate pyo3;
+        use pyo3::prelude::*;
+        use pyo3::wrap_pyfunction;
+
+        #[pyfunction]
+        """
+    ) + function
+
+
+def test_lazy_min_max_of_floats_use_float_ord():
+    rust = transpile(
+        """
+        from typing import List
+
+        def spread(xs: List[float], ns: List[int]) -> float:
+            return max(x * 2.0 for x in xs) - min(x for x in xs) + max(n for n in ns)
+        """
+    )
+    expected = """\
+        extern crate float_ord;
+        use float_ord::FloatOrd;
+        use std::cmp;
+
+        pub fn spread(xs: &Vec<f64>, ns: &Vec<i32>) -> f64 {
+        return ((xs.iter().map(|&x| ((x as f64)*2.0)).map(FloatOrd).max().map(|x| x.0)? - xs.iter().map(|&x| x).map(FloatOrd).min().map(|x| x.0)?) + ns.iter().map(|&n| n).max()?);
+         }"""
+    assert rust == textwrap.dedent(expected)
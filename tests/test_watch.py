@@ -0,0 +1,49 @@
+
+import pytest
+
+from py2many.watch import InotifyWatcher, PollingWatcher
+
+
+def _watcher(kind, root):
+    if kind is PollingWatcher:
+        return PollingWatcher(root, interval=0.01)
+    try:
+        return InotifyWatcher(root)
+    except OSError as e:
+        pytest.skip(f"inotify not available: {e}")
+
+
+@pytest.mark.parametrize("kind", [InotifyWatcher, PollingWatcher])
+def test_changed_sources_are_reported(kind, tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "foo.py").write_text("x = 1\n")
+    watcher = _watcher(kind, tmp_path)
+    try:
+        (tmp_path / "pkg" / "foo.py").write_text("x = 2\n")
+        (tmp_path / "notes.txt").write_text("ignored\n")
+        assert watcher.read(5) == {tmp_path / "pkg" / "foo.py"}
+    finally:
+        watcher.close()
+
+
+@pytest.mark.parametrize("kind", [InotifyWatcher, PollingWatcher])
+def test_sources_in_new_directories_are_reported(kind, tmp_path):
+    watcher = _watcher(kind, tmp_path)
+    try:
+        new = tmp_path / "new"
+        new.mkdir()
+        (new / "bar.py").write_text("y = 1\n")
+        changed = set()
+        for _ in range(3):
+            changed |= watcher.read(1)
+        assert new / "bar.py" in changed
+    finally:
+        watcher.close()
+
+
+def test_read_times_out_without_changes(tmp_path):
+    watcher = _watcher(InotifyWatcher, tmp_path)
+    try:
+        assert watcher.read(0.01) == set()
+    finally:
+        watcher.close()